@@ -0,0 +1,123 @@
+"""
+Stop latency benchmark.
+
+Measures the time from stop() to the operation returning, for a rate-limited copy of a
+large file (FileSystemHandler), a verify hashing a large file (BackupVerifier) and a poll
+loop waiting on a CancellationToken (the pattern used while MTP landings are verified).
+Also checks that a stopped copy leaves no partial file behind. Exits non-zero if any
+latency exceeds the bound.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_cancellation [--size-mb N] [--rate-mb N] [--trials N] [--bound-ms N]
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+from src.core.file_system_handler import FileSystemHandler
+from src.core.backup_manifest import BackupManifest
+from src.core.backup_verifier import BackupVerifier
+from src.core.cancellation import CancellationToken
+from src.core.throttle import TokenBucket
+from src.utils.constants import SCHEDULE_SOURCE_ORDER
+
+MB = 1024 * 1024
+
+def write_file(path: str, size: int):
+    block = os.urandom(MB)
+    with open(path, "wb") as f:
+        for _ in range(size // MB):
+            f.write(block)
+
+def stop_after(delay: float, stop, started: list):
+    def run():
+        time.sleep(delay)
+        started.append(time.perf_counter())
+        stop()
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread
+
+def bench_copy(scratch: str, size: int, rate: float, delay: float):
+    """Returns (stop latency, partial file left behind)."""
+    source = os.path.join(scratch, "copy_src")
+    dest = os.path.join(scratch, "copy_dst")
+    os.makedirs(source)
+    write_file(os.path.join(source, "VIDEO.MOV"), size)
+
+    handler = FileSystemHandler()
+    handler.schedule_policy = SCHEDULE_SOURCE_ORDER
+    handler.copy_workers = 1
+    handler.rate_limiter = TokenBucket(rate)
+    stopped = []
+    stop_after(delay, handler.stop, stopped)
+    handler.backup_standard_mode(source, dest, 0, time.time())
+    latency = time.perf_counter() - stopped[0]
+    return latency, os.path.exists(os.path.join(dest, "VIDEO.MOV"))
+
+def bench_verify(scratch: str, size: int, delay: float):
+    """Returns the stop latency, or None if the verify finished before the stop."""
+    root = os.path.join(scratch, "verify")
+    os.makedirs(root)
+    path = os.path.join(root, "VIDEO.MOV")
+    write_file(path, size)
+    manifest = BackupManifest(root)
+    manifest.record(path)
+    manifest.close()
+
+    verifier = BackupVerifier(workers=1)
+    stopped = []
+    stop_after(delay, verifier.stop, stopped)
+    verifier.verify(root, resume=False)
+    if not stopped or not verifier.report or verifier.report["completed"]: return None
+    return time.perf_counter() - stopped[0]
+
+def bench_poll(trials: int, interval: float):
+    """Worst and mean latency of a poll loop waking up on cancel."""
+    latencies = []
+    for _ in range(trials):
+        token = CancellationToken()
+        stopped = []
+        stop_after(interval * 0.37, token.cancel, stopped)
+        while token.sleep(interval):
+            pass
+        latencies.append(time.perf_counter() - stopped[0])
+    return max(latencies), sum(latencies) / len(latencies)
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure stop latency of copy, verify and poll loops")
+    parser.add_argument("--size-mb", type=int, default=256, help="Size of the synthetic large file")
+    parser.add_argument("--rate-mb", type=float, default=50.0, help="Copy bandwidth limit, so the copy is still running when stopped")
+    parser.add_argument("--trials", type=int, default=20, help="Poll loop trials")
+    parser.add_argument("--bound-ms", type=float, default=1000.0, help="Maximum acceptable stop latency")
+    args = parser.parse_args()
+
+    bound = args.bound_ms / 1000
+    scratch = tempfile.mkdtemp(prefix="bench_cancellation_")
+    try:
+        copy_latency, partial_left = bench_copy(scratch, args.size_mb * MB, args.rate_mb * MB, 1.0)
+        verify_latency = bench_verify(scratch, args.size_mb * MB, 0.05)
+        poll_worst, poll_mean = bench_poll(args.trials, 0.5)
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    results = [
+        ("copy (rate limited)", copy_latency),
+        ("verify (hashing)", verify_latency),
+        ("poll loop (worst)", poll_worst),
+    ]
+    print(f"{'operation':<22}{'stop latency':>14}")
+    for name, latency in results:
+        print(f"{name:<22}{latency * 1000:>12.0f}ms" if latency is not None else f"{name:<22}{'finished first':>14}")
+    print(f"poll loop mean: {poll_mean * 1000:.1f}ms, partial file left by copy: {'yes' if partial_left else 'no'}")
+
+    failed = partial_left or any(latency is not None and latency > bound for _, latency in results)
+    print(f"{'FAIL' if failed else 'OK'} (bound {args.bound_ms:.0f}ms)")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
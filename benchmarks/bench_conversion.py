@@ -0,0 +1,79 @@
+"""
+HEIC conversion benchmark.
+
+Copies the HEIC files of a sample folder into a scratch directory (conversion deletes originals),
+converts them with HeicConverter and reports throughput and peak RSS.
+With --decode, the largest sample is first decoded on its own and the peak RSS growth is reported
+per pixel: about 4 bytes/pixel means the decoder's buffer is shared, 7 or more means it was copied.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_conversion <sample_folder> [--workers N] [--budget-mp MP] [--decode]
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+import pillow_heif
+
+from src.core.heic_converter import HeicConverter
+from src.utils.constants import CONVERSION_WORKERS, CONVERSION_PIXEL_BUDGET
+from src.utils.memory_stats import format_peak_rss, get_peak_rss
+
+def measure_decode(path: str):
+    """Peak RSS growth of decoding one file into the image the encoder receives (run before anything else allocates)."""
+    before = get_peak_rss()
+    heif_file = pillow_heif.open_heif(path, convert_hdr_to_8bit=True)
+    width, height = heif_file.size
+    image = HeicConverter._decoded_image(heif_file)
+    heif_file = None
+    mode = image.mode
+    image.close()
+    after = get_peak_rss()
+    if before is None or after is None:
+        print("Decode:     peak RSS not available on this platform")
+        return
+    growth = after - before
+    print(f"Decode:     {os.path.basename(path)} {width}x{height} {mode}, peak +{growth / (1024 * 1024):.1f} MB ({growth / (width * height):.2f} bytes/pixel)")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark HEIC to JPG conversion")
+    parser.add_argument("sample_folder")
+    parser.add_argument("--workers", type=int, default=CONVERSION_WORKERS)
+    parser.add_argument("--budget-mp", type=float, default=CONVERSION_PIXEL_BUDGET / 1_000_000, help="Pixel budget in megapixels")
+    parser.add_argument("--decode", action="store_true", help="Measure the decode peak of the largest sample first")
+    args = parser.parse_args()
+
+    scratch = tempfile.mkdtemp(prefix="bench_conversion_")
+    try:
+        heic_files = []
+        total_bytes = 0
+        for entry in os.scandir(args.sample_folder):
+            if entry.is_file() and entry.name.lower().endswith(".heic"):
+                target = os.path.join(scratch, entry.name)
+                shutil.copyfile(entry.path, target)
+                heic_files.append(target)
+                total_bytes += entry.stat().st_size
+
+        if not heic_files:
+            print("No HEIC files found in sample folder.")
+            return
+
+        if args.decode:
+            measure_decode(max(heic_files, key=os.path.getsize))
+
+        converter = HeicConverter(workers=args.workers, pixel_budget=int(args.budget_mp * 1_000_000))
+        start = time.perf_counter()
+        converted = converter.convert_files(heic_files)
+        elapsed = time.perf_counter() - start
+
+        print(f"Files:      {converted}/{len(heic_files)} converted")
+        print(f"Workers:    {args.workers}, budget {args.budget_mp:.0f} MP")
+        print(f"Elapsed:    {elapsed:.2f} s ({converted / elapsed if elapsed else 0:.2f} files/s, {total_bytes / (1024 * 1024) / elapsed if elapsed else 0:.1f} MB/s)")
+        print(f"Peak RSS:   {format_peak_rss()}")
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
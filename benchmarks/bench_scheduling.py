@@ -0,0 +1,87 @@
+"""
+Scheduling policy benchmark.
+
+Simulates a parallel copy of a synthetic camera roll (many photos, a few large videos)
+through WorkScheduler and compares makespan and how early files become safe, per policy.
+No I/O is performed; transfer time is modelled as per-file overhead + size / bandwidth.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_scheduling [--workers N] [--photos N] [--videos N] [--seed N]
+"""
+import argparse
+import heapq
+import random
+
+from src.core.scheduler import WorkScheduler
+from src.utils.constants import SCHEDULE_POLICIES, COPY_WORKERS
+
+MB = 1024 * 1024
+
+class SimFile:
+    __slots__ = ("size", "mtime")
+
+    def __init__(self, size: int, mtime: float):
+        self.size = size
+        self.mtime = mtime
+
+def build_library(photos: int, videos: int, seed: int):
+    rng = random.Random(seed)
+    files = [SimFile(int(rng.uniform(1.5, 5) * MB), rng.uniform(0, 5 * 365 * 86400)) for _ in range(photos)]
+    files += [SimFile(int(rng.uniform(200, 4000) * MB), rng.uniform(0, 5 * 365 * 86400)) for _ in range(videos)]
+    rng.shuffle(files)
+    return files
+
+def simulate(files, policy: str, workers: int, bandwidth: float, overhead: float):
+    """Returns (makespan, time at which 50% of files were done, time at which the newest 10% were done)."""
+    scheduler = WorkScheduler(files, policy, lambda f: f.size, lambda f: f.mtime, workers)
+    newest_cutoff = sorted(f.mtime for f in files)[int(len(files) * 0.9)]
+    newest_total = sum(1 for f in files if f.mtime >= newest_cutoff)
+
+    events = [] # (finish_time, seq, file)
+    clock = 0.0
+    seq = 0
+    done = 0
+    newest_done = 0
+    half_time = newest_time = None
+
+    for _ in range(workers):
+        item = scheduler.next_item()
+        if item is None: break
+        heapq.heappush(events, (clock + overhead + item.size / bandwidth, seq, item))
+        seq += 1
+
+    while events:
+        clock, _, item = heapq.heappop(events)
+        scheduler.done(item)
+        done += 1
+        if item.mtime >= newest_cutoff:
+            newest_done += 1
+            if newest_done == newest_total and newest_time is None:
+                newest_time = clock
+        if half_time is None and done >= len(files) / 2:
+            half_time = clock
+        nxt = scheduler.next_item()
+        if nxt is not None:
+            heapq.heappush(events, (clock + overhead + nxt.size / bandwidth, seq, nxt))
+            seq += 1
+    return clock, half_time, newest_time
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare scheduling policies by simulated makespan")
+    parser.add_argument("--workers", type=int, default=COPY_WORKERS)
+    parser.add_argument("--photos", type=int, default=5000)
+    parser.add_argument("--videos", type=int, default=40)
+    parser.add_argument("--bandwidth-mb", type=float, default=40.0, help="Per-worker bandwidth in MB/s")
+    parser.add_argument("--overhead-ms", type=float, default=30.0, help="Per-file overhead")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    files = build_library(args.photos, args.videos, args.seed)
+    print(f"{len(files)} files, {sum(f.size for f in files) / MB / 1024:.1f} GB, {args.workers} workers")
+    print(f"{'policy':<15}{'makespan':>12}{'50% files':>12}{'newest 10%':>12}")
+    for policy in SCHEDULE_POLICIES:
+        makespan, half, newest = simulate(files, policy, args.workers, args.bandwidth_mb * MB, args.overhead_ms / 1000)
+        print(f"{policy:<15}{makespan:>11.0f}s{half:>11.0f}s{newest:>11.0f}s")
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,69 @@
-from src.ui.app import BackupApp
+import sys
+import argparse
+
+def run_verify(argv):
+    """Command line audit of an existing backup folder: main.py verify <folder>"""
+    from src.core.backup_verifier import BackupVerifier
+
+    parser = argparse.ArgumentParser(prog="main.py verify", description="Verify a backup folder against its manifest")
+    parser.add_argument("folder", help="Backup folder (the one containing backup_manifest.jsonl)")
+    parser.add_argument("--workers", type=int, default=None, help="Parallel readers (default: based on storage type)")
+    parser.add_argument("--restart", action="store_true", help="Ignore progress from an interrupted verify")
+    args = parser.parse_args(argv)
+
+    # Status messages are already printed by the logger
+    verifier = BackupVerifier(workers=args.workers)
+    try:
+        report = verifier.verify(args.folder, resume=not args.restart)
+    except KeyboardInterrupt:
+        verifier.stop()
+        print("Stopped; run again to resume.")
+        return 1
+    except Exception as e:
+        print(f"Error: {e}")
+        return 2
+    print(f"OK: {report['ok']}  Missing: {report['missing']}  Corrupt: {report['corrupt']}  Extra: {report['extra']}")
+    print(f"Hashed {report['bytes_hashed'] / (1024 ** 3):.2f} GB in {report['seconds']:.0f}s "
+          f"({report['mb_per_second']:.1f} MB/s, {report['workers']} reader(s), {report['storage']})")
+    return 0 if not verifier.failed_files else 1
+
+def run_retry(argv):
+    """Copies only the files a previous backup failed on: main.py retry <folder> (not for packed backups)"""
+    from src.core.backup_manager import BackupManager
+    from src.core.failure_manifest import FailureManifest
+
+    parser = argparse.ArgumentParser(prog="main.py retry", description="Retry the failed files of a backup folder")
+    parser.add_argument("folder", help="Backup folder (the one containing failed_files.json; packed backups have none)")
+    parser.add_argument("--limit-mb", type=float, default=None, help="Copy bandwidth limit in MB/s (default: unlimited)")
+    parser.add_argument("--background", action="store_true", help="Low priority and a reduced CPU share, to keep the PC responsive")
+    args = parser.parse_args(argv)
+
+    result = {}
+    manager = BackupManager(lambda msg_type, data: result.update(success=data) if msg_type == "finish" else None)
+    if args.limit_mb: manager.set_bandwidth_limit(args.limit_mb * 1024 * 1024)
+    if args.background: manager.set_background_mode(True)
+    job = manager.retry_failed(args.folder)
+    try:
+        while not job.wait(0.5): pass
+    except KeyboardInterrupt:
+        manager.stop_backup()
+        job.wait()
+        print("Stopped; run again to retry the remaining files.")
+        return 1
+    finally:
+        manager.service.shutdown()
+    if not result.get("success"):
+        return 2
+    remaining = FailureManifest.load(args.folder)
+    print(f"Still failing: {len(remaining) if remaining else 0}")
+    return 0 if not remaining else 1
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "verify":
+        sys.exit(run_verify(sys.argv[2:]))
+    if len(sys.argv) > 1 and sys.argv[1] == "retry":
+        sys.exit(run_retry(sys.argv[2:]))
+
+    from src.ui.app import BackupApp
     app = BackupApp()
     app.mainloop()
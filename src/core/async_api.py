@@ -0,0 +1,156 @@
+import asyncio
+from typing import Any, AsyncIterator, Dict, List, NamedTuple, Optional, Tuple
+from ..utils.logger import setup_logger
+from .backup_verifier import BackupVerifier
+from .session_manager import SessionManager, BackupSession
+
+logger = setup_logger("AsyncApi")
+
+# Typed progress events (built from the (msg_type, data) status callback messages)
+class StatusEvent(NamedTuple):
+    text: str
+
+class ProgressEvent(NamedTuple):
+    fraction: float
+
+class FileProgressEvent(NamedTuple):
+    name: str
+    current: int
+    total: int
+
+class TimeEvent(NamedTuple):
+    text: str
+
+class FinishEvent(NamedTuple):
+    success: bool
+
+def to_event(msg_type: str, data: Any):
+    """Converts a status callback message to its event type (None for message types without one)."""
+    if msg_type == "status": return StatusEvent(data)
+    if msg_type == "progress": return ProgressEvent(data)
+    if msg_type == "file_progress": return FileProgressEvent(*data)
+    if msg_type == "time": return TimeEvent(data)
+    if msg_type in ("finish", "conversion_finish", "verify_finish"): return FinishEvent(bool(data))
+    return None
+
+class AsyncJob:
+    """
+    Awaitable handle for a backup or verify running on a worker thread.
+    `await job` returns the result dict; `async for event in job.events()` yields typed events
+    until the job finishes. Cancelling the task that awaits the job stops the job.
+    """
+    def __init__(self, name: str, loop: asyncio.AbstractEventLoop):
+        self.name = name
+        self._loop = loop
+        self._events: "asyncio.Queue[Any]" = asyncio.Queue()
+        self._future: "asyncio.Future[Dict[str, Any]]" = loop.create_future()
+        self._stop = None
+        self.cancelled = False
+
+    def _post(self, msg_type: str, data: Any):
+        """Thread-safe: called from the worker thread's status callback."""
+        event = to_event(msg_type, data)
+        if event is not None:
+            self._loop.call_soon_threadsafe(self._events.put_nowait, event)
+
+    def _resolve(self, result: Dict[str, Any]):
+        """Thread-safe: sets the job result once its worker has finished."""
+        def resolve():
+            result["cancelled"] = self.cancelled
+            if self.cancelled: result["success"] = False # Stopped runs still report "finish"
+            if not self._future.done():
+                self._future.set_result(result)
+            self._events.put_nowait(None) # Ends events()
+        self._loop.call_soon_threadsafe(resolve)
+
+    @property
+    def done(self) -> bool:
+        return self._future.done()
+
+    def cancel(self):
+        """Asks the worker to stop; the job still resolves (with success False) once it has."""
+        if self._stop and not self.done:
+            logger.info(f"Cancelling {self.name}")
+            self.cancelled = True
+            self._stop()
+
+    async def wait(self) -> Dict[str, Any]:
+        try:
+            # Shielded so cancelling the caller stops the job instead of dropping its result
+            return await asyncio.shield(self._future)
+        except asyncio.CancelledError:
+            self.cancel()
+            raise
+
+    def __await__(self):
+        return self.wait().__await__()
+
+    async def events(self) -> AsyncIterator[Any]:
+        """Yields events in order until the job finishes (one consumer per job)."""
+        while True:
+            event = await self._events.get()
+            if event is None: return
+            yield event
+
+class AsyncBackupEngine:
+    """
+    asyncio front end for the backup engine. Work runs on the existing service threads
+    (each backup in its own session, sharing the session manager's global budget); the
+    event loop only receives events and results, so one process can supervise many jobs.
+    """
+    def __init__(self, sessions: Optional[SessionManager] = None):
+        self.sessions = sessions or SessionManager()
+
+    def backup(self, name: str, source: str, dest: str, breadcrumbs: Optional[List[str]] = None, **options) -> AsyncJob:
+        """Starts a backup (see BackupManager.start_backup for options); must be called from the event loop."""
+        job = AsyncJob(f"backup {name}", asyncio.get_running_loop())
+        session = self.sessions.start_session(name, source, dest, breadcrumbs, status_callback=job._post, **options)
+        job._stop = session.stop
+
+        def resolve(_):
+            # Also on a failed or cancelled job: the session's thread and state are released either way
+            try:
+                job._resolve(self._session_result(session))
+            finally:
+                self.sessions.close_session(session)
+
+        session.job.add_done_callback(resolve)
+        return job
+
+    def verify(self, folder: str, resume: bool = True, workers: Optional[int] = None) -> AsyncJob:
+        """Verifies a backup folder against its manifest on a worker thread."""
+        loop = asyncio.get_running_loop()
+        job = AsyncJob(f"verify {folder}", loop)
+        verifier = BackupVerifier(job._post, workers)
+        job._stop = verifier.stop
+
+        def run():
+            try:
+                report = verifier.verify(folder, resume)
+                job._post("verify_finish", True)
+                return {"success": not verifier.failed_files, "report": report, "failed_files": list(verifier.failed_files)}
+            except Exception as e:
+                logger.error(f"Verify Error: {e}")
+                job._post("verify_finish", False)
+                return {"success": False, "report": None, "failed_files": [("General Error", str(e))]}
+
+        loop.run_in_executor(None, run).add_done_callback(lambda f: job._resolve(f.result()))
+        return job
+
+    async def shutdown(self):
+        """Stops all sessions and waits for their threads without blocking the loop."""
+        await asyncio.get_running_loop().run_in_executor(None, self.sessions.shutdown)
+
+    @staticmethod
+    def _session_result(session: BackupSession) -> Dict[str, Any]:
+        manager = session.manager
+        failed: List[Tuple[str, str]] = list(manager.failed_files)
+        return {
+            "success": bool(session.success),
+            "failed_files": failed,
+            "dest": session.dest,
+            "mirror_report": manager.mirror_report,
+            "pack_report": manager.pack_report,
+            "video_report": manager.video_report,
+            "thumbnail_report": manager.thumbnail_report,
+        }
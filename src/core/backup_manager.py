@@ -1,16 +1,28 @@
 import time
-import threading
 import queue
-import win32com.client
-import pythoncom
 from typing import List, Optional, Callable
-from ..utils.constants import SSF_DESKTOP, SSF_DRIVES
+from ..utils.constants import ALLOWED_EXTENSIONS, SSF_DESKTOP, SSF_DRIVES, BACKGROUND_CPU_SHARE, SCHEDULE_POLICIES, OUTPUT_MODE_FILES, OUTPUT_MODE_PACK, PACK_STAGING_DIRNAME, PACK_INDEX_FILENAME
 from ..utils.logger import setup_logger
 import os
-from PIL import Image
-import pillow_heif
+import shutil
 from .file_system_handler import FileSystemHandler
 from .mtp_handler import MTPHandler
+from .heic_converter import HeicConverter
+from .video_processor import VideoProcessor
+from .dir_scanner import DirectorySnapshot
+from .file_plan import FailureLog
+from .thumbnail_cache import ThumbnailGenerator
+from .media_dates import DateOrganizer
+from .throttle import TokenBucket, IoPriority
+from .fanout import FanOutWriter
+from .pack_archive import PackWriter
+from .backup_manifest import BackupManifest
+from .backup_verifier import BackupVerifier
+from .backup_service import BackupService, BackupJob
+from .folder_fingerprints import FolderFingerprints
+from .selection import SelectionQuery
+from .failure_manifest import FailureManifest, SOURCE_FS, SOURCE_MTP
+from .content_type import ContentTypeCache
 
 logger = setup_logger("BackupManager")
 
@@ -18,24 +30,46 @@ class BackupManager:
     """
     Orchestrates the backup process, delegating to specific handlers for MTP or FileSystem operations.
     """
-    def __init__(self, status_callback: Optional[Callable] = None):
+    def __init__(self, status_callback: Optional[Callable] = None, rate_limiter: Optional[TokenBucket] = None, io_priority: Optional[IoPriority] = None):
         self.status_callback = status_callback
         self.is_running = False
         self.total_files = 0
         self.total_bytes = 0
         self.start_time = 0
-        self.failed_files = []
+        self.failed_files = FailureLog()
         
         # Handlers
         self.fs_handler = FileSystemHandler(status_callback)
         self.mtp_handler = MTPHandler(status_callback)
+        self.converter = HeicConverter(status_callback)
+        self.video_processor = VideoProcessor(status_callback)
+        self.video_report = None
+        self.thumbnailer = ThumbnailGenerator()
+        self.verifier = BackupVerifier(status_callback)
+        self.verify_report = None
+        self.thumbnail_report = None
+        self.mirror_report = None
+        self.pack_report = None
+        self.dest_snapshot: Optional[DirectorySnapshot] = None
+        
+        # Runtime-adjustable throttling, shared by all handlers (and by all sessions when passed in)
+        self.rate_limiter = rate_limiter or TokenBucket()
+        self.io_priority = io_priority or IoPriority()
+        for handler in (self.fs_handler, self.mtp_handler):
+            handler.rate_limiter = self.rate_limiter
+            handler.io_priority = self.io_priority
+        self.converter.io_priority = self.io_priority
         
         # Thread-safe communication
         self.msg_queue = queue.Queue()
+        
+        # One long-lived worker thread (warm COM apartment and Shell caches) runs all jobs in order
+        self.service = BackupService()
 
-    def start_backup(self, source: str, dest: str, breadcrumbs: Optional[List[str]] = None, selected_subfolders: Optional[List[str]] = None, skip_live_photos: bool = False):
+    def start_backup(self, source: str, dest: str, breadcrumbs: Optional[List[str]] = None, selected_subfolders: Optional[List[str]] = None, skip_live_photos: bool = False, video_mode: Optional[str] = None, generate_thumbnails: bool = False, organize_by_date: bool = False, mirror_dests: Optional[List[str]] = None, output_mode: str = OUTPUT_MODE_FILES, incremental_root: Optional[str] = None, selection: Optional[SelectionQuery] = None, history_root: Optional[str] = None):
         """
-        Initiates the backup process in a separate thread.
+        Queues a backup job on the backup service thread and returns it.
+        Several backups (e.g. one per phone) can be queued; they run one after another.
         
         Args:
             source: Source path string (filesystem) or initial display string.
@@ -43,23 +77,50 @@ class BackupManager:
             breadcrumbs: List of folder names for MTP navigation (if source is MTP).
             selected_subfolders: List of specific subfolders to backup (whitelist).
             skip_live_photos: If True, tries to identify and skip Live Photo video components (context dependent).
+            video_mode: Optional VIDEO_MODE_REMUX / VIDEO_MODE_TRANSCODE stage run on the copied videos (needs ffmpeg).
+            generate_thumbnails: If True, thumbnails are generated into the shared cache as files land.
+            organize_by_date: If True, files are routed into dest/YYYY/MM by capture time instead of mirroring the source tree.
+            mirror_dests: Extra destination folders that receive the same files, read from the source only once.
+            output_mode: OUTPUT_MODE_FILES (one file each) or OUTPUT_MODE_PACK (large indexed .tar volumes, see PackReader).
+            incremental_root: If set (MTP only), device folders unchanged since the last backup into this root are skipped.
+            selection: Optional date range / media type / size filter, applied while enumerating the source.
+            history_root: Where the last successful run time is kept for "newer than last backup" (defaults to dest).
         """
-        if self.is_running: return
-        
         self.is_running = True
-        self.total_files = 0
-        self.total_bytes = 0
-        self.failed_files = []
-        self.start_time = time.time()
-        
-        thread = threading.Thread(target=self.run_backup, args=(source, dest, breadcrumbs, selected_subfolders, skip_live_photos), daemon=True)
-        thread.start()
+        return self.service.submit(self.run_backup, source, dest, breadcrumbs, selected_subfolders, skip_live_photos, video_mode, generate_thumbnails, organize_by_date, mirror_dests, output_mode, incremental_root, selection, history_root, name=f"backup to {dest}")
 
     def stop_backup(self):
-        """Signals the running backup process to stop."""
+        """Signals the running backup process to stop and drops queued jobs."""
         self.is_running = False
+        cancelled = self.service.cancel_pending()
+        if cancelled: logger.info(f"Cancelled {cancelled} queued jobs")
         self.fs_handler.stop()
         self.mtp_handler.stop()
+        self.converter.stop()
+        self.video_processor.stop()
+        self.thumbnailer.stop()
+        self.verifier.stop()
+
+    def set_bandwidth_limit(self, bytes_per_second: Optional[float]):
+        """Limits copy throughput (None = unlimited). Safe to call while a backup is running."""
+        self.rate_limiter.set_rate(bytes_per_second)
+
+    def set_cpu_share(self, share: float):
+        """Limits conversion workers to a fraction of wall time (1.0 = unlimited)."""
+        self.converter.cpu_limiter.set_share(share)
+
+    def set_schedule_policy(self, policy: str):
+        """Sets the transfer order policy (see SCHEDULE_POLICIES) used by the next run."""
+        if policy not in SCHEDULE_POLICIES:
+            raise ValueError(f"Unknown schedule policy: {policy}")
+        self.fs_handler.schedule_policy = policy
+        self.mtp_handler.schedule_policy = policy
+
+    def set_background_mode(self, enabled: bool):
+        """Low OS priority for copy/conversion threads plus a reduced CPU share for conversion."""
+        self.io_priority.set_low(enabled)
+        self.set_cpu_share(BACKGROUND_CPU_SHARE if enabled else 1.0)
+        logger.info(f"Background mode {'enabled' if enabled else 'disabled'}")
 
     def update_status(self, text: str):
         """
@@ -72,71 +133,144 @@ class BackupManager:
             self.status_callback("status", text)
         logger.info(text)
 
-    def run_backup(self, source_str: str, dest: str, breadcrumbs: Optional[List[str]], selected_subfolders: Optional[List[str]], skip_live_photos: bool):
+    def run_backup(self, source_str: str, dest: str, breadcrumbs: Optional[List[str]], selected_subfolders: Optional[List[str]], skip_live_photos: bool, video_mode: Optional[str] = None, generate_thumbnails: bool = False, organize_by_date: bool = False, mirror_dests: Optional[List[str]] = None, output_mode: str = OUTPUT_MODE_FILES, incremental_root: Optional[str] = None, selection: Optional[SelectionQuery] = None, history_root: Optional[str] = None):
         """
-        Main backup execution logic (threaded).
+        Main backup execution logic (runs on the backup service thread).
         Determines whether to use MTP (Shell) or FileSystem handler based on inputs.
         """
-        pythoncom.CoInitialize()
+        self.is_running = True
+        self.total_files = 0
+        self.total_bytes = 0
+        self.failed_files = FailureLog()
+        self.video_report = None
+        self.thumbnail_report = None
+        self.mirror_report = None
+        self.pack_report = None
+        self.start_time = time.time()
         
         self.update_status("Scanning files...")
+        fanout = None
+        packer = None
+        manifest = None
+        thumbnails_started = False
+        failure_manifest = FailureManifest(source_str, dest, breadcrumbs, organize_by_date)
+        self.fs_handler.failure_manifest = failure_manifest
+        self.mtp_handler.failure_manifest = failure_manifest
         
         try:
+            # The destination is never walked: the snapshot records only this run's landings, so its
+            # footprint follows the run, not the library, and later phases (HEIC check, conversion,
+            # video stage) never act on files from earlier backups (dest is the whole library when organizing by date)
+            self.dest_snapshot = DirectorySnapshot(dest)
+            
+            if generate_thumbnails:
+                self.thumbnailer.start()
+                thumbnails_started = True
+                self.fs_handler.landed_callback = self.thumbnailer.submit
+                self.mtp_handler.landed_callback = self.thumbnailer.submit
+            else:
+                self.fs_handler.landed_callback = None
+                self.mtp_handler.landed_callback = None
+            
+            organizer = DateOrganizer(dest) if organize_by_date else None
+            self.fs_handler.organizer = organizer
+            self.mtp_handler.organizer = organizer
+            
+            # Packed output: files are appended to indexed .tar volumes instead of written one by one
+            packer = PackWriter(dest) if output_mode == OUTPUT_MODE_PACK else None
+            self.fs_handler.packer = packer
+            self.mtp_handler.packer = packer
+            shell_dest = os.path.join(dest, PACK_STAGING_DIRNAME) if packer else dest
+            
+            # Size and sha256 of every file written, for later verification (packs carry their own index)
+            manifest = BackupManifest(dest) if not packer else None
+            for component in (self.fs_handler, self.mtp_handler, self.video_processor):
+                component.manifest = manifest
+            if packer and (mirror_dests or generate_thumbnails or video_mode):
+                logger.info("Packed output: mirror, thumbnail and video stages only apply to loose files and are skipped")
+            
+            # Mirrors get the same relative layout as dest; a failing mirror never stops the backup
+            fanout = FanOutWriter(mirror_dests) if mirror_dests and not packer else None
+            self.fs_handler.fanout = fanout
+            self.mtp_handler.fanout = fanout
+            
+            # Filters are evaluated during enumeration, so excluded files are never planned or copied
+            if selection:
+                selection.resolve_last_run(history_root or dest)
+                logger.info(f"Selection: {selection.describe()}")
+            self.fs_handler.selection = selection
+            self.mtp_handler.selection = selection
+            
             if breadcrumbs:
                 # MTP / Shell Mode
-                logger.info(f"Acquiring Shell Object using breadcrumbs: {breadcrumbs}")
-                shell = win32com.client.Dispatch("Shell.Application")
-                current_folder = shell.NameSpace(SSF_DESKTOP)
-                
-                for name in breadcrumbs:
-                    target_name = self.mtp_handler.normalize_name(name)
-                    current_title = self.mtp_handler.normalize_name(current_folder.Title)
-                    
-                    if target_name == current_title: continue
-                    if target_name == "Desktop" and current_title == "Desktop": continue
-                        
-                    logger.debug(f"Looking for: '{target_name}' in '{current_title}'")
-                    found_sub = False
-                    
-                    try:
-                        my_computer = shell.NameSpace(SSF_DRIVES)
-                        if self.mtp_handler.normalize_name(my_computer.Title) == target_name:
-                            current_folder = my_computer
-                            found_sub = True
-                    except: pass
-
-                    if not found_sub:
-                        items = current_folder.Items()
-                        for item in items:
-                            if self.mtp_handler.normalize_name(item.Name) == target_name:
-                                if item.IsFolder:
-                                    current_folder = item.GetFolder
-                                    found_sub = True
-                                    break
-                    
-                    if not found_sub:
-                        raise Exception(f"Could not navigate to '{name}'")
-                
-                self.mtp_handler.backup_shell_mode(current_folder, dest, selected_subfolders, skip_live_photos)
+                current_folder = self._resolve_breadcrumbs(breadcrumbs)
+                self.mtp_handler.shell = self.service.shell
+                # Fingerprints live in the backup root so they follow the backup set, not the dated run folder
+                fingerprints = FolderFingerprints(incremental_root) if incremental_root else None
+                self.mtp_handler.fingerprints = fingerprints
+                # Types of extensionless items also follow the backup set, so later runs skip the header reads
+                content_types = ContentTypeCache(history_root or dest)
+                self.mtp_handler.content_types = content_types
+                try:
+                    self.mtp_handler.backup_shell_mode(current_folder, shell_dest, selected_subfolders, skip_live_photos, self.dest_snapshot, "/".join(breadcrumbs))
+                finally:
+                    self.mtp_handler.fingerprints = None
+                    self.mtp_handler.content_types = None
+                    content_types.save()
+                    if content_types.sniffed: logger.info(f"Identified {content_types.sniffed} extensionless items by their header")
+                    if fingerprints:
+                        fingerprints.save()
+                        logger.info(f"Skipped {fingerprints.skipped} unchanged folders")
                 self.failed_files.extend(self.mtp_handler.failed_files)
 
             else:
                 # Standard File System Mode
-                self.fs_handler.backup_standard_mode(source_str, dest, self.total_bytes, self.start_time)
+                self.fs_handler.backup_standard_mode(source_str, dest, self.total_bytes, self.start_time, self.dest_snapshot)
                 self.failed_files.extend(self.fs_handler.failed_files)
             
-            # Generate Failure Report
-            if self.failed_files:
-                report_path = os.path.join(dest, "failed_files.txt")
-                try:
-                    with open(report_path, "w", encoding="utf-8") as f:
-                        f.write(f"Backup Failure Report - {time.strftime('%Y-%m-%d %H:%M:%S')}\n")
-                        f.write("="*50 + "\n\n")
-                        for name, error in self.failed_files:
-                            f.write(f"File: {name}\nError: {error}\n" + "-"*30 + "\n")
-                    logger.info(f"Failure report generated at: {report_path}")
-                except Exception as report_err:
-                    logger.error(f"Failed to create failure report: {report_err}")
+            if fanout:
+                self.update_status("Flushing mirror destinations...")
+                self.mirror_report = fanout.finish()
+                self.failed_files.extend(fanout.failed_files)
+                fanout = None
+            
+            if packer:
+                packer.close()
+                self.pack_report = {"files": packer.files_packed, "bytes": packer.bytes_packed}
+                logger.info(f"Packed {packer.files_packed} files ({packer.bytes_packed} bytes) into {dest}")
+                packer = None
+                # Only empty folders (and cleaned-up partials) remain in the MTP staging area
+                shutil.rmtree(shell_dest, ignore_errors=True)
+            
+            if organizer:
+                organizer.save()
+                logger.info(f"Date organizer: {organizer.parsed} headers parsed, {organizer.cache_hits} cache hits")
+            
+            if generate_thumbnails:
+                copy_seconds = max(time.time() - self.start_time, 1e-6)
+                self.thumbnail_report = self.thumbnailer.finish()
+                thumbnails_started = False
+                self.thumbnail_report["copy_overhead_percent"] = 100.0 * self.thumbnail_report["copy_stall_seconds"] / copy_seconds
+                logger.info(f"Thumbnail stage cost {self.thumbnail_report['copy_overhead_percent']:.1f}% of copy time")
+            
+            # Optional video stage (skips itself when ffmpeg is not installed)
+            if video_mode and self.is_running and output_mode != OUTPUT_MODE_PACK:
+                self.video_report = self.video_processor.process_folder(dest, video_mode, snapshot=self.dest_snapshot)
+                self.failed_files.extend(self.video_processor.failed_files)
+            
+            # Generate Failure Report (plus its machine-readable manifest for retry_failed)
+            self._write_failure_report(dest)
+            if output_mode != OUTPUT_MODE_PACK:
+                failure_manifest.save()
+            elif self.failed_files:
+                # Retry writes loose files, which would not end up in the volumes or their index
+                logger.info("Packed output: failed files are listed in failed_files.txt only; run the backup again to pick them up")
+
+            if selection:
+                logger.info(f"Selection excluded {selection.excluded} files and {selection.pruned_folders} folders")
+            if self.is_running:
+                # Start time, not end time: files changed during this run are picked up next time
+                SelectionQuery.record_run(history_root or dest, self.start_time)
 
             if self.status_callback:
                 self.status_callback("finish", True)
@@ -148,39 +282,199 @@ class BackupManager:
             if self.status_callback:
                 self.status_callback("finish", False)
         finally:
-            self.is_running = False
-            pythoncom.CoUninitialize()
+            if thumbnails_started: self.thumbnailer.finish() # Error or stop: still join the generator threads
+            if fanout: fanout.finish()
+            if packer: packer.close()
+            if manifest: manifest.close()
+            for component in (self.fs_handler, self.mtp_handler, self.video_processor):
+                component.manifest = None
+            self.fs_handler.packer = None
+            self.mtp_handler.packer = None
+            self.fs_handler.fanout = None
+            self.mtp_handler.fanout = None
+            self.fs_handler.selection = None
+            self.mtp_handler.selection = None
+            self.fs_handler.failure_manifest = None
+            self.mtp_handler.failure_manifest = None
+            self.is_running = self.service.pending() > 0 # More queued jobs keep the manager busy
+
+    def _write_failure_report(self, dest: str):
+        """Writes failed_files.txt to dest, or removes a stale one when nothing failed."""
+        report_path = os.path.join(dest, "failed_files.txt")
+        if not self.failed_files:
+            if os.path.exists(report_path): os.remove(report_path)
+            return
+        try:
+            with open(report_path, "w", encoding="utf-8") as f:
+                f.write(f"Backup Failure Report - {time.strftime('%Y-%m-%d %H:%M:%S')}\n")
+                f.write("="*50 + "\n\n")
+                for name, error in self.failed_files:
+                    f.write(f"File: {name}\nError: {error}\n" + "-"*30 + "\n")
+            logger.info(f"Failure report generated at: {report_path}")
+        except Exception as report_err:
+            logger.error(f"Failed to create failure report: {report_err}")
+
+    def retry_failed(self, dest: str):
+        """
+        Queues a run that copies only the files listed in the failure manifest of a backup folder
+        (see FailureManifest), instead of re-walking the whole source. Finishes with ("finish", success).
+        Packed backups (OUTPUT_MODE_PACK) keep no failure manifest and are rejected with ("finish", False).
+        """
+        self.is_running = True
+        return self.service.submit(self._run_retry, dest, name=f"retry failed in {dest}")
+
+    def _run_retry(self, dest: str):
+        self.is_running = True
+        self.failed_files = FailureLog()
+        self.start_time = time.time()
+        manifest = None
+        organizer = None
+        try:
+            previous = FailureManifest.load(dest)
+            if previous is None and os.path.exists(os.path.join(dest, PACK_INDEX_FILENAME)):
+                self.update_status("Packed backups cannot be retried; run the backup again to the same destination.")
+                if self.status_callback: self.status_callback("finish", False)
+                return
+            if not previous or not previous.items:
+                self.update_status("No failed files to retry.")
+                if self.status_callback: self.status_callback("finish", True)
+                return
+            total = len(previous)
+            self.update_status(f"Retrying {total} failed files...")
+            
+            self.dest_snapshot = DirectorySnapshot(dest) # This run's landings only, as in run_backup
+            remaining = FailureManifest(previous.source, dest, previous.breadcrumbs, previous.organize_by_date)
+            organizer = DateOrganizer(dest) if previous.organize_by_date else None
+            manifest = BackupManifest(dest)
+            for handler in (self.fs_handler, self.mtp_handler):
+                handler.manifest = manifest
+                handler.failure_manifest = remaining
+                handler.landed_callback = None
+            # Filesystem records carry their final (already dated) destination; MTP items are routed after landing.
+            # Both go through the organizer so a retried file never overwrites a namesake in its year/month folder.
+            self.fs_handler.organizer = organizer
+            self.mtp_handler.organizer = organizer
+            
+            mtp_records = [record for record in previous.items if record["kind"] == SOURCE_MTP]
+            fs_records = [record for record in previous.items if record["kind"] == SOURCE_FS]
+            if mtp_records:
+                source_folder = self._resolve_breadcrumbs(previous.breadcrumbs)
+                self.mtp_handler.shell = self.service.shell
+                self.mtp_handler.content_types = ContentTypeCache(dest)
+                try:
+                    self.mtp_handler.retry_failed(source_folder, mtp_records, dest, self.dest_snapshot)
+                finally:
+                    self.mtp_handler.content_types.save()
+                    self.mtp_handler.content_types = None
+                self.failed_files.extend(self.mtp_handler.failed_files)
+            if fs_records:
+                self.fs_handler.retry_failed(fs_records, previous.source, dest, self.dest_snapshot)
+                self.failed_files.extend(self.fs_handler.failed_files)
+            if organizer: organizer.save()
+            
+            self._write_failure_report(dest)
+            remaining.save()
+            self.update_status(f"Retry complete: {total - len(remaining)} of {total} files recovered.")
+            if self.status_callback: self.status_callback("finish", True)
+        except Exception as e:
+            logger.error(f"Retry Error: {e}")
+            self.update_status(f"Error: {e}")
+            self.failed_files.append(("General Error", str(e)))
+            if self.status_callback: self.status_callback("finish", False)
+        finally:
+            if manifest: manifest.close()
+            for handler in (self.fs_handler, self.mtp_handler):
+                handler.manifest = None
+                handler.failure_manifest = None
+            self.fs_handler.organizer = None
+            self.mtp_handler.organizer = None
+            self.is_running = self.service.pending() > 0 # More queued jobs keep the manager busy
+
+    def _resolve_breadcrumbs(self, breadcrumbs: List[str]):
+        """Navigates the Shell namespace to the MTP folder named by breadcrumbs (cached across jobs)."""
+        key = tuple(breadcrumbs)
+        cached = self.service.cached_folder(key)
+        if cached is not None:
+            logger.info(f"Reusing Shell folder for breadcrumbs: {breadcrumbs}")
+            return cached
+        
+        logger.info(f"Acquiring Shell Object using breadcrumbs: {breadcrumbs}")
+        shell = self.service.shell
+        current_folder = shell.NameSpace(SSF_DESKTOP)
+        
+        for name in breadcrumbs:
+            target_name = self.mtp_handler.normalize_name(name)
+            current_title = self.mtp_handler.normalize_name(current_folder.Title)
+
+            if target_name == current_title: continue
+            if target_name == "Desktop" and current_title == "Desktop": continue
+
+            logger.debug(f"Looking for: '{target_name}' in '{current_title}'")
+            found_sub = False
+
+            try:
+                my_computer = shell.NameSpace(SSF_DRIVES)
+                if self.mtp_handler.normalize_name(my_computer.Title) == target_name:
+                    current_folder = my_computer
+                    found_sub = True
+            except: pass
+
+            if not found_sub:
+                items = current_folder.Items()
+                for item in items:
+                    if self.mtp_handler.normalize_name(item.Name) == target_name:
+                        if item.IsFolder:
+                            current_folder = item.GetFolder
+                            found_sub = True
+                            break
+
+            if not found_sub:
+                raise Exception(f"Could not navigate to '{name}'")
+
+        self.service.cache_folder(key, current_folder)
+        return current_folder
+
+    def get_snapshot(self, folder: str) -> DirectorySnapshot:
+        """
+        Returns the snapshot of the last run's landings if it covers folder, otherwise scans the
+        media files of folder once (e.g. converting a folder that was not just backed up).
+        """
+        if self.dest_snapshot and self.dest_snapshot.covers(folder):
+            return self.dest_snapshot
+        self.dest_snapshot = DirectorySnapshot.scan(folder, ALLOWED_EXTENSIONS)
+        return self.dest_snapshot
+
+    def has_files_with_ext(self, folder: str, ext: str) -> bool:
+        """Cheap check (no filesystem walk after a backup) whether folder contains files with ext."""
+        snapshot = self.get_snapshot(folder)
+        if snapshot.root == os.path.abspath(folder):
+            return snapshot.has_ext(ext)
+        return any(True for _ in snapshot.iter_files({ext.lower()}, under=folder))
 
     def scan_and_convert_heic(self, dest_folder: str):
         """
         Scans the destination folder for HEIC files and converts them to JPG depending on user settings.
-        This runs as a secondary threaded process after backup completion.
+        This is queued on the backup service thread, after any backup still running.
         
         Args:
             dest_folder: The folder to scan recursively.
         """
-        if self.is_running: return
         self.is_running = True
-        
-        thread = threading.Thread(target=self._run_conversion, args=(dest_folder,), daemon=True)
-        thread.start()
+        return self.service.submit(self._run_conversion, dest_folder, name=f"convert {dest_folder}")
 
     def _run_conversion(self, dest_folder: str):
         """
         Internal worker method for HEIC conversion.
-        Iterates over files, converts using PIL/pillow_heif, and deletes originals.
+        Scans for HEIC files and hands them to the HeicConverter worker pool.
         """
+        self.is_running = True
         try:
-            heic_files = []
             self.update_status("Scanning for HEIC files...")
             
-            # 1. Scan
-            for root, dirs, files in os.walk(dest_folder):
-                for file in files:
-                    if file.lower().endswith('.heic'):
-                        heic_files.append(os.path.join(root, file))
-            
-            total = len(heic_files)
+            # 1. Scan (reuses the snapshot from the backup run when it covers this folder)
+            snapshot = self.get_snapshot(dest_folder)
+            heic_files = (entry.path for entry in snapshot.iter_files({'.heic'}, under=dest_folder))
+            total = sum(1 for _ in snapshot.iter_files({'.heic'}, under=dest_folder))
             if total == 0:
                 self.update_status("No HEIC files found.")
                 if self.status_callback: self.status_callback("conversion_finish", True)
@@ -188,55 +482,13 @@ class BackupManager:
 
             self.update_status(f"Found {total} HEIC files. Starting conversion...")
             
-            # 2. Convert
-            converted_count = 0
-            for i, heic_path in enumerate(heic_files):
-                if not self.is_running: break
-                
-                try:
-                    # Create JPG path
-                    jpg_path = os.path.splitext(heic_path)[0] + ".jpg"
-                    
-                    # Convert only if JPG doesn't exist (avoid overwriting existing if user had both)
-                    if not os.path.exists(jpg_path):
-                        self.update_status(f"Converting ({i+1}/{total}): {os.path.basename(heic_path)}")
-                        
-                        # Open HEIC
-                        heif_file = pillow_heif.read_heif(heic_path)
-                        image = Image.frombytes(
-                            heif_file.mode, 
-                            heif_file.size, 
-                            heif_file.data,
-                            "raw",
-                            heif_file.mode,
-                            heif_file.stride,
-                        )
-                        
-                        # Save as JPG
-                        image.save(jpg_path, "JPEG", quality=90)
-                        converted_count += 1
-                        
-                        # DELETE ORIGINAL
-                        try:
-                            os.remove(heic_path)
-                            logger.info(f"Deleted original: {heic_path}")
-                        except Exception as del_err:
-                            logger.error(f"Failed to delete original {heic_path}: {del_err}")
-
-                        # Update Progress
-                        if self.status_callback:
-                            self.status_callback("progress", (i + 1) / total)
-                    else:
-                        logger.info(f"JPG already exists for {heic_path}, skipping conversion.")
-                        # If JPG exists, do we delete HEIC? 
-                        # User logic implies they want to replace it.
-                        # Safe approach: If user ran this again, and JPG exists, maybe they expect HEIC gone.
-                        # Let's delete it if the JPG is valid. But to be safe, maybe just skip for now unless explicit.
-                        # Sticking to: Only delete if WE just converted it.
-                        pass
-                        
-                except Exception as e:
-                    logger.error(f"Failed to convert {heic_path}: {e}")
+            # 2. Convert (keeping the backup manifest in sync when the folder has one)
+            self.converter.manifest = BackupManifest(dest_folder) if BackupManifest.exists(dest_folder) else None
+            try:
+                converted_count = self.converter.convert_files(heic_files, journal_root=dest_folder, snapshot=snapshot, total=total)
+            finally:
+                if self.converter.manifest: self.converter.manifest.close()
+                self.converter.manifest = None
             
             self.update_status(f"Conversion complete. Converted {converted_count} files.")
             if self.status_callback: self.status_callback("conversion_finish", True)
@@ -246,4 +498,27 @@ class BackupManager:
             self.update_status(f"Error during conversion: {e}")
             if self.status_callback: self.status_callback("conversion_finish", False)
         finally:
-            self.is_running = False
+            self.is_running = self.service.pending() > 0 # More queued jobs keep the manager busy
+
+    def verify_backup(self, folder: str, resume: bool = True):
+        """
+        Queues a re-hash of a backup folder against its manifest on the backup service thread.
+        Reports through the status callback and finishes with ("verify_finish", report).
+        """
+        self.is_running = True
+        return self.service.submit(self._run_verify, folder, resume, name=f"verify {folder}")
+
+    def _run_verify(self, folder: str, resume: bool):
+        self.is_running = True
+        self.verify_report = None
+        try:
+            self.verify_report = self.verifier.verify(folder, resume)
+            self.failed_files = FailureLog()
+            self.failed_files.extend(self.verifier.failed_files)
+            if self.status_callback: self.status_callback("verify_finish", self.verify_report)
+        except Exception as e:
+            logger.error(f"Verify error: {e}")
+            self.update_status(f"Error during verify: {e}")
+            if self.status_callback: self.status_callback("verify_finish", None)
+        finally:
+            self.is_running = self.service.pending() > 0 # More queued jobs keep the manager busy
@@ -0,0 +1,89 @@
+import os
+import json
+import hashlib
+import threading
+from typing import Dict, Optional, Tuple
+from ..utils.constants import MANIFEST_FILENAME, VERIFY_READ_SIZE
+from ..utils.logger import setup_logger
+from .cancellation import CancellationToken
+
+logger = setup_logger("BackupManifest")
+
+def hash_file(path: str, read_size: int = VERIFY_READ_SIZE, cancel_token: Optional[CancellationToken] = None) -> str:
+    """sha256 of the file at path, read in large sequential chunks (raises OperationCancelled if cancel_token is cancelled)."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while True:
+            if cancel_token: cancel_token.check()
+            buf = f.read(read_size)
+            if not buf: break
+            digest.update(buf)
+    return digest.hexdigest()
+
+class BackupManifest:
+    """
+    Append-only JSONL record of what a backup folder should contain: relative path,
+    size and sha256 per file. Later lines win, and {"path", "deleted"} lines drop a file
+    (e.g. an original replaced by conversion). Read back with BackupManifest.load().
+    """
+    def __init__(self, root: str):
+        self.root = os.path.abspath(root)
+        self.path = os.path.join(self.root, MANIFEST_FILENAME)
+        self._lock = threading.Lock()
+        self._handle = open(self.path, "a", encoding="utf-8")
+
+    def _rel(self, path: str) -> str:
+        return os.path.relpath(os.path.abspath(path), self.root).replace(os.sep, "/")
+
+    def _write(self, record: dict):
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock:
+            if not self._handle: return
+            self._handle.write(line)
+            self._handle.flush()
+
+    def record(self, path: str, size: Optional[int] = None, sha256: Optional[str] = None):
+        """Records a file that landed; hashes it (read-back) when sha256 is not already known."""
+        try:
+            if size is None:
+                size = os.path.getsize(path)
+            if sha256 is None:
+                sha256 = hash_file(path)
+        except OSError as e:
+            logger.error(f"Could not add {path} to manifest: {e}")
+            return
+        self._write({"path": self._rel(path), "size": size, "sha256": sha256})
+
+    def remove(self, path: str):
+        self._write({"path": self._rel(path), "deleted": True})
+
+    def close(self):
+        with self._lock:
+            if not self._handle: return
+            self._handle.flush()
+            os.fsync(self._handle.fileno())
+            self._handle.close()
+            self._handle = None
+
+    @staticmethod
+    def exists(root: str) -> bool:
+        return os.path.exists(os.path.join(root, MANIFEST_FILENAME))
+
+    @staticmethod
+    def load(root: str) -> Dict[str, Tuple[int, str]]:
+        """Returns {relative path: (size, sha256)} for the files the manifest says should exist."""
+        entries: Dict[str, Tuple[int, str]] = {}
+        path = os.path.join(root, MANIFEST_FILENAME)
+        if not os.path.exists(path):
+            return entries
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue # Torn last line after a crash
+                if record.get("deleted"):
+                    entries.pop(record["path"], None)
+                else:
+                    entries[record["path"]] = (record["size"], record["sha256"])
+        return entries
@@ -0,0 +1,150 @@
+import queue
+import itertools
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import win32com.client
+import pythoncom
+from ..utils.logger import setup_logger
+
+logger = setup_logger("BackupService")
+
+# Job states
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+JOB_CANCELLED = "cancelled"
+
+class BackupJob:
+    """A unit of work queued on the BackupService."""
+    def __init__(self, job_id: int, name: str, func: Callable, args: tuple, kwargs: dict):
+        self.id = job_id
+        self.name = name
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.state = JOB_QUEUED
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.done = threading.Event()
+        self._callbacks: List[Callable[["BackupJob"], None]] = []
+        self._lock = threading.Lock()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self.done.wait(timeout)
+
+    def add_done_callback(self, callback: Callable[["BackupJob"], None]):
+        """Calls callback(job) once the job finished or was cancelled (right away if it already has)."""
+        with self._lock:
+            if not self.done.is_set():
+                self._callbacks.append(callback)
+                return
+        callback(self)
+
+    def _finish(self, state: str):
+        with self._lock:
+            self.state = state
+            self.done.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback(self)
+            except Exception as e:
+                logger.error(f"Job #{self.id} done callback failed: {e}")
+
+class BackupService:
+    """
+    Long-lived worker thread that runs backup, conversion and verify jobs one after another.
+    The thread initializes its COM apartment once and keeps the Shell.Application object and
+    resolved Shell folders warm across jobs, so backing up several phones in a row does not
+    pay the setup cost each time. Shell objects must only be used from jobs on this thread.
+    """
+    def __init__(self):
+        self._queue: "queue.Queue[Optional[BackupJob]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._shell = None
+        self._folder_cache: Dict[Tuple[str, ...], Any] = {}
+        self.current: Optional[BackupJob] = None
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._thread and self._thread.is_alive(): return
+            self._thread = threading.Thread(target=self._run, name="BackupService", daemon=True)
+            self._thread.start()
+
+    def submit(self, func: Callable, *args, name: str = "", **kwargs) -> BackupJob:
+        """Queues func(*args, **kwargs) to run on the service thread and returns its job."""
+        job = BackupJob(next(self._ids), name or func.__name__, func, args, kwargs)
+        self._ensure_started()
+        self._queue.put(job)
+        logger.info(f"Queued job #{job.id} ({job.name}), {self.pending()} waiting")
+        return job
+
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def cancel_pending(self) -> int:
+        """Drops jobs that have not started yet; returns how many were cancelled."""
+        cancelled = 0
+        while True:
+            try:
+                job = self._queue.get_nowait()
+            except queue.Empty:
+                return cancelled
+            if job is None:
+                self._queue.put(None) # Keep a pending shutdown request
+                return cancelled
+            job._finish(JOB_CANCELLED)
+            cancelled += 1
+
+    def shutdown(self, wait: bool = True):
+        self._queue.put(None)
+        if wait and self._thread:
+            self._thread.join()
+
+    @property
+    def shell(self):
+        """Shell.Application for the service thread, created once."""
+        if self._shell is None:
+            self._shell = win32com.client.Dispatch("Shell.Application")
+        return self._shell
+
+    def cached_folder(self, key: Tuple[str, ...]):
+        """A previously resolved Shell folder, or None if it is unknown or went stale (device unplugged)."""
+        folder = self._folder_cache.get(key)
+        if folder is None: return None
+        try:
+            folder.Title # Cheap liveness probe
+            return folder
+        except Exception:
+            self._folder_cache.pop(key, None)
+            return None
+
+    def cache_folder(self, key: Tuple[str, ...], folder):
+        self._folder_cache[key] = folder
+
+    def _run(self):
+        pythoncom.CoInitialize()
+        try:
+            while True:
+                job = self._queue.get()
+                if job is None: return
+                self.current = job
+                job.state = JOB_RUNNING
+                state = JOB_FAILED
+                try:
+                    job.result = job.func(*job.args, **job.kwargs)
+                    state = JOB_DONE
+                except Exception as e:
+                    # Jobs report their own errors; this only keeps the service alive
+                    logger.error(f"Job #{job.id} ({job.name}) failed: {e}")
+                    job.error = str(e)
+                finally:
+                    self.current = None
+                    job._finish(state)
+        finally:
+            self._shell = None
+            self._folder_cache.clear()
+            pythoncom.CoUninitialize()
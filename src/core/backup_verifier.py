@@ -0,0 +1,206 @@
+import os
+import json
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+from ..utils.constants import (
+    ALLOWED_EXTENSIONS,
+    PACK_INDEX_FILENAME,
+    VERIFY_PROGRESS_FILENAME,
+    VERIFY_REPORT_FILENAME,
+    VERIFY_READ_SIZE,
+    VERIFY_READERS
+)
+from ..utils.logger import setup_logger
+from ..utils.storage_info import detect_storage_kind
+from .dir_scanner import iter_scan
+from .backup_manifest import BackupManifest, hash_file
+from .pack_archive import PackReader
+from .cancellation import CancellationToken, OperationCancelled
+
+logger = setup_logger("BackupVerifier")
+
+class BackupVerifier:
+    """
+    Re-hashes a backup folder against its manifest and reports missing, corrupt and extra files.
+    Reader threads are sized to the storage type (one for spinning disks, several for SSD/network),
+    files are hashed with large sequential reads in path order, and finished checks are appended
+    to a progress file so an interrupted verify resumes where it stopped.
+    """
+    def __init__(self, status_callback: Optional[Callable] = None, workers: Optional[int] = None):
+        self.status_callback = status_callback
+        self.workers = workers
+        self.is_running = False
+        self.cancel_token = CancellationToken()
+        self.failed_files: List[Tuple[str, str]] = []
+        self.report: Optional[dict] = None
+        self._lock = threading.Lock()
+
+    def update_status(self, text: str):
+        """Status callback wrapper."""
+        if self.status_callback:
+            self.status_callback("status", text)
+        logger.info(text)
+
+    def stop(self):
+        self.is_running = False
+        self.cancel_token.cancel()
+
+    def verify(self, root: str, resume: bool = True) -> dict:
+        """
+        Verifies root and writes VERIFY_REPORT_FILENAME there when problems are found.
+        Returns a report dict with counts, throughput and the storage/reader settings used.
+        """
+        self.is_running = True
+        self.cancel_token = CancellationToken()
+        self.failed_files = []
+        root = os.path.abspath(root)
+        start = time.time()
+
+        manifest = BackupManifest.load(root)
+        has_pack = os.path.exists(os.path.join(root, PACK_INDEX_FILENAME))
+        if not manifest and not has_pack:
+            raise Exception(f"No backup manifest found in {root}")
+
+        self.update_status("Scanning backup folder...")
+        on_disk: Dict[str, int] = {}
+        for dir_path, entry in iter_scan(root, ALLOWED_EXTENSIONS, lambda: self.is_running):
+            on_disk[os.path.relpath(entry.path, root).replace(os.sep, "/")] = entry.size
+
+        missing = sorted(rel for rel in manifest if rel not in on_disk)
+        extra = sorted(rel for rel in on_disk if rel not in manifest)
+        corrupt: List[Tuple[str, str]] = []
+        to_hash = []
+        for rel in sorted(manifest):
+            if rel not in on_disk: continue
+            size, sha256 = manifest[rel]
+            if on_disk[rel] != size:
+                corrupt.append((rel, f"Size mismatch (expected {size}, found {on_disk[rel]})"))
+            else:
+                to_hash.append((rel, size, sha256))
+        size_mismatches = len(corrupt)
+
+        progress_path = os.path.join(root, VERIFY_PROGRESS_FILENAME)
+        done = self._load_progress(progress_path) if resume else {}
+        pending = []
+        for rel, size, sha256 in to_hash:
+            previous = done.get(f"{rel}|{size}|{sha256}")
+            if previous is None:
+                pending.append((rel, size, sha256))
+            elif previous:
+                corrupt.append((rel, previous))
+        if len(pending) < len(to_hash):
+            logger.info(f"Resuming: {len(to_hash) - len(pending)} files already verified")
+
+        storage = detect_storage_kind(root)
+        workers = self.workers or VERIFY_READERS.get(storage, VERIFY_READERS["unknown"])
+        total_bytes = sum(size for _, size, _ in pending)
+        self.update_status(f"Verifying {len(pending)} files ({total_bytes / (1024 ** 3):.1f} GB) with {workers} reader(s) on {storage} storage...")
+
+        progress = {"bytes": 0, "files": 0}
+        hash_start = time.time()
+        progress_file = open(progress_path, "a" if resume else "w", encoding="utf-8")
+
+        def check(item):
+            rel, size, sha256 = item
+            if not self.is_running: return None
+            try:
+                actual = hash_file(os.path.join(root, *rel.split("/")), VERIFY_READ_SIZE, self.cancel_token)
+                error = "" if actual == sha256 else "Checksum mismatch"
+            except OperationCancelled:
+                return None # Not recorded, so a resumed verify checks it again
+            except OSError as e:
+                error = f"Read error: {e}"
+            with self._lock:
+                progress_file.write(json.dumps({"key": f"{rel}|{size}|{sha256}", "error": error}) + "\n")
+                progress["bytes"] += size
+                progress["files"] += 1
+                self._report_progress(progress["bytes"], total_bytes, hash_start)
+            return (rel, error) if error else None
+
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                for result in pool.map(check, pending):
+                    if result: corrupt.append(result)
+        finally:
+            progress_file.close()
+
+        # Files verified earlier (resume) or now, minus the ones that failed the hash check
+        ok = len(to_hash) - len(pending) + progress["files"] - (len(corrupt) - size_mismatches)
+
+        if has_pack and self.is_running:
+            self.update_status("Verifying packed archives...")
+            pack = PackReader(root)
+            pack_failures = pack.verify(lambda: self.is_running)
+            corrupt.extend(pack_failures)
+            ok += len(pack.entries) - len(pack_failures)
+
+        completed = self.is_running
+        if completed and os.path.exists(progress_path):
+            os.remove(progress_path)
+
+        seconds = max(time.time() - start, 1e-6)
+        hash_seconds = max(time.time() - hash_start, 1e-6)
+        self.failed_files = [(rel, "Missing") for rel in missing]
+        self.failed_files += [(rel, f"Corrupt: {error}") for rel, error in corrupt]
+        self.failed_files += [(rel, "Extra: not in manifest") for rel in extra]
+        self.report = {
+            "completed": completed,
+            "files_expected": len(manifest),
+            "files_hashed": progress["files"],
+            "ok": ok,
+            "missing": len(missing),
+            "corrupt": len(corrupt),
+            "extra": len(extra),
+            "bytes_hashed": progress["bytes"],
+            "seconds": seconds,
+            "mb_per_second": progress["bytes"] / (1024 * 1024) / hash_seconds,
+            "storage": storage,
+            "workers": workers,
+        }
+        self._write_report(root)
+        self.update_status(
+            f"Verify {'complete' if completed else 'stopped'}: {self.report['missing']} missing, "
+            f"{self.report['corrupt']} corrupt, {self.report['extra']} extra "
+            f"({self.report['mb_per_second']:.1f} MB/s)"
+        )
+        self.is_running = False
+        return self.report
+
+    @staticmethod
+    def _load_progress(progress_path: str) -> Dict[str, str]:
+        done: Dict[str, str] = {}
+        if not os.path.exists(progress_path):
+            return done
+        with open(progress_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                done[record["key"]] = record["error"]
+        return done
+
+    def _report_progress(self, done_bytes: int, total_bytes: int, start_time: float):
+        if not self.status_callback or total_bytes <= 0: return
+        self.status_callback("progress", done_bytes / total_bytes)
+        elapsed = time.time() - start_time
+        if elapsed > 0:
+            self.status_callback("time", f"Verified {done_bytes / (1024 ** 3):.1f} GB at {done_bytes / (1024 * 1024) / elapsed:.1f} MB/s")
+
+    def _write_report(self, root: str):
+        """Writes the problems in the same format as failed_files.txt."""
+        if not self.failed_files: return
+        report_path = os.path.join(root, VERIFY_REPORT_FILENAME)
+        try:
+            with open(report_path, "w", encoding="utf-8") as f:
+                f.write(f"Backup Verify Report - {time.strftime('%Y-%m-%d %H:%M:%S')}\n")
+                f.write(f"Missing: {self.report['missing']}  Corrupt: {self.report['corrupt']}  Extra: {self.report['extra']}  "
+                        f"Throughput: {self.report['mb_per_second']:.1f} MB/s ({self.report['workers']} reader(s), {self.report['storage']})\n")
+                f.write("="*50 + "\n\n")
+                for name, error in self.failed_files:
+                    f.write(f"File: {name}\nError: {error}\n" + "-"*30 + "\n")
+            logger.info(f"Verify report generated at: {report_path}")
+        except Exception as report_err:
+            logger.error(f"Failed to create verify report: {report_err}")
@@ -0,0 +1,53 @@
+import threading
+from typing import Callable, List
+from ..utils.logger import setup_logger
+
+logger = setup_logger("Cancellation")
+
+class OperationCancelled(Exception):
+    """Raised inside a running operation once its CancellationToken was cancelled."""
+
+class CancellationToken:
+    """
+    Stop signal shared by all threads of one run. Chunk loops call check() per chunk and
+    raise OperationCancelled, so the caller's cleanup (partial file removal) runs right away;
+    poll loops wait on the token with sleep() instead of time.sleep(), so a stop wakes them
+    immediately instead of after the poll interval or timeout. Callbacks registered with
+    on_cancel() run once on cancel (e.g. to terminate a child process).
+    """
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks: List[Callable[[], None]] = []
+
+    @property
+    def is_cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self):
+        with self._lock:
+            if self._event.is_set(): return
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                logger.error(f"Cancel callback failed: {e}")
+
+    def check(self):
+        """Raises OperationCancelled if the token was cancelled."""
+        if self._event.is_set():
+            raise OperationCancelled("Cancelled")
+
+    def sleep(self, seconds: float) -> bool:
+        """Waits up to seconds; returns False (right away) if the token is or gets cancelled."""
+        return not self._event.wait(seconds)
+
+    def on_cancel(self, callback: Callable[[], None]):
+        """Runs callback on cancel (immediately if already cancelled)."""
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return
+        callback()
@@ -0,0 +1,121 @@
+import os
+import json
+import threading
+from typing import Dict, Optional, Tuple
+from ..utils.logger import setup_logger
+
+logger = setup_logger("ContentType")
+
+CONTENT_TYPE_CACHE_FILENAME = ".content_types_cache.json"
+CONTENT_SNIFF_BYTES = 4096 # ftyp/JPEG/PNG signatures all sit in the first few bytes
+
+# ISOBMFF brands (major or compatible) mapped to the extension the file is saved with
+HEIF_BRANDS = {b"heic", b"heix", b"heim", b"heis", b"hevc", b"hevx", b"mif1", b"msf1"}
+QUICKTIME_BRANDS = {b"qt  "}
+M4V_BRANDS = {b"M4V ", b"M4VH", b"M4VP"}
+MP4_BRANDS = {b"isom", b"iso2", b"iso4", b"iso5", b"iso6", b"mp41", b"mp42", b"avc1", b"dash", b"MSNV", b"3gp4", b"3gp5"}
+QUICKTIME_ATOMS = {b"moov", b"mdat", b"wide", b"free", b"skip", b"pnot"} # Old .mov files without an ftyp box
+
+# Extensions that are equally correct for a sniffed type
+EXTENSION_ALIASES = {".jpg": {".jpg", ".jpeg"}, ".mp4": {".mp4", ".m4v"}, ".m4v": {".m4v", ".mp4"}}
+
+def _ftyp_brands(head: bytes) -> Tuple[bytes, ...]:
+    """Major brand followed by the compatible brands of a leading ftyp box."""
+    size = int.from_bytes(head[0:4], "big")
+    end = min(max(size, 16), len(head))
+    return (head[8:12],) + tuple(head[pos:pos + 4] for pos in range(16, end - 3, 4))
+
+def sniff_bytes(head: bytes) -> Optional[str]:
+    """Extension (.heic, .jpg, .png, .mov, .mp4, .m4v, .avi) for a file header, or None if it is not a known media type."""
+    if head[:3] == b"\xff\xd8\xff": return ".jpg"
+    if head[:8] == b"\x89PNG\r\n\x1a\n": return ".png"
+    if head[:4] == b"RIFF" and head[8:12] == b"AVI ": return ".avi"
+    if head[4:8] == b"ftyp":
+        brands = _ftyp_brands(head)
+        major = brands[0]
+        if b"avif" in brands and not any(brand in (b"heic", b"heix") for brand in brands): return None # AVIF shares mif1
+        if major in HEIF_BRANDS: return ".heic"
+        if major in QUICKTIME_BRANDS: return ".mov"
+        if major in M4V_BRANDS: return ".m4v"
+        if major in MP4_BRANDS: return ".mp4"
+        # Unusual major brand: decide by the compatible brands
+        if any(brand in HEIF_BRANDS for brand in brands): return ".heic"
+        if any(brand in QUICKTIME_BRANDS for brand in brands): return ".mov"
+        if any(brand in MP4_BRANDS for brand in brands): return ".mp4"
+        return None
+    if head[4:8] in QUICKTIME_ATOMS: return ".mov"
+    return None
+
+def extension_matches(sniffed: str, ext: str) -> bool:
+    """True if a file named with ext is correctly named for the sniffed type (e.g. .jpeg for .jpg)."""
+    return ext.lower() in EXTENSION_ALIASES.get(sniffed, {sniffed})
+
+def sniff_file(path: str) -> Optional[str]:
+    """Reads the first CONTENT_SNIFF_BYTES of path and identifies its media type (see sniff_bytes)."""
+    try:
+        with open(path, "rb") as f:
+            return sniff_bytes(f.read(CONTENT_SNIFF_BYTES))
+    except OSError as e:
+        logger.debug(f"Could not sniff {path}: {e}")
+        return None
+
+class ContentTypeCache:
+    """
+    Media types of extensionless device items, detected from the landed file's header and
+    cached by item identity (device folder path, name, size) in a JSON file under root.
+    Enumeration of later runs uses the cached type instead of reading Shell properties;
+    an empty string marks an item that turned out not to be media.
+    """
+    def __init__(self, root: str):
+        self.root = root
+        self.cache_path = os.path.join(root, CONTENT_TYPE_CACHE_FILENAME)
+        self.cache: Dict[str, str] = {}
+        self.sniffed = 0
+        self._dirty = False
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.cache_path): return
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                self.cache = json.load(f)
+        except Exception as e:
+            logger.error(f"Failed to read content type cache: {e}")
+            self.cache = {}
+
+    def save(self):
+        """Persists the cache (atomic replace)."""
+        with self._lock:
+            if not self._dirty: return
+            tmp_path = self.cache_path + ".part"
+            try:
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(self.cache, f)
+                os.replace(tmp_path, self.cache_path)
+                self._dirty = False
+            except Exception as e:
+                logger.error(f"Failed to save content type cache: {e}")
+
+    @staticmethod
+    def key(folder_parts: Tuple[str, ...], name: str, size: int) -> str:
+        return f"{'/'.join(folder_parts)}/{name}|{size}".lower()
+
+    def lookup(self, key: str) -> Optional[str]:
+        """Cached extension for an item ("" = not media), or None if it was never sniffed."""
+        with self._lock:
+            return self.cache.get(key)
+
+    def detect(self, key: str, path: str) -> Optional[str]:
+        """Sniffs a landed file and caches the result for its item; returns the extension, "" if it is not media, or None if unreadable."""
+        try:
+            with open(path, "rb") as f:
+                ext = sniff_bytes(f.read(CONTENT_SNIFF_BYTES))
+        except OSError as e:
+            logger.debug(f"Could not sniff {path}: {e}")
+            return None # Not cached: an unreadable file says nothing about the item
+        self.sniffed += 1
+        with self._lock:
+            self.cache[key] = ext or ""
+            self._dirty = True
+        return ext or ""
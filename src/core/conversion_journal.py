@@ -0,0 +1,73 @@
+import os
+import json
+import threading
+from typing import Dict, Optional
+from ..utils.logger import setup_logger
+
+logger = setup_logger("ConversionJournal")
+
+JOURNAL_FILENAME = ".conversion_journal.jsonl"
+
+# Journal states, in the order a conversion passes through them
+STATE_STARTED = "started"      # temp JPG being written
+STATE_COMMITTED = "committed"  # JPG verified and renamed into place, original still present
+STATE_DONE = "done"            # original deleted
+
+class ConversionJournal:
+    """
+    Append-only journal of HEIC conversions so an interrupted batch can resume safely.
+    Each line is a JSON record {"path": <heic path relative to root>, "state": <state>}; the last record wins.
+    """
+    def __init__(self, root: str):
+        self.root = root
+        self.path = os.path.join(root, JOURNAL_FILENAME)
+        self.states: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._file = None
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path): return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                        self.states[record["path"]] = record["state"]
+                    except (ValueError, KeyError):
+                        # A torn last line from a crash is expected; ignore it
+                        continue
+            logger.info(f"Loaded conversion journal with {len(self.states)} entries")
+        except Exception as e:
+            logger.error(f"Failed to read conversion journal: {e}")
+
+    def _key(self, heic_path: str) -> str:
+        return os.path.relpath(heic_path, self.root)
+
+    def get_state(self, heic_path: str) -> Optional[str]:
+        with self._lock:
+            return self.states.get(self._key(heic_path))
+
+    def record(self, heic_path: str, state: str):
+        """Appends a state transition and flushes it to disk before returning."""
+        key = self._key(heic_path)
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, "a", encoding="utf-8")
+            self._file.write(json.dumps({"path": key, "state": state}, ensure_ascii=False) + "\n")
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self.states[key] = state
+
+    def close(self, remove_if_complete: bool = False):
+        """Closes the journal. If every entry is done, the journal file can be removed."""
+        with self._lock:
+            if self._file:
+                self._file.close()
+                self._file = None
+            if remove_if_complete and all(state == STATE_DONE for state in self.states.values()):
+                try:
+                    if os.path.exists(self.path):
+                        os.remove(self.path)
+                except Exception as e:
+                    logger.error(f"Failed to remove completed journal: {e}")
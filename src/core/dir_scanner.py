@@ -0,0 +1,227 @@
+import os
+import time
+import threading
+from array import array
+from collections import Counter
+from typing import Dict, Iterator, List, Optional, Set, Tuple, Union
+from ..utils.logger import setup_logger
+
+logger = setup_logger("DirScanner")
+
+class FileEntry:
+    """A single file in a DirectorySnapshot."""
+    __slots__ = ("dir_path", "name", "size", "mtime", "ext")
+
+    def __init__(self, dir_path: str, name: str, size: int, mtime: float):
+        self.dir_path = dir_path
+        self.name = name
+        self.size = size
+        self.mtime = mtime
+        self.ext = os.path.splitext(name)[1].lower()
+
+    @property
+    def path(self) -> str:
+        return os.path.join(self.dir_path, self.name)
+
+def iter_scan(root: str, extensions: Optional[Set[str]] = None, is_running_check=None, on_dir=None, selection=None) -> Iterator[Tuple[str, FileEntry]]:
+    """
+    Streams (dir_path, FileEntry) for every file under root using os.scandir.
+    DirEntry stat results are cached (and free on Windows), so each file costs at most one stat.
+    Memory use is bounded by the directory stack, not by the number of files.
+    on_dir(dir_path, {}) is called for each directory before its files are yielded.
+    An optional SelectionQuery prunes directories by name and filters files by type, size and mtime.
+    """
+    if selection is not None and extensions is not None:
+        extensions = selection.extensions(extensions)
+    stack = [os.path.abspath(root)]
+    while stack:
+        if is_running_check and not is_running_check(): return
+        dir_path = stack.pop()
+        if on_dir: on_dir(dir_path, {})
+        try:
+            with os.scandir(dir_path) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if selection is None or selection.may_contain_folder(entry.name):
+                                stack.append(entry.path)
+                            continue
+                        if not entry.is_file(): continue
+                        ext = os.path.splitext(entry.name)[1].lower()
+                        if extensions is not None and ext not in extensions: continue
+                        st = entry.stat()
+                        if selection is not None and not selection.matches(ext, st.st_size, st.st_mtime): continue
+                        yield dir_path, FileEntry(dir_path, entry.name, st.st_size, st.st_mtime)
+                    except OSError as e:
+                        logger.debug(f"Skipping {entry.path}: {e}")
+        except OSError as e:
+            logger.error(f"Cannot scan {dir_path}: {e}")
+
+class DirectorySnapshot:
+    """
+    In-memory snapshot of a directory tree (name, size, mtime, extension per file).
+    Built once with os.scandir (DirEntry stat results are cached, and free on Windows),
+    then kept up to date incrementally as files land or are removed, so later phases
+    never need to re-walk the filesystem. A backup run starts from an empty snapshot of
+    its destination and only records its own landings, so memory follows the run size.
+    Like FilePlan, sizes and mtimes live in typed arrays (a directory maps names to slots)
+    and FileEntry records are only materialized on access.
+    """
+    def __init__(self, root: str):
+        self.root = os.path.abspath(root)
+        self.dirs: Dict[str, Dict[str, int]] = {} # dir path -> {name: slot in the size/mtime arrays}
+        self._sizes = array("q")
+        self._mtimes = array("d")
+        self._free: List[int] = [] # Slots of removed files, reused by later landings
+        # Per-directory index: lowercase stem -> name (a tuple of names if several share it), for O(1) extension-variant lookups
+        self.stems: Dict[str, Dict[str, Union[str, Tuple[str, ...]]]] = {}
+        self.ext_counts: Counter = Counter()
+        self.total_bytes = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def scan(cls, root: str, extensions: Optional[Set[str]] = None, is_running_check=None) -> "DirectorySnapshot":
+        """
+        Walks root once and returns the snapshot.
+        If extensions is given, only files with those (lowercase) extensions are recorded.
+        """
+        snapshot = cls(root)
+        start = time.time()
+        for dir_path, entry in iter_scan(snapshot.root, extensions, is_running_check, snapshot.dirs.setdefault):
+            snapshot._store(dir_path, entry.name, entry.size, entry.mtime)
+        logger.info(f"Scanned {snapshot.root}: {snapshot.file_count} files in {len(snapshot.dirs)} folders ({time.time() - start:.2f}s)")
+        return snapshot
+
+    @property
+    def file_count(self) -> int:
+        return sum(self.ext_counts.values())
+
+    def covers(self, path: str) -> bool:
+        """True if path lies inside the snapshot root."""
+        path = os.path.abspath(path)
+        return path == self.root or path.startswith(self.root + os.sep)
+
+    def add_file(self, path: str, size: Optional[int] = None, mtime: Optional[float] = None) -> Optional[FileEntry]:
+        """Records a file that just landed. Stats it only if size/mtime are not supplied."""
+        path = os.path.abspath(path)
+        if size is None or mtime is None:
+            try:
+                st = os.stat(path)
+            except OSError:
+                return None
+            size, mtime = st.st_size, st.st_mtime
+        dir_path, name = os.path.split(path)
+        with self._lock:
+            self._store(dir_path, name, size, mtime)
+        return FileEntry(dir_path, name, size, mtime)
+
+    def _store(self, dir_path: str, name: str, size: int, mtime: float):
+        entries = self.dirs.setdefault(dir_path, {})
+        ext = os.path.splitext(name)[1].lower()
+        slot = entries.get(name)
+        if slot is not None:
+            self.ext_counts[ext] -= 1
+            self.total_bytes -= self._sizes[slot]
+            self._sizes[slot] = size
+            self._mtimes[slot] = mtime
+        elif self._free:
+            slot = self._free.pop()
+            self._sizes[slot] = size
+            self._mtimes[slot] = mtime
+        else:
+            slot = len(self._sizes)
+            self._sizes.append(size)
+            self._mtimes.append(mtime)
+        entries[name] = slot
+        self._index_name(dir_path, name)
+        self.ext_counts[ext] += 1
+        self.total_bytes += size
+
+    def remove_file(self, path: str):
+        """Forgets a file that was deleted."""
+        dir_path, name = os.path.split(os.path.abspath(path))
+        with self._lock:
+            slot = self.dirs.get(dir_path, {}).pop(name, None)
+            self._unindex_name(dir_path, name)
+            if slot is not None:
+                self.ext_counts[os.path.splitext(name)[1].lower()] -= 1
+                self.total_bytes -= self._sizes[slot]
+                self._free.append(slot)
+
+    def _index_name(self, dir_path: str, name: str):
+        stems = self.stems.setdefault(dir_path, {})
+        stem = os.path.splitext(name)[0].lower()
+        # Also index the full name so extensionless landings (IMG_1234 -> IMG_1234.HEIC) match
+        for key in {stem, name.lower()}:
+            current = stems.get(key)
+            if current is None:
+                stems[key] = name
+            elif isinstance(current, str):
+                if current != name: stems[key] = (current, name)
+            elif name not in current:
+                stems[key] = current + (name,)
+
+    def _unindex_name(self, dir_path: str, name: str):
+        stems = self.stems.get(dir_path)
+        if not stems: return
+        for key in {os.path.splitext(name)[0].lower(), name.lower()}:
+            current = stems.get(key)
+            if current == name:
+                del stems[key]
+            elif isinstance(current, tuple) and name in current:
+                rest = tuple(n for n in current if n != name)
+                stems[key] = rest[0] if len(rest) == 1 else rest
+
+    def names_for_stem(self, dir_path: str, base_name: str) -> List[str]:
+        """
+        O(1) lookup of the recorded files in dir_path whose name is base_name or base_name plus an extension.
+        """
+        dir_path = os.path.abspath(dir_path)
+        with self._lock:
+            names = self.stems.get(dir_path, {}).get(base_name.lower(), ())
+        return [names] if isinstance(names, str) else list(names)
+
+    def find_variant(self, dir_path: str, base_name: str, extensions: Set[str]) -> Optional[str]:
+        """
+        Finds a file named base_name + <ext> in dir_path without listing the directory.
+        Checks the index first, then probes each candidate extension (a fixed number of stats,
+        independent of directory size) and indexes whatever is found.
+        """
+        for name in self.names_for_stem(dir_path, base_name):
+            if name != base_name:
+                return os.path.join(os.path.abspath(dir_path), name)
+        for ext in extensions:
+            for variant in (ext, ext.upper()):
+                candidate = os.path.join(dir_path, base_name + variant)
+                if os.path.exists(candidate):
+                    self.add_file(candidate)
+                    return candidate
+        return None
+
+    def get(self, path: str) -> Optional[FileEntry]:
+        dir_path, name = os.path.split(os.path.abspath(path))
+        with self._lock:
+            slot = self.dirs.get(dir_path, {}).get(name)
+            if slot is None: return None
+            return FileEntry(dir_path, name, self._sizes[slot], self._mtimes[slot])
+
+    def has_ext(self, ext: str) -> bool:
+        """O(1) check whether any file with the given extension exists."""
+        return self.ext_counts.get(ext.lower(), 0) > 0
+
+    def iter_files(self, extensions: Optional[Set[str]] = None, under: Optional[str] = None) -> Iterator[FileEntry]:
+        """Yields entries in directory order, optionally filtered by extension and by a sub-tree."""
+        prefix = os.path.abspath(under) if under else None
+        with self._lock:
+            dirs = [(dir_path, list(entries.items())) for dir_path, entries in self.dirs.items()
+                    if prefix is None or dir_path == prefix or dir_path.startswith(prefix + os.sep)]
+        for dir_path, entries in dirs:
+            for name, slot in entries:
+                if extensions is None or os.path.splitext(name)[1].lower() in extensions:
+                    with self._lock:
+                        if self.dirs.get(dir_path, {}).get(name) != slot: continue # Removed meanwhile
+                        size, mtime = self._sizes[slot], self._mtimes[slot]
+                    yield FileEntry(dir_path, name, size, mtime)
+
+    def paths_with_ext(self, extensions: Set[str], under: Optional[str] = None) -> List[str]:
+        return [entry.path for entry in self.iter_files(extensions, under)]
@@ -0,0 +1,100 @@
+import os
+import json
+import time
+import threading
+from typing import List, Optional
+from ..utils.logger import setup_logger
+
+logger = setup_logger("FailureManifest")
+
+FAILURE_MANIFEST_FILENAME = "failed_files.json"
+
+# Source kinds
+SOURCE_FS = "fs"
+SOURCE_MTP = "mtp"
+
+# Reason codes
+REASON_VERIFY = "verify_failed" # Copy did not land with the expected size in time
+REASON_IO = "io_error" # Read/write error (permissions, disk full, device gone)
+REASON_MISSING = "source_missing" # Source file or device item no longer exists (retry only)
+REASON_COPY = "copy_failed" # Any other copy error
+
+def reason_for(error: str) -> str:
+    """Maps an error message to a reason code."""
+    text = error.lower()
+    if "not found" in text or "no longer on the device" in text: return REASON_MISSING
+    if "verification failed" in text or "size mismatch" in text or "timeout" in text: return REASON_VERIFY
+    if "errno" in text or "permission" in text or "no space" in text or "could not resolve" in text: return REASON_IO
+    return REASON_COPY
+
+class FailureManifest:
+    """
+    Machine-readable companion of failed_files.txt: one record per source item that could
+    not be copied, with enough identity to find it again (full source path for the
+    filesystem, source breadcrumbs + folder path + item name for MTP), its destination
+    folder and a reason code. BackupManager.retry_failed() builds a plan from it.
+    """
+    def __init__(self, source: str, dest: str, breadcrumbs: Optional[List[str]] = None, organize_by_date: bool = False):
+        self.source = source
+        self.dest = os.path.abspath(dest)
+        self.breadcrumbs = breadcrumbs
+        self.organize_by_date = organize_by_date # MTP items land in dest and are routed to Year/Month afterwards
+        self.items: List[dict] = []
+        self._lock = threading.Lock()
+
+    def _add(self, record: dict):
+        record["reason"] = reason_for(record["error"])
+        with self._lock:
+            self.items.append(record)
+
+    def record_fs(self, path: str, source_root: str, size: int, dest_file: str, error: str):
+        """dest_file is where the copy was going, relative to dest (it may have been routed by date)."""
+        self._add({"kind": SOURCE_FS, "path": os.path.abspath(path), "rel": os.path.relpath(path, source_root),
+                   "dest_file": dest_file, "size": size, "error": error})
+
+    def record_mtp(self, folder: List[str], name: str, final_name: str, dest_dir: str, size: Optional[int], error: str):
+        """folder is the list of device folder names below the source folder (breadcrumbs)."""
+        self._add({"kind": SOURCE_MTP, "folder": folder, "name": name, "final_name": final_name,
+                   "dest_dir": os.path.relpath(os.path.abspath(dest_dir), self.dest), "size": size, "error": error})
+
+    def carry(self, record: dict):
+        """Keeps a record from a previous manifest that was not retried (e.g. the retry was stopped)."""
+        with self._lock:
+            self.items.append(record)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def save(self):
+        """Writes FAILURE_MANIFEST_FILENAME to dest, or removes a stale one when nothing failed."""
+        path = os.path.join(self.dest, FAILURE_MANIFEST_FILENAME)
+        if not self.items:
+            if os.path.exists(path): os.remove(path)
+            return
+        tmp_path = path + ".part"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({
+                    "created": time.strftime('%Y-%m-%d %H:%M:%S'),
+                    "source": self.source,
+                    "breadcrumbs": self.breadcrumbs,
+                    "organize_by_date": self.organize_by_date,
+                    "items": self.items,
+                }, f, ensure_ascii=False, indent=1)
+            os.replace(tmp_path, path)
+            logger.info(f"Failure manifest with {len(self.items)} items written to {path}")
+        except Exception as e:
+            logger.error(f"Failed to write failure manifest: {e}")
+
+    @classmethod
+    def load(cls, dest: str) -> Optional["FailureManifest"]:
+        """The failure manifest of a backup folder, or None if it has none."""
+        path = os.path.join(dest, FAILURE_MANIFEST_FILENAME)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return None
+        manifest = cls(data.get("source", ""), dest, data.get("breadcrumbs"), data.get("organize_by_date", False))
+        manifest.items = data.get("items", [])
+        return manifest
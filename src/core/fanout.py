@@ -0,0 +1,190 @@
+import os
+import queue
+import itertools
+import threading
+from typing import Dict, List, Optional, Tuple
+from ..utils.constants import CHUNK_SIZE, FANOUT_QUEUE_CHUNKS, FANOUT_STALL_TIMEOUT
+from ..utils.logger import setup_logger
+
+logger = setup_logger("FanOut")
+
+# Writer commands
+_OPEN, _DATA, _CLOSE, _ABORT, _STOP = range(5)
+
+# A target is dropped after this many consecutive file failures (e.g. the NAS went away)
+MAX_CONSECUTIVE_FAILURES = 3
+
+class FanOutTarget:
+    """One extra destination with its own writer thread and bounded chunk queue."""
+    def __init__(self, root: str, queue_chunks: int):
+        self.root = root
+        self.queue: "queue.Queue[Tuple]" = queue.Queue(maxsize=queue_chunks)
+        self.failed = False
+        self.error = ""
+        self.files_written = 0
+        self.bytes_written = 0
+        self.failed_files: List[Tuple[str, str]] = []
+        self.consecutive_failures = 0
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        # Several copy workers may stream files at once; open files are keyed by file id
+        open_files: Dict[int, list] = {} # file_id -> [handle, tmp_path, final_path, rel_path, written]
+        while True:
+            cmd, file_id, arg = self.queue.get()
+            if cmd == _STOP:
+                for state in open_files.values():
+                    self._discard(state[0], state[1])
+                return
+            if self.failed:
+                continue
+            state = open_files.get(file_id)
+            try:
+                if cmd == _OPEN:
+                    final_path = os.path.join(self.root, arg)
+                    state = [None, final_path + ".part", final_path, arg, 0]
+                    open_files[file_id] = state
+                    os.makedirs(os.path.dirname(final_path), exist_ok=True)
+                    state[0] = open(state[1], "wb")
+                elif state is None:
+                    continue # File already failed on this target
+                elif cmd == _DATA:
+                    state[0].write(arg)
+                    state[4] += len(arg)
+                elif cmd == _CLOSE:
+                    del open_files[file_id]
+                    state[0].close()
+                    if arg is not None and state[4] != arg:
+                        raise Exception(f"Size mismatch ({state[4]} != {arg})")
+                    os.replace(state[1], state[2])
+                    self.files_written += 1
+                    self.bytes_written += state[4]
+                    self.consecutive_failures = 0
+                elif cmd == _ABORT:
+                    del open_files[file_id]
+                    self._discard(state[0], state[1])
+            except Exception as e:
+                open_files.pop(file_id, None)
+                if state:
+                    self._discard(state[0], state[1])
+                self._record_failure(state[3] if state else arg, str(e))
+
+    def _record_failure(self, rel_path: Optional[str], error: str):
+        logger.error(f"Mirror {self.root}: failed to write {rel_path}: {error}")
+        self.failed_files.append((f"{rel_path} [{self.root}]", error))
+        self.consecutive_failures += 1
+        if self.consecutive_failures >= MAX_CONSECUTIVE_FAILURES:
+            self.mark_failed(f"Too many consecutive failures: {error}")
+
+    def mark_failed(self, error: str):
+        if self.failed: return
+        self.failed = True
+        self.error = error
+        logger.error(f"Mirror {self.root} disabled: {error}")
+        # Unblock a producer waiting on this queue
+        try:
+            while True:
+                self.queue.get_nowait()
+        except queue.Empty:
+            pass
+
+    @staticmethod
+    def _discard(handle, tmp_path: Optional[str]):
+        try:
+            if handle: handle.close()
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        except OSError: pass
+
+    def put(self, cmd: int, file_id: int = 0, arg=None):
+        """Queues a command; a target that stays full for FANOUT_STALL_TIMEOUT is disabled instead of stalling the rest."""
+        if self.failed: return
+        try:
+            self.queue.put((cmd, file_id, arg), timeout=FANOUT_STALL_TIMEOUT)
+        except queue.Full:
+            self.mark_failed(f"Stalled for more than {FANOUT_STALL_TIMEOUT}s")
+
+class FanOutFile:
+    """Handle for one file being streamed to all targets."""
+    def __init__(self, writer: "FanOutWriter", file_id: int, rel_path: str):
+        self.writer = writer
+        self.file_id = file_id
+        self.size = 0
+        for target in writer.targets:
+            target.put(_OPEN, file_id, rel_path)
+
+    def write(self, chunk: bytes):
+        self.size += len(chunk)
+        for target in self.writer.targets:
+            target.put(_DATA, self.file_id, chunk)
+
+    def close(self, expected_size: Optional[int] = None):
+        for target in self.writer.targets:
+            target.put(_CLOSE, self.file_id, self.size if expected_size is None else expected_size)
+
+    def abort(self):
+        for target in self.writer.targets:
+            target.put(_ABORT, self.file_id)
+
+class FanOutWriter:
+    """
+    Writes every byte read from the source to several extra destinations at once, so the
+    slow source (phone) is read only once. Each target has its own writer thread and bounded
+    queue (backpressure); a failing or stalled target is dropped without affecting the others.
+    Paths are relative to each target root, mirroring the primary destination layout.
+    """
+    def __init__(self, roots: List[str], queue_chunks: int = FANOUT_QUEUE_CHUNKS):
+        self.targets = [FanOutTarget(root, queue_chunks) for root in roots]
+        self._ids = itertools.count(1)
+
+    @property
+    def active(self) -> bool:
+        return any(not t.failed for t in self.targets)
+
+    def open(self, rel_path: str) -> FanOutFile:
+        """Starts a file on all targets; feed it with write() and finish with close() or abort()."""
+        return FanOutFile(self, next(self._ids), rel_path)
+
+    def replicate_file(self, path: str, rel_path: str):
+        """Fans out a file that already landed (MTP), reading it back while it is still in the page cache."""
+        if not self.active: return
+        out = self.open(rel_path)
+        try:
+            with open(path, "rb") as f:
+                while True:
+                    buf = f.read(CHUNK_SIZE)
+                    if not buf: break
+                    out.write(buf)
+        except Exception:
+            out.abort()
+            raise
+        out.close()
+
+    def finish(self) -> dict:
+        """Flushes all targets and returns a per-target report."""
+        for target in self.targets:
+            target.put(_STOP)
+            if target.failed:
+                # Drained on failure; a writer hung on a dead share is abandoned (daemon thread)
+                try: target.queue.put_nowait((_STOP, 0, None))
+                except queue.Full: pass
+        for target in self.targets:
+            target.thread.join(None if not target.failed else FANOUT_STALL_TIMEOUT)
+        return {
+            target.root: {
+                "files": target.files_written,
+                "bytes": target.bytes_written,
+                "failed": target.failed,
+                "error": target.error,
+            } for target in self.targets
+        }
+
+    @property
+    def failed_files(self) -> List[Tuple[str, str]]:
+        failures = []
+        for target in self.targets:
+            failures.extend(target.failed_files)
+            if target.failed:
+                failures.append((f"Mirror {target.root}", target.error))
+        return failures
@@ -0,0 +1,122 @@
+import os
+import sys
+import json
+import tempfile
+import threading
+from array import array
+from typing import Dict, Iterable, Iterator, List, Tuple
+from ..utils.constants import MAX_FAILURES_IN_MEMORY
+from ..utils.logger import setup_logger
+from .dir_scanner import FileEntry, iter_scan
+
+logger = setup_logger("FilePlan")
+
+class FilePlan:
+    """
+    Compact, array-backed list of files to transfer.
+    Directory prefixes are stored once and referenced by index, sizes and mtimes live in
+    typed arrays, and FileEntry records (which use __slots__) are only materialized on access.
+    """
+    def __init__(self):
+        self.dirs: List[str] = []
+        self._dir_ids: Dict[str, int] = {}
+        self.dir_index = array("I")
+        self.names: List[str] = []
+        self.sizes = array("q")
+        self.mtimes = array("d")
+        self.total_bytes = 0
+
+    @classmethod
+    def from_scan(cls, root: str, extensions=None, is_running_check=None, selection=None) -> "FilePlan":
+        plan = cls()
+        for dir_path, entry in iter_scan(root, extensions, is_running_check, selection=selection):
+            plan.append(dir_path, entry.name, entry.size, entry.mtime)
+        return plan
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def append(self, dir_path: str, name: str, size: int, mtime: float):
+        dir_id = self._dir_ids.get(dir_path)
+        if dir_id is None:
+            dir_id = len(self.dirs)
+            self.dirs.append(sys.intern(dir_path))
+            self._dir_ids[dir_path] = dir_id
+        self.dir_index.append(dir_id)
+        self.names.append(name)
+        self.sizes.append(size)
+        self.mtimes.append(mtime)
+        self.total_bytes += size
+
+    def entry(self, index: int) -> FileEntry:
+        """Materializes the record at index."""
+        return FileEntry(self.dirs[self.dir_index[index]], self.names[index], self.sizes[index], self.mtimes[index])
+
+    def __iter__(self) -> Iterator[FileEntry]:
+        for index in range(len(self.names)):
+            yield self.entry(index)
+
+class FailureLog:
+    """
+    Append-only list of (name, error) failures with bounded memory.
+    The first MAX_FAILURES_IN_MEMORY entries stay in memory (enough for the UI preview);
+    the rest are spilled to a temporary file and streamed back when iterated.
+    """
+    def __init__(self, max_in_memory: int = MAX_FAILURES_IN_MEMORY):
+        self.max_in_memory = max_in_memory
+        self._items: List[Tuple[str, str]] = []
+        self._spill = None
+        self._spilled = 0
+        self._lock = threading.Lock()
+
+    def append(self, failure: Tuple[str, str]):
+        with self._lock:
+            if len(self._items) < self.max_in_memory:
+                self._items.append(tuple(failure))
+                return
+            if self._spill is None:
+                self._spill = tempfile.TemporaryFile(mode="w+", encoding="utf-8")
+            self._spill.seek(0, os.SEEK_END)
+            self._spill.write(json.dumps(list(failure), ensure_ascii=False) + "\n")
+            self._spilled += 1
+
+    def extend(self, failures: Iterable[Tuple[str, str]]):
+        for failure in failures:
+            self.append(failure)
+
+    def clear(self):
+        with self._lock:
+            self._items = []
+            if self._spill is not None:
+                self._spill.close()
+                self._spill = None
+            self._spilled = 0
+
+    def __len__(self) -> int:
+        return len(self._items) + self._spilled
+
+    def __bool__(self) -> bool:
+        return len(self) > 0
+
+    def __getitem__(self, key):
+        # Only in-memory entries are addressable; used for previews such as failed_files[:10]
+        return self._items[key]
+
+    def __iter__(self) -> Iterator[Tuple[str, str]]:
+        yield from list(self._items)
+        # Stream the spill file back in blocks without holding the lock across yields
+        position = 0
+        while True:
+            with self._lock:
+                if self._spill is None: return
+                self._spill.flush()
+                self._spill.seek(position)
+                block = []
+                for _ in range(1000):
+                    line = self._spill.readline()
+                    if not line: break
+                    block.append(line)
+                position = self._spill.tell()
+            if not block: return
+            for line in block:
+                yield tuple(json.loads(line))
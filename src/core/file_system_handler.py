@@ -1,5 +1,7 @@
 import os
 import time
+import hashlib
+import threading
 import datetime
 from typing import List, Tuple, Callable, Optional
 from ..utils.constants import (
@@ -7,9 +9,24 @@ from ..utils.constants import (
     CHUNK_SIZE, 
     MAX_RETRIES, 
     VERIFY_TIMEOUT,
-    VERIFY_POLL_INTERVAL
+    VERIFY_POLL_INTERVAL,
+    DEFAULT_SCHEDULE_POLICY,
+    SCHEDULE_SOURCE_ORDER,
+    COPY_WORKERS
 )
 from ..utils.logger import setup_logger
+from .dir_scanner import DirectorySnapshot, FileEntry, iter_scan
+from .file_plan import FilePlan, FailureLog
+from .transfer_policy import RetryQueue
+from .scheduler import WorkScheduler
+from .media_dates import DateOrganizer
+from .throttle import TokenBucket, IoPriority
+from .fanout import FanOutWriter
+from .pack_archive import PackWriter
+from .backup_manifest import BackupManifest
+from .selection import SelectionQuery
+from .cancellation import CancellationToken, OperationCancelled
+from .failure_manifest import FailureManifest
 
 logger = setup_logger("FileSystemHandler")
 
@@ -20,9 +37,22 @@ class FileSystemHandler:
     def __init__(self, status_callback: Optional[Callable] = None):
         self.status_callback = status_callback
         self.is_running = False
+        self.cancel_token = CancellationToken() # Checked per chunk; replaced at the start of each run
         self.copied_bytes = 0
         self.files_processed = 0
-        self.failed_files: List[Tuple[str, str]] = []
+        self.failed_files = FailureLog()
+        self.landed_callback: Optional[Callable[[str], None]] = None # Called with each verified destination path
+        self.organizer: Optional[DateOrganizer] = None # Routes files into Year/Month folders when set
+        self.rate_limiter: Optional[TokenBucket] = None
+        self.io_priority: Optional[IoPriority] = None
+        self.fanout: Optional[FanOutWriter] = None # Mirrors each copied file to extra destinations
+        self.packer: Optional[PackWriter] = None # Packed output mode: files are appended to tar volumes
+        self.manifest: Optional[BackupManifest] = None # Records size and sha256 of every copied file
+        self.selection: Optional[SelectionQuery] = None # Applied during the scan, so excluded files are never planned
+        self.failure_manifest: Optional[FailureManifest] = None # Source identity of files that could not be copied
+        self.schedule_policy = DEFAULT_SCHEDULE_POLICY
+        self.copy_workers = COPY_WORKERS
+        self._lock = threading.Lock()
 
     def update_status(self, text: str):
         """Status callback wrapper."""
@@ -33,9 +63,12 @@ class FileSystemHandler:
     def update_progress(self, total_bytes: int, start_time: float):
         """Calculates percentage and ETA based on bytes copied."""
         if self.status_callback:
-            if total_bytes > 0:
-                percentage = self.copied_bytes / total_bytes
-                self.status_callback("progress", percentage)
+            if total_bytes <= 0:
+                # Streaming mode: the total is not known up front
+                self.status_callback("time", f"Files Copied: {self.files_processed}")
+                return
+            percentage = self.copied_bytes / total_bytes
+            self.status_callback("progress", percentage)
             
             # Calculate ETA
             elapsed_time = time.time() - start_time
@@ -46,80 +79,260 @@ class FileSystemHandler:
                 eta_str = str(datetime.timedelta(seconds=int(eta_seconds)))
                 self.status_callback("time", f"Estimated time remaining: {eta_str}")
 
-    def backup_standard_mode(self, source: str, dest: str, total_bytes: int, start_time: float):
+    def backup_standard_mode(self, source: str, dest: str, total_bytes: int, start_time: float, dest_snapshot: Optional[DirectorySnapshot] = None):
         """
         Executes a standard recursive file copy from source to destination.
-        Reads all allowed files first, then chunks copy with progress.
+        With the source-order policy files are copied while the scan streams them in; other
+        policies scan into a compact FilePlan first. copy_workers parallel workers copy in chunks with progress.
+        Copied files are recorded in dest_snapshot so later phases do not re-walk the destination.
         """
         self.is_running = True
-        files_to_copy = []
+        self.cancel_token = CancellationToken()
+        self.failed_files.clear()
         
-        # Scan files
-        for root, dirs, files in os.walk(source):
-            for file in files:
-                ext = os.path.splitext(file)[1].lower()
-                if ext in ALLOWED_EXTENSIONS:
-                    full_path = os.path.join(root, file)
-                    try:
-                        size = os.path.getsize(full_path)
-                        files_to_copy.append((full_path, size))
-                    except: pass
-        
-        if not files_to_copy:
+        if self.schedule_policy == SCHEDULE_SOURCE_ORDER:
+            # Stream straight from the scan: memory stays flat regardless of library size
+            stream = (entry for _, entry in iter_scan(source, ALLOWED_EXTENSIONS, lambda: self.is_running, selection=self.selection))
+            stream_lock = threading.Lock()
+
+            def next_entry():
+                with stream_lock:
+                    entry = next(stream, None)
+                return entry, entry
+
+            def finish_entry(token):
+                pass
+        else:
+            # Ordering policies need the whole plan; keep it compact (array-backed, interned dirs)
+            plan = FilePlan.from_scan(source, ALLOWED_EXTENSIONS, lambda: self.is_running, self.selection)
+            if not total_bytes:
+                total_bytes = plan.total_bytes
+            if not len(plan):
+                self.update_status("No media files found (Standard Mode).")
+                return
+            # Parallel workers pull plan indices from a size-aware scheduler
+            scheduler = WorkScheduler(range(len(plan)), self.schedule_policy, plan.sizes.__getitem__, plan.mtimes.__getitem__, self.copy_workers)
+
+            def next_entry():
+                index = scheduler.next_item()
+                return (None, None) if index is None else (plan.entry(index), index)
+
+            def finish_entry(token):
+                scheduler.done(token)
+
+        retry_queue = RetryQueue()
+        retry_lock = threading.Lock()
+
+        def worker():
+            while self.is_running:
+                entry, token = next_entry()
+                if entry is None: return
+                if self.io_priority: self.io_priority.sync()
+                self.update_status(f"Copying: {entry.name}")
+                try:
+                    self.copy_entry(entry, source, dest, total_bytes, start_time, dest_snapshot)
+                except OperationCancelled:
+                    return # Partial output was already removed by copy_entry
+                except Exception as e:
+                    logger.error(f"Failed: {entry.path} - {e}")
+                    # Retried at the end of the run so a bad file does not stall the stream
+                    with retry_lock:
+                        retry_queue.defer(entry, entry.name, str(e))
+                finally:
+                    finish_entry(token)
+
+        workers = [threading.Thread(target=worker, daemon=True) for _ in range(max(1, self.copy_workers))]
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+
+        if len(retry_queue):
+            self.update_status(f"Retrying {len(retry_queue)} failed files...")
+            retry_queue.drain(
+                lambda entry: self.copy_entry(entry, source, dest, total_bytes, start_time, dest_snapshot),
+                lambda name, error, entry: self.record_failure(entry, source, dest, error),
+                lambda: self.is_running
+            )
+
+        if not self.files_processed and not self.failed_files:
             self.update_status("No media files found (Standard Mode).")
-            return
 
-        for src_file, size in files_to_copy:
-            if not self.is_running: break
-            
-            rel_path = os.path.relpath(src_file, source)
-            dest_file = os.path.join(dest, rel_path)
-            dest_dir = os.path.dirname(dest_file)
-            
-            self.update_status(f"Copying: {os.path.basename(src_file)}")
-            
+    def record_failure(self, entry: FileEntry, source: str, dest: str, error: str):
+        """Adds a file that could not be copied to the failure report (and the failure manifest, if set)."""
+        self.failed_files.append((entry.name, error))
+        if self.failure_manifest is not None and not self.packer:
+            self.failure_manifest.record_fs(entry.path, source, entry.size, os.path.relpath(self.dest_path(entry, source, dest), dest), error)
+
+    def dest_path(self, entry: FileEntry, source: str, dest: str) -> str:
+        """Destination of a source file in dest (its Year/Month folder with date organization)."""
+        if self.organizer:
+            return os.path.join(self.organizer.target_dir(entry.path, entry.name, entry.size), entry.name)
+        return os.path.join(dest, os.path.relpath(entry.path, source))
+
+    def retry_failed(self, records: List[dict], source: str, dest: str, dest_snapshot: Optional[DirectorySnapshot] = None):
+        """
+        Copies the files of a failure manifest again, to the destinations recorded in it
+        (so date-organized files land where the first run would have put them).
+        Files that fail again are recorded in failure_manifest; untried ones are carried over.
+        """
+        self.is_running = True
+        self.cancel_token = CancellationToken()
+        self.failed_files.clear()
+        planned = []
+        for record in records:
+            path = record["path"]
             try:
-                os.makedirs(dest_dir, exist_ok=True)
-                self.copy_file_chunked(src_file, dest_file)
-                self.copied_bytes += size
-                self.files_processed += 1
-                self.update_progress(total_bytes, start_time)
+                stat = os.stat(path)
+            except OSError as e:
+                self.failed_files.append((os.path.basename(path), f"Source not found: {e}"))
+                if self.failure_manifest is not None: self.failure_manifest.record_fs(path, source, record.get("size", 0), record["dest_file"], f"Source not found: {e}")
+                continue
+            planned.append((FileEntry(os.path.dirname(path), os.path.basename(path), stat.st_size, stat.st_mtime), record))
+
+        total_bytes = sum(entry.size for entry, _ in planned)
+        start_time = time.time()
+        for index, (entry, record) in enumerate(planned):
+            if not self.is_running:
+                if self.failure_manifest is not None:
+                    for _, untried in planned[index:]: self.failure_manifest.carry(untried)
+                return
+            self.update_status(f"Retrying: {entry.name}")
+            try:
+                self.copy_entry(entry, source, dest, total_bytes, start_time, dest_snapshot, os.path.join(dest, record["dest_file"]))
+            except OperationCancelled:
+                if self.failure_manifest is not None: self.failure_manifest.carry(record)
             except Exception as e:
-                logger.error(f"Failed: {src_file} - {e}")
-                self.failed_files.append((os.path.basename(src_file), str(e)))
+                logger.error(f"Failed: {entry.path} - {e}")
+                self.failed_files.append((entry.name, str(e)))
+                if self.failure_manifest is not None: self.failure_manifest.record_fs(entry.path, source, entry.size, record["dest_file"], str(e))
+
+    def copy_entry(self, entry: FileEntry, source: str, dest: str, total_bytes: int, start_time: float, dest_snapshot: Optional[DirectorySnapshot] = None, dest_file: Optional[str] = None) -> str:
+        """
+        Copies one scanned source file to its destination path (or dest_file, if given) and records it.
+        Removes the partial destination file and re-raises on failure.
+        """
+        src_file = entry.path
+        if self.packer:
+            return self.pack_entry(entry, source, total_bytes, start_time)
+        if dest_file is None:
+            dest_file = self.dest_path(entry, source, dest)
+        if self.organizer:
+            # Year/month folders gather files from many source folders: never overwrite a namesake
+            dest_file, duplicate = self.organizer.claim(dest_file, src_file, entry.size)
+            if duplicate:
+                logger.info(f"Already backed up as {dest_file}, skipping {src_file}")
+                with self._lock:
+                    self.copied_bytes += entry.size
+                if dest_snapshot:
+                    dest_snapshot.add_file(dest_file)
+                if self.manifest:
+                    self.manifest.record(dest_file, entry.size)
+                self.update_progress(total_bytes, start_time)
+                return dest_file
+        try:
+            os.makedirs(os.path.dirname(dest_file), exist_ok=True)
+            sha256 = self.copy_file_chunked(src_file, dest_file, entry.size, os.path.relpath(dest_file, dest))
+        except Exception:
+            if os.path.exists(dest_file):
+                try:
+                    os.remove(dest_file)
+                except OSError: pass
+            if self.organizer: self.organizer.release(dest_file) # A retry this run takes the same name again
+            raise
+        with self._lock:
+            self.copied_bytes += entry.size
+            self.files_processed += 1
+        if dest_snapshot:
+            dest_snapshot.add_file(dest_file, entry.size, time.time())
+        if self.manifest:
+            self.manifest.record(dest_file, entry.size, sha256)
+        if self.landed_callback:
+            self.landed_callback(dest_file)
+        self.update_progress(total_bytes, start_time)
+        return dest_file
+
+    def pack_entry(self, entry: FileEntry, source: str, total_bytes: int, start_time: float) -> str:
+        """Appends one scanned source file to the pack and returns its archive name."""
+        src_file = entry.path
+        if self.organizer:
+            arcname = os.path.join(self.organizer.relative_dir(src_file, entry.name, entry.size), entry.name)
+        else:
+            arcname = os.path.relpath(src_file, source)
+        progress = {"copied": 0, "last": 0.0}
+
+        def on_chunk(length: int):
+            self.cancel_token.check() # The pack writer truncates the unfinished member
+            progress["copied"] += length
+            if self.rate_limiter:
+                self.rate_limiter.consume(length, lambda: self.is_running)
+            current_time = time.time()
+            if self.status_callback and (current_time - progress["last"] > 0.1 or progress["copied"] == entry.size):
+                self.status_callback("file_progress", (entry.name, progress["copied"], entry.size))
+                progress["last"] = current_time
 
-    def copy_file_chunked(self, src: str, dst: str):
+        self.packer.add_file(src_file, arcname, entry.size, entry.mtime, on_chunk)
+        with self._lock:
+            self.copied_bytes += entry.size
+            self.files_processed += 1
+        self.update_progress(total_bytes, start_time)
+        return arcname
+
+    def copy_file_chunked(self, src: str, dst: str, total_size: Optional[int] = None, mirror_path: Optional[str] = None) -> str:
         """
         Copies a single file in chunks to maintain UI responsiveness/progress updates.
+        Returns the sha256 of the copied data (hashed on the fly, used for the backup manifest).
+        total_size can be passed from a scan snapshot to avoid another stat call.
+        With a fanout configured, each chunk is also queued to the mirrors under mirror_path.
         """
-        total_size = os.path.getsize(src)
-        copied = 0
+        if total_size is None:
+            total_size = os.path.getsize(src)
         filename = os.path.basename(src)
-        last_update_time = 0
+        mirror = self.fanout.open(mirror_path) if self.fanout and mirror_path and self.fanout.active else None
         
+        try:
+            sha256 = self._copy_chunks(src, dst, filename, total_size, mirror)
+        except Exception:
+            if mirror: mirror.abort()
+            raise
+        if mirror: mirror.close(total_size)
+        return sha256
+
+    def _copy_chunks(self, src: str, dst: str, filename: str, total_size: int, mirror=None) -> str:
+        copied = 0
+        last_update_time = 0
+        digest = hashlib.sha256()
         with open(src, 'rb') as fsrc:
             with open(dst, 'wb') as fdst:
                 while True:
+                    self.cancel_token.check()
                     buf = fsrc.read(CHUNK_SIZE)
                     if not buf: break
                     fdst.write(buf)
+                    digest.update(buf)
+                    if mirror: mirror.write(buf)
                     copied += len(buf)
+                    if self.rate_limiter:
+                        self.rate_limiter.consume(len(buf), lambda: self.is_running)
                     
                     # Throttle updates to ~10fps to save CPU/UI
                     current_time = time.time()
                     if self.status_callback and (current_time - last_update_time > 0.1 or copied == total_size):
                         self.status_callback("file_progress", (filename, copied, total_size))
                         last_update_time = current_time
+        return digest.hexdigest()
 
     def stop(self):
-        """Stops the copy operation."""
+        """Stops the copy operation; files in flight are abandoned and removed."""
         self.is_running = False
+        self.cancel_token.cancel()
 
     @staticmethod
-    def verify_file_copy(path: str, expected_size: int, timeout: int = VERIFY_TIMEOUT, is_running_check: Optional[Callable[[], bool]] = None, progress_callback: Optional[Callable[[int, int], None]] = None) -> bool:
+    def verify_file_copy(path: str, expected_size: int, timeout: int = VERIFY_TIMEOUT, is_running_check: Optional[Callable[[], bool]] = None, progress_callback: Optional[Callable[[int, int], None]] = None, name_index: Optional[DirectorySnapshot] = None) -> bool:
         """
         Verifies physically that the file has arrived at destination and size matches.
         Retry logic handles latency in MTP transfers or FS delays.
+        Extension variants are looked up through name_index (or direct probes) instead of listing the directory.
         """
         start = time.time()
         last_size = -1
@@ -128,6 +341,10 @@ class FileSystemHandler:
         logger.info(f"Verifying {os.path.basename(path)} (Expected: {expected_size} bytes)")
         
         actual_path = path
+        dir_path = os.path.dirname(path)
+        base_name = os.path.basename(path)
+        if name_index is None:
+            name_index = DirectorySnapshot(dir_path)
         
         while time.time() - start < timeout:
             if is_running_check and not is_running_check():
@@ -135,19 +352,10 @@ class FileSystemHandler:
             
             # Check if file exists, or if a file with an extension exists
             if not os.path.exists(actual_path):
-                dir_path = os.path.dirname(path)
-                base_name = os.path.basename(path)
-                
-                if os.path.exists(dir_path):
-                    try:
-                        for f in os.listdir(dir_path):
-                            if f.startswith(base_name) and f != base_name:
-                                # Check if it's just an extension difference
-                                if os.path.splitext(f)[0] == base_name:
-                                    logger.debug(f"Found candidate with extension: {f}")
-                                    actual_path = os.path.join(dir_path, f)
-                                    break
-                    except: pass
+                candidate = name_index.find_variant(dir_path, base_name, ALLOWED_EXTENSIONS)
+                if candidate:
+                    logger.debug(f"Found candidate with extension: {os.path.basename(candidate)}")
+                    actual_path = candidate
 
             if os.path.exists(actual_path):
                 try:
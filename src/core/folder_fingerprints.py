@@ -0,0 +1,94 @@
+import os
+import json
+import threading
+from typing import Dict, Optional
+from ..utils.logger import setup_logger
+
+logger = setup_logger("FolderFingerprints")
+
+FINGERPRINT_FILENAME = ".mtp_fingerprints.json"
+FINGERPRINT_SKIP_LIVE = "skip_live_photos" # Run option: Live Photo videos were left out
+
+class FolderFingerprints:
+    """
+    Per-folder fingerprints (item count, total bytes copied, newest item name) of MTP folders
+    that were backed up completely, persisted as JSON in the backup root.
+    An unchanged folder is recognized from Items().Count plus the name of its last item,
+    so camera roll folders that no longer change (DCIM/1xxAPPLE) are skipped without
+    enumerating or inspecting their files.
+    A folder backed up with items left out on purpose (e.g. Live Photo videos) stores those
+    run options; its fingerprint then only matches runs with the same options, so a later
+    full run still copies what was left out.
+    """
+    def __init__(self, root: str):
+        self.path = os.path.join(root, FINGERPRINT_FILENAME)
+        self.entries: Dict[str, dict] = {}
+        self.skipped = 0
+        self._dirty = False
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path): return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.entries = json.load(f)
+        except Exception as e:
+            logger.error(f"Failed to read folder fingerprints: {e}")
+            self.entries = {}
+
+    def save(self):
+        """Persists the fingerprints (atomic replace)."""
+        with self._lock:
+            if not self._dirty: return
+            tmp_path = self.path + ".part"
+            try:
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(self.entries, f)
+                os.replace(tmp_path, self.path)
+                self._dirty = False
+            except Exception as e:
+                logger.error(f"Failed to save folder fingerprints: {e}")
+
+    @staticmethod
+    def _last_name(items, count: int) -> Optional[str]:
+        if count <= 0: return ""
+        try:
+            return items.Item(count - 1).Name
+        except Exception:
+            return None
+
+    def unchanged(self, key: str, items, options: str = "") -> bool:
+        """True if the folder's Shell items match the stored fingerprint (two cheap COM reads) and it covers options."""
+        stored = self.entries.get(key)
+        if not stored: return False
+        if stored.get("options", "") not in ("", options): return False # Recorded by a narrower run
+        try:
+            count = items.Count
+        except Exception:
+            return False
+        if count != stored["count"]: return False
+        newest = self._last_name(items, count)
+        if newest is None or newest != stored["newest"]: return False
+        self.skipped += 1
+        return True
+
+    def record(self, key: str, items, total_bytes: int, options: str = ""):
+        """
+        Stores the fingerprint of a folder that was backed up without failures.
+        options names what the run left out on purpose ("" when every item was copied).
+        """
+        try:
+            count = items.Count
+        except Exception:
+            return
+        newest = self._last_name(items, count)
+        if newest is None: return
+        with self._lock:
+            self.entries[key] = {"count": count, "bytes": total_bytes, "newest": newest, "options": options}
+            self._dirty = True
+
+    def forget(self, key: str):
+        with self._lock:
+            if self.entries.pop(key, None) is not None:
+                self._dirty = True
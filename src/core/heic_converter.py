@@ -0,0 +1,269 @@
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, List, Tuple, Callable, Optional
+from PIL import Image
+import pillow_heif
+from ..utils.constants import (
+    JPEG_QUALITY,
+    CONVERSION_WORKERS,
+    CONVERSION_PIXEL_BUDGET
+)
+from ..utils.logger import setup_logger
+from ..utils.memory_stats import format_peak_rss
+from .dir_scanner import DirectorySnapshot
+from .throttle import CpuShareLimiter, IoPriority
+from .conversion_journal import ConversionJournal, STATE_STARTED, STATE_COMMITTED, STATE_DONE
+from .backup_manifest import BackupManifest
+from .cancellation import CancellationToken, OperationCancelled
+
+logger = setup_logger("HeicConverter")
+
+class PixelBudget:
+    """
+    Global admission control for concurrent decodes, measured in pixels.
+    An image larger than the whole budget is still admitted, but only when nothing else is in flight.
+    """
+    def __init__(self, max_pixels: int):
+        self.max_pixels = max_pixels
+        self.in_use = 0
+        self._cond = threading.Condition()
+
+    def acquire(self, pixels: int, is_running_check: Optional[Callable[[], bool]] = None) -> bool:
+        """Blocks until the pixels fit in the budget. Returns False if the run was stopped while waiting."""
+        with self._cond:
+            while self.in_use > 0 and self.in_use + pixels > self.max_pixels:
+                if is_running_check and not is_running_check():
+                    return False
+                self._cond.wait(0.5)
+            self.in_use += pixels
+            return True
+
+    def release(self, pixels: int):
+        with self._cond:
+            self.in_use -= pixels
+            self._cond.notify_all()
+
+class HeicConverter:
+    """
+    Converts HEIC files to JPG with a pool of workers under a shared pixel budget.
+    Each worker keeps at most one full-size buffer alive while encoding.
+    """
+    def __init__(self, status_callback: Optional[Callable] = None, workers: int = CONVERSION_WORKERS, pixel_budget: int = CONVERSION_PIXEL_BUDGET):
+        self.status_callback = status_callback
+        self.is_running = False
+        self.cancel_token = CancellationToken()
+        self.workers = max(1, workers)
+        self.budget = PixelBudget(pixel_budget)
+        self.converted_count = 0
+        self.processed_count = 0
+        self.failed_files: List[Tuple[str, str]] = []
+        self.snapshot: Optional[DirectorySnapshot] = None
+        self.manifest: Optional[BackupManifest] = None # Kept in sync with converted/deleted files when set
+        self.cpu_limiter = CpuShareLimiter()
+        self.io_priority = IoPriority()
+        self._lock = threading.Lock()
+
+    def update_status(self, text: str):
+        """Status callback wrapper."""
+        if self.status_callback:
+            self.status_callback("status", text)
+        logger.info(text)
+
+    def stop(self):
+        """Signals the workers to stop; files not yet decoded are abandoned and their partial output removed."""
+        self.is_running = False
+        self.cancel_token.cancel()
+
+    def convert_files(self, heic_files: Iterable[str], journal_root: Optional[str] = None, snapshot: Optional[DirectorySnapshot] = None, total: Optional[int] = None) -> int:
+        """
+        Converts the given HEIC files and deletes each original once its JPG is verified on disk.
+        heic_files may be a generator; only a bounded number of files is queued at a time.
+        If journal_root is given, progress is journaled there so an interrupted batch resumes cleanly.
+        If snapshot is given, it is kept in sync with the JPGs written and originals removed.
+        Returns the number of converted files.
+        """
+        self.is_running = True
+        self.cancel_token = CancellationToken()
+        self.snapshot = snapshot
+        self.converted_count = 0
+        self.processed_count = 0
+        self.failed_files = []
+        if total is None:
+            heic_files = list(heic_files)
+            total = len(heic_files)
+        journal = ConversionJournal(journal_root) if journal_root else None
+        in_flight = threading.BoundedSemaphore(self.workers * 2)
+
+        def run(heic_path: str):
+            try:
+                self._convert_worker(heic_path, total, journal)
+            finally:
+                in_flight.release()
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                for heic_path in heic_files:
+                    if not self.is_running: break
+                    in_flight.acquire()
+                    pool.submit(run, heic_path)
+        finally:
+            if journal:
+                journal.close(remove_if_complete=self.is_running and not self.failed_files)
+
+        logger.info(f"Conversion finished: {self.converted_count}/{total} converted, peak RSS {format_peak_rss()}")
+        return self.converted_count
+
+    def _convert_worker(self, heic_path: str, total: int, journal: Optional[ConversionJournal]):
+        if not self.is_running: return
+        self.io_priority.sync()
+        start = time.perf_counter()
+        try:
+            if self.convert_file(heic_path, journal):
+                with self._lock:
+                    self.converted_count += 1
+        except OperationCancelled:
+            logger.info(f"Conversion cancelled: {os.path.basename(heic_path)}")
+        except Exception as e:
+            logger.error(f"Failed to convert {heic_path}: {e}")
+            with self._lock:
+                self.failed_files.append((os.path.basename(heic_path), str(e)))
+        finally:
+            self.cpu_limiter.account(time.perf_counter() - start, lambda: self.is_running)
+            with self._lock:
+                self.processed_count += 1
+                done = self.processed_count
+            if self.status_callback:
+                self.status_callback("status", f"Converting ({done}/{total}): {os.path.basename(heic_path)}")
+                self.status_callback("progress", done / total)
+
+    def convert_file(self, heic_path: str, journal: Optional[ConversionJournal] = None) -> bool:
+        """
+        Converts a single HEIC file to JPG next to it and deletes the original.
+        The JPG is written to a temp file, validated, fsynced and atomically renamed
+        before the original is touched. Returns False if the file was skipped.
+        """
+        jpg_path = os.path.splitext(heic_path)[0] + ".jpg"
+        tmp_path = jpg_path + ".part"
+        state = journal.get_state(heic_path) if journal else None
+
+        # A previous run already put a verified JPG in place; only the delete is left
+        if state in (STATE_COMMITTED, STATE_DONE) and self.validate_jpeg(jpg_path):
+            self._delete_original(heic_path, journal)
+            return False
+
+        if os.path.exists(tmp_path):
+            logger.info(f"Removing stale partial output: {tmp_path}")
+            os.remove(tmp_path)
+
+        if os.path.exists(jpg_path):
+            if self.validate_jpeg(jpg_path):
+                # Convert only if JPG doesn't exist (avoid overwriting existing if user had both)
+                logger.info(f"JPG already exists for {heic_path}, skipping conversion.")
+                return False
+            logger.warning(f"Existing JPG is invalid, re-converting: {jpg_path}")
+
+        # open_heif only parses the container here; pixels are decoded on first access to .data
+        heif_file = pillow_heif.open_heif(heic_path, convert_hdr_to_8bit=True)
+        width, height = heif_file.size
+        pixels = width * height
+
+        if not self.budget.acquire(pixels, lambda: self.is_running):
+            return False
+        try:
+            self.cancel_token.check() # The decode below cannot be interrupted
+            if journal: journal.record(heic_path, STATE_STARTED)
+            image = self._decoded_image(heif_file)
+            # Drop the decoder's buffer before encoding unless the image is still mapped onto it
+            heif_file = None
+            if image.mode not in ("RGB", "RGBX", "L"):
+                image = image.convert("RGB")
+            self.cancel_token.check()
+            with open(tmp_path, "wb") as f:
+                image.save(f, "JPEG", quality=JPEG_QUALITY)
+                f.flush()
+                os.fsync(f.fileno())
+            image.close()
+            image = None
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        finally:
+            self.budget.release(pixels)
+
+        if not self.validate_jpeg(tmp_path, (width, height)):
+            os.remove(tmp_path)
+            raise Exception("Converted JPG failed validation")
+
+        os.replace(tmp_path, jpg_path)
+        self._fsync_dir(os.path.dirname(jpg_path))
+        if self.snapshot: self.snapshot.add_file(jpg_path)
+        if self.manifest: self.manifest.record(jpg_path)
+        if journal: journal.record(heic_path, STATE_COMMITTED)
+
+        self._delete_original(heic_path, journal)
+        return True
+
+    def _delete_original(self, heic_path: str, journal: Optional[ConversionJournal]):
+        # DELETE ORIGINAL
+        try:
+            os.remove(heic_path)
+            logger.info(f"Deleted original: {heic_path}")
+            if self.snapshot: self.snapshot.remove_file(heic_path)
+            if self.manifest: self.manifest.remove(heic_path)
+            if journal: journal.record(heic_path, STATE_DONE)
+        except Exception as del_err:
+            logger.error(f"Failed to delete original {heic_path}: {del_err}")
+
+    @staticmethod
+    def validate_jpeg(path: str, expected_size: Optional[Tuple[int, int]] = None) -> bool:
+        """
+        Cheap integrity check: the header decodes as a JPEG with the expected dimensions
+        and the file ends with an EOI marker (catches truncated writes).
+        """
+        try:
+            if os.path.getsize(path) < 4: return False
+            with Image.open(path) as im:
+                if im.format != "JPEG": return False
+                if expected_size and im.size != tuple(expected_size): return False
+            with open(path, "rb") as f:
+                f.seek(-2, os.SEEK_END)
+                return f.read(2) == b"\xff\xd9"
+        except Exception:
+            return False
+
+    @staticmethod
+    def _fsync_dir(dir_path: str):
+        """Persists the rename on platforms that allow opening directories (not Windows)."""
+        if os.name == "nt": return
+        try:
+            fd = os.open(dir_path, os.O_RDONLY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+        except OSError:
+            pass
+
+    @staticmethod
+    def _decoded_image(heif_file) -> Image.Image:
+        """
+        Wraps the decoded HEIF buffer as a PIL image the JPEG encoder accepts.
+        Alpha images are mapped as RGBX (JPEG drops the fourth channel), so they share the decoder's
+        buffer instead of being copied and then converted. PIL stores RGB as 4 bytes per pixel and
+        cannot map libheif's 3-byte RGB rows, so those get exactly one copy; the caller drops the
+        decoder's buffer right after.
+        """
+        mode = heif_file.mode
+        if mode == "RGBA": mode = "RGBX"
+        return Image.frombuffer(
+            mode,
+            heif_file.size,
+            heif_file.data,
+            "raw",
+            mode,
+            heif_file.stride,
+            1,
+        )
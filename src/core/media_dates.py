@@ -0,0 +1,427 @@
+import os
+import json
+import struct
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional, Tuple
+from ..utils.logger import setup_logger
+from .backup_manifest import hash_file
+
+logger = setup_logger("MediaDates")
+
+DATE_CACHE_FILENAME = ".media_dates_cache.json"
+
+# Read limits - capture time must never require reading a whole file
+JPEG_HEADER_READ = 128 * 1024
+HEIF_META_MAX = 1024 * 1024
+EXIF_MAX = 256 * 1024
+BOX_HEADER_MAX_SCAN = 64 # top-level boxes inspected before giving up
+
+TAG_EXIF_IFD = 0x8769
+TAG_DATETIME = 0x0132
+TAG_DATETIME_ORIGINAL = 0x9003
+
+_MAC_EPOCH = datetime(1904, 1, 1, tzinfo=timezone.utc)
+
+def _parse_exif_datetime(value: bytes) -> Optional[datetime]:
+    try:
+        text = value.split(b"\x00", 1)[0].decode("ascii").strip()
+        return datetime.strptime(text, "%Y:%m:%d %H:%M:%S")
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+def parse_tiff_datetime(tiff: bytes) -> Optional[datetime]:
+    """Extracts DateTimeOriginal (or DateTime as fallback) from a TIFF/EXIF block."""
+    if len(tiff) < 8: return None
+    if tiff[:2] == b"II":
+        endian = "<"
+    elif tiff[:2] == b"MM":
+        endian = ">"
+    else:
+        return None
+
+    def read_ifd(offset: int) -> Dict[int, Tuple[int, int, int]]:
+        tags = {}
+        if offset + 2 > len(tiff): return tags
+        count = struct.unpack_from(endian + "H", tiff, offset)[0]
+        for i in range(count):
+            pos = offset + 2 + i * 12
+            if pos + 12 > len(tiff): break
+            tag, typ, n = struct.unpack_from(endian + "HHI", tiff, pos)
+            tags[tag] = (typ, n, pos + 8)
+        return tags
+
+    def ascii_value(entry: Tuple[int, int, int]) -> Optional[datetime]:
+        typ, n, value_pos = entry
+        if typ != 2: return None
+        if n > 4:
+            value_pos = struct.unpack_from(endian + "I", tiff, value_pos)[0]
+        return _parse_exif_datetime(tiff[value_pos:value_pos + n])
+
+    ifd0 = read_ifd(struct.unpack_from(endian + "I", tiff, 4)[0])
+    if TAG_EXIF_IFD in ifd0:
+        exif_offset = struct.unpack_from(endian + "I", tiff, ifd0[TAG_EXIF_IFD][2])[0]
+        exif_ifd = read_ifd(exif_offset)
+        if TAG_DATETIME_ORIGINAL in exif_ifd:
+            result = ascii_value(exif_ifd[TAG_DATETIME_ORIGINAL])
+            if result: return result
+    if TAG_DATETIME in ifd0:
+        return ascii_value(ifd0[TAG_DATETIME])
+    return None
+
+def read_jpeg_capture_time(f) -> Optional[datetime]:
+    """Walks JPEG segments within the first JPEG_HEADER_READ bytes looking for the Exif APP1 block."""
+    data = f.read(JPEG_HEADER_READ)
+    if data[:2] != b"\xff\xd8": return None
+    pos = 2
+    while pos + 4 <= len(data):
+        if data[pos] != 0xFF: return None
+        marker = data[pos + 1]
+        if marker in (0xD9, 0xDA): return None # End of image / start of scan: no more metadata
+        length = struct.unpack_from(">H", data, pos + 2)[0]
+        if marker == 0xE1 and data[pos + 4:pos + 10] == b"Exif\x00\x00":
+            return parse_tiff_datetime(data[pos + 10:pos + 2 + length])
+        pos += 2 + length
+    return None
+
+def _iter_boxes(data: bytes, start: int = 0, end: Optional[int] = None):
+    """Yields (type, payload_start, box_end) for ISOBMFF boxes contained in data[start:end]."""
+    end = len(data) if end is None else end
+    pos = start
+    while pos + 8 <= end:
+        size, box_type = struct.unpack_from(">I4s", data, pos)
+        header = 8
+        if size == 1:
+            if pos + 16 > end: return
+            size = struct.unpack_from(">Q", data, pos + 8)[0]
+            header = 16
+        elif size == 0:
+            size = end - pos
+        if size < header: return
+        yield box_type, pos + header, min(pos + size, end)
+        pos += size
+
+def _find_top_level_box(f, wanted: bytes, max_size: int) -> Optional[Tuple[int, bytes]]:
+    """Seeks over top-level boxes (reading only headers) and returns (file_offset, payload) of the wanted one."""
+    f.seek(0, os.SEEK_END)
+    file_size = f.tell()
+    pos = 0
+    for _ in range(BOX_HEADER_MAX_SCAN):
+        if pos + 8 > file_size: return None
+        f.seek(pos)
+        header = f.read(16)
+        if len(header) < 8: return None
+        size, box_type = struct.unpack_from(">I4s", header, 0)
+        header_len = 8
+        if size == 1:
+            size = struct.unpack_from(">Q", header, 8)[0]
+            header_len = 16
+        elif size == 0:
+            size = file_size - pos
+        if size < header_len: return None
+        if box_type == wanted:
+            payload_len = size - header_len
+            if payload_len > max_size: return None
+            f.seek(pos + header_len)
+            return pos + header_len, f.read(payload_len)
+        pos += size
+    return None
+
+def read_heif_capture_time(f) -> Optional[datetime]:
+    """Locates the Exif item through the HEIF meta box (iinf + iloc) and parses only that item."""
+    found = _find_top_level_box(f, b"meta", HEIF_META_MAX)
+    if not found: return None
+    meta_offset, meta = found
+    # meta is a FullBox: skip version/flags
+    exif_item_id = None
+    iloc = None
+    idat_offset = None
+    for box_type, start, end in _iter_boxes(meta, 4):
+        if box_type == b"iinf":
+            version = meta[start]
+            count_size = 2 if version == 0 else 4
+            child_start = start + 4 + count_size
+            for infe_type, infe_start, infe_end in _iter_boxes(meta, child_start, end):
+                if infe_type != b"infe": continue
+                infe_version = meta[infe_start]
+                if infe_version < 2: continue
+                pos = infe_start + 4
+                if infe_version == 2:
+                    item_id = struct.unpack_from(">H", meta, pos)[0]
+                    pos += 2
+                else:
+                    item_id = struct.unpack_from(">I", meta, pos)[0]
+                    pos += 4
+                item_type = meta[pos + 2:pos + 6]
+                if item_type == b"Exif":
+                    exif_item_id = item_id
+        elif box_type == b"iloc":
+            iloc = (start, end)
+        elif box_type == b"idat":
+            idat_offset = meta_offset + start
+    if exif_item_id is None or iloc is None: return None
+
+    extent = _find_iloc_extent(meta, iloc[0], exif_item_id)
+    if not extent: return None
+    construction_method, offset, length = extent
+    if construction_method == 1:
+        if idat_offset is None: return None
+        offset += idat_offset
+    elif construction_method != 0:
+        return None
+
+    f.seek(offset)
+    payload = f.read(min(length, EXIF_MAX))
+    if len(payload) < 4: return None
+    # Exif item payload: 4-byte offset to the TIFF header, then (usually) "Exif\0\0" + TIFF
+    tiff_start = 4 + struct.unpack_from(">I", payload, 0)[0]
+    return parse_tiff_datetime(payload[tiff_start:])
+
+def _read_uint(data: bytes, pos: int, size: int) -> int:
+    if size == 0: return 0
+    if size == 4: return struct.unpack_from(">I", data, pos)[0]
+    if size == 8: return struct.unpack_from(">Q", data, pos)[0]
+    if size == 2: return struct.unpack_from(">H", data, pos)[0]
+    raise ValueError(f"Unsupported field size {size}")
+
+def _find_iloc_extent(meta: bytes, start: int, item_id: int) -> Optional[Tuple[int, int, int]]:
+    """Returns (construction_method, offset, length) of the first extent of item_id."""
+    version = meta[start]
+    pos = start + 4
+    offset_size = meta[pos] >> 4
+    length_size = meta[pos] & 0x0F
+    base_offset_size = meta[pos + 1] >> 4
+    index_size = meta[pos + 1] & 0x0F if version in (1, 2) else 0
+    pos += 2
+    if version < 2:
+        count = struct.unpack_from(">H", meta, pos)[0]
+        pos += 2
+    else:
+        count = struct.unpack_from(">I", meta, pos)[0]
+        pos += 4
+    for _ in range(count):
+        if version < 2:
+            current_id = struct.unpack_from(">H", meta, pos)[0]
+            pos += 2
+        else:
+            current_id = struct.unpack_from(">I", meta, pos)[0]
+            pos += 4
+        construction_method = 0
+        if version in (1, 2):
+            construction_method = struct.unpack_from(">H", meta, pos)[0] & 0x0F
+            pos += 2
+        pos += 2 # data_reference_index
+        base_offset = _read_uint(meta, pos, base_offset_size)
+        pos += base_offset_size
+        extent_count = struct.unpack_from(">H", meta, pos)[0]
+        pos += 2
+        first = None
+        for _ in range(extent_count):
+            pos += index_size
+            extent_offset = _read_uint(meta, pos, offset_size)
+            pos += offset_size
+            extent_length = _read_uint(meta, pos, length_size)
+            pos += length_size
+            if first is None:
+                first = (construction_method, base_offset + extent_offset, extent_length)
+        if current_id == item_id:
+            return first
+    return None
+
+def read_quicktime_capture_time(f) -> Optional[datetime]:
+    """Reads mvhd creation_time from the moov box, seeking over mdat (moov may sit at the end)."""
+    f.seek(0, os.SEEK_END)
+    file_size = f.tell()
+    pos = 0
+    for _ in range(BOX_HEADER_MAX_SCAN):
+        if pos + 8 > file_size: return None
+        f.seek(pos)
+        header = f.read(16)
+        size, box_type = struct.unpack_from(">I4s", header, 0)
+        header_len = 8
+        if size == 1:
+            size = struct.unpack_from(">Q", header, 8)[0]
+            header_len = 16
+        elif size == 0:
+            size = file_size - pos
+        if size < header_len: return None
+        if box_type == b"moov":
+            # mvhd is normally the first child; only read child headers until it is found
+            child = pos + header_len
+            moov_end = pos + size
+            while child + 8 <= moov_end:
+                f.seek(child)
+                child_size, child_type = struct.unpack(">I4s", f.read(8))
+                if child_size < 8: return None
+                if child_type == b"mvhd":
+                    body = f.read(min(child_size - 8, 32))
+                    version = body[0]
+                    if version == 1:
+                        created = struct.unpack_from(">Q", body, 4)[0]
+                    else:
+                        created = struct.unpack_from(">I", body, 4)[0]
+                    if created == 0: return None
+                    utc = _MAC_EPOCH + timedelta(seconds=created)
+                    return utc.astimezone().replace(tzinfo=None)
+                child += child_size
+            return None
+        pos += size
+    return None
+
+def read_capture_time(path: str) -> Optional[datetime]:
+    """Capture time from the file header (JPEG/HEIC/MOV/MP4), using bounded partial reads only."""
+    try:
+        with open(path, "rb") as f:
+            head = f.read(12)
+            f.seek(0)
+            if head[:2] == b"\xff\xd8":
+                return read_jpeg_capture_time(f)
+            if head[4:8] == b"ftyp":
+                brand = head[8:12]
+                if brand in (b"heic", b"heix", b"mif1", b"msf1", b"hevc", b"avif"):
+                    return read_heif_capture_time(f)
+                return read_quicktime_capture_time(f)
+            if head[4:8] in (b"moov", b"wide", b"mdat", b"free"):
+                return read_quicktime_capture_time(f)
+    except Exception as e:
+        logger.debug(f"Could not read capture time from {path}: {e}")
+    return None
+
+class DateOrganizer:
+    """
+    Routes files into <root>/<YYYY>/<MM> folders by capture time.
+    Parsed timestamps are cached by (name, size) in a JSON file under root, so re-runs
+    skip header parsing. Falls back to the file's modification time.
+    """
+    def __init__(self, root: str):
+        self.root = root
+        self.cache_path = os.path.join(root, DATE_CACHE_FILENAME)
+        self.cache: Dict[str, float] = {}
+        self.cache_hits = 0
+        self.parsed = 0
+        self._dirty = False
+        self._lock = threading.Lock()
+        self._claimed = set() # Target paths handed out this run (parallel copy workers)
+        self.duplicates = 0
+        self.renamed = 0
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.cache_path): return
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                self.cache = json.load(f)
+        except Exception as e:
+            logger.error(f"Failed to read date cache: {e}")
+            self.cache = {}
+
+    def save(self):
+        """Persists the metadata cache (atomic replace)."""
+        with self._lock:
+            if not self._dirty: return
+            tmp_path = self.cache_path + ".part"
+            try:
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(self.cache, f)
+                os.replace(tmp_path, self.cache_path)
+                self._dirty = False
+            except Exception as e:
+                logger.error(f"Failed to save date cache: {e}")
+
+    @staticmethod
+    def _key(name: str, size: int) -> str:
+        return f"{name.lower()}|{size}"
+
+    def capture_time(self, path: str, name: Optional[str] = None, size: Optional[int] = None) -> datetime:
+        """Returns the capture time of path, from the cache when possible."""
+        name = name or os.path.basename(path)
+        if size is None:
+            size = os.path.getsize(path)
+        key = self._key(name, size)
+        with self._lock:
+            cached = self.cache.get(key)
+        if cached is not None:
+            self.cache_hits += 1
+            return datetime.fromtimestamp(cached)
+
+        taken = read_capture_time(path)
+        if taken is None:
+            taken = datetime.fromtimestamp(os.path.getmtime(path))
+        self.parsed += 1
+        with self._lock:
+            self.cache[key] = taken.timestamp()
+            self._dirty = True
+        return taken
+
+    def relative_dir(self, path: str, name: Optional[str] = None, size: Optional[int] = None) -> str:
+        """Year/month folder for the file at path, relative to root."""
+        taken = self.capture_time(path, name, size)
+        return os.path.join(f"{taken.year:04d}", f"{taken.month:02d}")
+
+    def target_dir(self, path: str, name: Optional[str] = None, size: Optional[int] = None) -> str:
+        """Year/month folder for the file at path (created if missing)."""
+        folder = os.path.join(self.root, self.relative_dir(path, name, size))
+        os.makedirs(folder, exist_ok=True)
+        return folder
+
+    def claim(self, target: str, source_path: str, size: Optional[int] = None) -> Tuple[str, bool]:
+        """
+        Resolves a name clash in a year/month folder before source_path is written to target
+        (files from different source folders can share a name). Returns (path, duplicate):
+        the existing target if it already holds the same content (size and sha256), otherwise
+        target or the first free "name (n).ext", reserved so parallel workers never share it.
+        """
+        if size is None:
+            size = os.path.getsize(source_path)
+        stem, ext = os.path.splitext(target)
+        candidate = target
+        n = 0
+        while True:
+            key = os.path.normcase(os.path.abspath(candidate))
+            with self._lock:
+                taken = key in self._claimed or os.path.exists(candidate)
+                if not taken:
+                    self._claimed.add(key)
+                    if n: self.renamed += 1
+                    return candidate, False
+            if self._same_content(candidate, source_path, size):
+                with self._lock:
+                    self.duplicates += 1
+                return candidate, True
+            n += 1
+            candidate = f"{stem} ({n}){ext}"
+
+    def release(self, target: str):
+        """Gives back a claimed path whose write failed, so a retry can land on the same name."""
+        with self._lock:
+            self._claimed.discard(os.path.normcase(os.path.abspath(target)))
+
+    @staticmethod
+    def _same_content(existing: str, source_path: str, size: int) -> bool:
+        try:
+            if os.path.getsize(existing) != size: return False
+            return hash_file(existing) == hash_file(source_path)
+        except OSError:
+            return False
+
+    def route(self, landed_path: str) -> str:
+        """
+        Moves a landed file into its year/month folder and returns the new path. A file with the same
+        name there is never overwritten: identical content drops the landing, anything else gets a unique name.
+        """
+        target = os.path.join(self.target_dir(landed_path), os.path.basename(landed_path))
+        if os.path.normcase(os.path.abspath(target)) == os.path.normcase(os.path.abspath(landed_path)):
+            return landed_path
+        target, duplicate = self.claim(target, landed_path)
+        if duplicate:
+            logger.info(f"Already in {os.path.dirname(target)}, dropping duplicate: {os.path.basename(landed_path)}")
+            os.remove(landed_path)
+            return target
+        if target != os.path.join(os.path.dirname(target), os.path.basename(landed_path)):
+            logger.warning(f"Name taken in {os.path.dirname(target)}; saving {os.path.basename(landed_path)} as {os.path.basename(target)}")
+        try:
+            os.replace(landed_path, target)
+        except OSError:
+            self.release(target)
+            raise
+        return target
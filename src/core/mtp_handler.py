@@ -5,12 +5,31 @@ from typing import List, Tuple, Callable, Optional
 from ..utils.constants import (
     ALLOWED_EXTENSIONS, 
     COPY_FLAGS_SILENT, 
+    SHCONTF_NONFOLDERS,
+    MTP_BATCH_SIZE,
+    MTP_BATCH_IDLE_TIMEOUT,
     MAX_RETRIES, 
     RETRY_DELAY,
-    VERIFY_POLL_INTERVAL
+    VERIFY_POLL_INTERVAL,
+    DEFAULT_SCHEDULE_POLICY,
+    SCHEDULE_SOURCE_ORDER
 )
 from ..utils.logger import setup_logger
 from .file_system_handler import FileSystemHandler
+from .dir_scanner import DirectorySnapshot
+from .media_dates import DateOrganizer
+from .throttle import TokenBucket, IoPriority
+from .transfer_policy import ThroughputEstimator, RetryQueue
+from .scheduler import order_plan
+from .file_plan import FailureLog
+from .fanout import FanOutWriter
+from .pack_archive import PackWriter
+from .backup_manifest import BackupManifest
+from .folder_fingerprints import FolderFingerprints, FINGERPRINT_SKIP_LIVE
+from .selection import SelectionQuery
+from .cancellation import CancellationToken
+from .failure_manifest import FailureManifest
+from .content_type import ContentTypeCache, sniff_file, extension_matches
 
 logger = setup_logger("MTPHandler")
 
@@ -21,8 +40,31 @@ class MTPHandler:
     def __init__(self, status_callback: Optional[Callable] = None):
         self.status_callback = status_callback
         self.is_running = False
+        self.cancel_token = CancellationToken() # Wakes poll loops on stop; replaced at the start of each run
         self.files_processed = 0
-        self.failed_files: List[Tuple[str, str]] = []
+        self.copied_bytes = 0
+        self.failed_files = FailureLog()
+        self.dest_snapshot: Optional[DirectorySnapshot] = None
+        self.throughput = ThroughputEstimator()
+        self.retry_queue = RetryQueue()
+        self.failed_files.clear()
+        self.schedule_policy = DEFAULT_SCHEDULE_POLICY
+        self.landed_callback: Optional[Callable[[str], None]] = None # Called with each verified destination path
+        self.organizer: Optional[DateOrganizer] = None # Routes files into Year/Month folders when set
+        self.rate_limiter: Optional[TokenBucket] = None # Shell paces the copy itself; we pace per file
+        self.io_priority: Optional[IoPriority] = None
+        self.fanout: Optional[FanOutWriter] = None # Mirrors each landed file to extra destinations
+        self.packer: Optional[PackWriter] = None # Packed output mode: landed files are moved into tar volumes
+        self.manifest: Optional[BackupManifest] = None # Records size and sha256 of every landed file
+        self.dest_root: Optional[str] = None
+        self.fingerprints: Optional[FolderFingerprints] = None # Skips device folders unchanged since the last backup
+        self.selection: Optional[SelectionQuery] = None # Applied while enumerating; prunes folders by name
+        self.failure_manifest: Optional[FailureManifest] = None # Source identity of items that could not be copied
+        self.content_types: Optional[ContentTypeCache] = None # Header-sniffed types of extensionless items, by item identity
+        self.batch_copy = True # Hand the Shell up to MTP_BATCH_SIZE items per CopyHere call
+        self.shell = None # Shell.Application owned by the calling (service) thread; created on demand if None
+        self._dest_folders = {} # Resolved destination Shell folders for the current run
+        self._folder_parts: Tuple[str, ...] = () # Device folder names from the source folder to the one being processed
 
     def update_status(self, text: str):
         """Standard status callback wrapper."""
@@ -37,19 +79,22 @@ class MTPHandler:
             self.status_callback("time", f"Files Copied: {self.files_processed}")
 
     def stop(self):
-        """Signals the copy process to stop."""
+        """Signals the copy process to stop; waiting poll loops return immediately."""
         self.is_running = False
+        self.cancel_token.cancel()
 
     def normalize_name(self, name: str) -> str:
         """Removes hidden unicode markers often found in MTP folder names."""
         if not name: return ""
         return name.replace('\u200e', '').replace('\u200f', '').strip()
 
-    def backup_shell_mode(self, source_item, dest_root: str, selected_subfolders: Optional[List[str]] = None, skip_live_photos: bool = False):
+    def backup_shell_mode(self, source_item, dest_root: str, selected_subfolders: Optional[List[str]] = None, skip_live_photos: bool = False, dest_snapshot: Optional[DirectorySnapshot] = None, source_key: str = ""):
         """
         Main entry point for MTP backup using Shell.Application.
+        Landed files are recorded in dest_snapshot, if given.
+        source_key identifies the source folder (e.g. joined breadcrumbs) for folder fingerprints.
         """
-        self.is_running = True
+        self._start_run(dest_root, dest_snapshot)
         source_folder = None
         try:
             source_folder = source_item.GetFolder
@@ -66,27 +111,110 @@ class MTPHandler:
             logger.info(f"Filtering by selected subfolders: {selected_subfolders}")
             items = source_folder.Items()
             for item in items:
-                if not self.is_running: return
+                if not self.is_running: break
                 if item.Name in selected_subfolders:
-                    new_dest_path = os.path.join(dest_root, item.Name)
+                    # With date organization files land in the root and are then routed to Year/Month
+                    new_dest_path = dest_root if self.organizer else os.path.join(dest_root, item.Name)
                     os.makedirs(new_dest_path, exist_ok=True)
                     if item.IsFolder:
-                         self.process_shell_folder(item.GetFolder, new_dest_path, skip_live_photos)
+                         self.process_shell_folder(item.GetFolder, new_dest_path, skip_live_photos, f"{source_key}/{item.Name}", (item.Name,))
         else:
-            self.process_shell_folder(source_folder, dest_root, skip_live_photos)
+            self.process_shell_folder(source_folder, dest_root, skip_live_photos, source_key)
+
+        self.process_retry_queue()
 
-    def process_shell_folder(self, folder_obj, current_dest_path: str, skip_live_photos: bool = False):
+    def _start_run(self, dest_root: str, dest_snapshot: Optional[DirectorySnapshot]):
+        self.is_running = True
+        self.cancel_token = CancellationToken()
+        self.dest_snapshot = dest_snapshot
+        self.dest_root = dest_root
+        self._dest_folders = {}
+        self._folder_parts = ()
+        self.retry_queue = RetryQueue()
+
+    def retry_failed(self, source_folder, records: List[dict], dest_root: str, dest_snapshot: Optional[DirectorySnapshot] = None):
+        """
+        Copies the items of a failure manifest again. Each item is looked up by name in its
+        recorded folder below source_folder (one listing per folder) and copied to its recorded
+        destination folder. Items that fail again are recorded in failure_manifest.
+        """
+        self._start_run(dest_root, dest_snapshot)
+        folders = {(): source_folder}
+        listings = {}
+        for index, record in enumerate(records):
+            if not self.is_running:
+                if self.failure_manifest is not None:
+                    for untried in records[index:]: self.failure_manifest.carry(untried)
+                return
+            parts = tuple(record["folder"])
+            name = record["name"]
+            current_dest_path = os.path.join(dest_root, record["dest_dir"])
+            try:
+                item = self._find_item(folders, listings, parts, name)
+            except Exception as e:
+                item = None
+                logger.error(f"Could not list {'/'.join(parts)}: {e}")
+            if item is None:
+                self._record_failure((None, name, record["final_name"], current_dest_path, parts), "Item no longer on the device")
+                continue
+            os.makedirs(current_dest_path, exist_ok=True)
+            self.update_status(f"Retrying: {name}")
+            self._folder_parts = parts
+            if not self._copy_or_defer(item, name, record["final_name"], current_dest_path) and self.cancel_token.is_cancelled:
+                if self.failure_manifest is not None: self.failure_manifest.carry(record)
+        self.process_retry_queue()
+
+    def _find_item(self, folders: dict, listings: dict, parts: Tuple[str, ...], name: str):
+        """Finds a Shell item by folder names and item name, caching folders and listings."""
+        if parts not in folders:
+            parent = None if not parts else self._find_item(folders, listings, parts[:-1], parts[-1])
+            folders[parts] = parent.GetFolder if parent is not None and parent.IsFolder else None
+        folder = folders[parts]
+        if folder is None: return None
+        if parts not in listings:
+            listings[parts] = {item.Name: item for item in folder.Items()}
+        return listings[parts].get(name)
+
+    def _record_failure(self, payload, error: str):
+        """Adds an item that could not be copied to the failure report (and the failure manifest, if set)."""
+        item, name, final_name, current_dest_path, folder_parts = payload
+        self.failed_files.append((name, error))
+        if self.failure_manifest is None or self.packer: return
+        size = None
+        try:
+            if item is not None: size = item.Size
+        except Exception: pass
+        self.failure_manifest.record_mtp(list(folder_parts), name, final_name, current_dest_path, size, error)
+
+    def process_shell_folder(self, folder_obj, current_dest_path: str, skip_live_photos: bool = False, folder_key: str = "", folder_parts: Tuple[str, ...] = ()):
         """
         Recursively processes an MTP folder.
         Scanning items, filtering by extension, and copying files.
+        Leaf folders whose fingerprint is unchanged since the last complete backup are skipped.
+        folder_parts are the folder names below the source folder, recorded for failed items.
         """
         if not self.is_running: return
+        self._folder_parts = folder_parts
 
         try:
             items = folder_obj.Items()
             if items is None: return
+            
+            # A fingerprint recorded while skipping Live Photo videos only holds for runs that skip them too
+            run_options = FINGERPRINT_SKIP_LIVE if skip_live_photos else ""
+            if self.fingerprints and folder_key and self.fingerprints.unchanged(folder_key, items, run_options):
+                logger.info(f"Skipping unchanged folder: {folder_obj.Title}")
+                return
                 
             logger.info(f"Processing folder: {folder_obj.Title} ({items.Count} items)")
+            deferred_before = len(self.retry_queue)
+            bytes_before = self.copied_bytes
+            has_subfolders = False
+            item_errors = False
+            live_skipped = False
+            file_count = 0
+            batch = []
+            batches_sent = 0
             
             # Pre-scan for Image files (HEIC, JPG) if skipping live photos
             image_basenames = set()
@@ -108,7 +236,7 @@ class MTPHandler:
                              image_basenames.add(name.lower())
                     except: pass
             
-            for item in items:
+            for item in self._order_items(items):
                 if not self.is_running: return
                 
                 try:
@@ -116,11 +244,24 @@ class MTPHandler:
                     is_folder = item.IsFolder
                     
                     if is_folder:
+                        if self.selection and not self.selection.may_contain_folder(name):
+                            logger.info(f"Skipping folder outside the selected dates: {name}")
+                            continue
+                        if batch:
+                            # Sorted policies put every file before the first folder; in Shell (source) order
+                            # more files may follow, so the batch cannot stand for the whole folder yet
+                            files_complete = self.schedule_policy != SCHEDULE_SOURCE_ORDER
+                            self._flush_batch(folder_obj, batch, current_dest_path, whole_folder=files_complete and not batches_sent and len(batch) == file_count)
+                            batch = []
+                            batches_sent += 1
                         logger.debug(f"Recursing into: {name}")
-                        new_dest_path = os.path.join(current_dest_path, name)
+                        has_subfolders = True
+                        new_dest_path = current_dest_path if self.organizer else os.path.join(current_dest_path, name)
                         os.makedirs(new_dest_path, exist_ok=True)
-                        self.process_shell_folder(item.GetFolder, new_dest_path, skip_live_photos)
+                        self.process_shell_folder(item.GetFolder, new_dest_path, skip_live_photos, f"{folder_key}/{name}" if folder_key else "", folder_parts + (name,))
+                        self._folder_parts = folder_parts
                     else:
+                        file_count += 1
                         try:
                             ext = os.path.splitext(name)[1].lower()
                         except: 
@@ -132,27 +273,33 @@ class MTPHandler:
                         # We check if the BASE name exists in our list of found images
                         if skip_live_photos and ext == '.mov' and item_basename in image_basenames:
                             logger.info(f"Skipping Live Photo video: {name}")
+                            live_skipped = True
                             continue
 
-                        # If extension is missing, we might want to copy it anyway and detect type later,
-                        # OR try to infer it now.
+                        # Without an extension the type comes from the landed file's header
+                        # (cached per item, so later runs know it without touching the item)
                         inferred_ext = ext
                         if not inferred_ext:
-                            try:
-                                full_path = item.Path
-                                inferred_ext = os.path.splitext(full_path)[1].lower()
-                            except: pass
-                        
-                        item_type = item.Type
-                        is_allowed = inferred_ext in ALLOWED_EXTENSIONS
+                            cached = self.content_types.lookup(ContentTypeCache.key(folder_parts, name, item.Size)) if self.content_types is not None else None
+                            if cached == "":
+                                logger.info(f"Skipping non-media item: {name}")
+                                continue
+                            if cached:
+                                inferred_ext = cached
+                            else:
+                                try:
+                                    # The Shell may hide the extension in Name; Path tells where the copy lands
+                                    inferred_ext = os.path.splitext(item.Path)[1].lower()
+                                except: pass
                         
-                        if not is_allowed and not inferred_ext:
-                            # Fallback check on Type string
-                            type_lower = item_type.lower()
-                            if any(x in type_lower for x in ['image', 'video', 'movie', 'jpg', 'png', 'mov', 'mp4', 'heic', 'תמונה', 'וידאו', 'סרט']):
-                                is_allowed = True
+                        # Unknown types are copied and decided by their header once landed
+                        is_allowed = inferred_ext in ALLOWED_EXTENSIONS or not inferred_ext
+
+                        if is_allowed and self.selection and not self.selection.is_empty:
+                            is_allowed = self._selected(item, inferred_ext)
 
                         if is_allowed:
+                            if self.io_priority: self.io_priority.sync()
                             self.update_status(f"Copying: {name}")
                             
                             # Determine final target name
@@ -161,72 +308,360 @@ class MTPHandler:
                                 final_name = name + inferred_ext
                                 logger.info(f"Target filename will be: {final_name}")
 
-                            # Windows Shell CopyHere copies to folder, using the Item's internal name.
-                            # We cannot easily rename DURING copy. 
-                            # Strategy: Copy -> Verify -> Rename if component missing.
-                            
-                            logger.info(f"Attempting copy to {current_dest_path}")
-                            
-                            try:
-                                shell = win32com.client.Dispatch("Shell.Application")
-                                if not os.path.exists(current_dest_path):
-                                    os.makedirs(current_dest_path, exist_ok=True)
-                                
-                                current_dest_path = os.path.abspath(current_dest_path)
-                                dest_folder_shell = self.wait_for_shell_folder(shell, current_dest_path)
-
-                                if dest_folder_shell:
-                                    logger.debug(f"Sending CopyHere command for {name}...")
-                                    # 1. Perform Copy
-                                    dest_folder_shell.CopyHere(item, COPY_FLAGS_SILENT)
-                                    
-                                    expected_size = item.Size
-                                    
-                                    # 2. Wait/Verify & Rename Loop
-                                    # The file might land as 'IMG_1234' (no ext) or 'IMG_1234.JPG'
-                                    
-                                    target_path_with_ext = os.path.join(current_dest_path, final_name)
-                                    target_path_raw = os.path.join(current_dest_path, name)
-                                    
-                                    # Determine which file we actally look for to verify
-                                    # We'll use a custom verification that looks for EITHER
-                                    
-                                    found_path = self.verify_and_fix_file(
-                                        folder_path=current_dest_path,
-                                        original_name=name,
-                                        final_name=final_name,
-                                        expected_size=expected_size
-                                    )
-
-                                    if found_path:
-                                        self.files_processed += 1
-                                        self.update_progress_count()
-                                        logger.info(f"Copy verified: {os.path.basename(found_path)}")
-                                    else:
-                                        raise Exception("File verification failed (size mismatch or timeout)")
-                                else:
-                                    raise Exception("Could not resolve destination folder")
-
-                            except Exception as e:
-                                logger.error(f"FAILED to copy {name}: {e}")
-                                self.cleanup_failed_copy(current_dest_path, name)
-                                self.failed_files.append((name, str(e)))
+                            if self.batch_copy and not any(c in name for c in ";*?"):
+                                batch.append((item, name, final_name, item.Size))
+                                if len(batch) >= MTP_BATCH_SIZE:
+                                    self._flush_batch(folder_obj, batch, current_dest_path)
+                                    batch = []
+                                    batches_sent += 1
+                            else:
+                                self._copy_or_defer(item, name, final_name, current_dest_path)
 
                 except Exception as e:
                     logger.error(f"Error processing item in {folder_obj.Title}: {e}")
+                    item_errors = True
                     continue
 
+            # Enumeration of this folder is complete from here on
+            if batch and self.is_running:
+                # A single batch covering every file can use the unfiltered folder listing
+                self._flush_batch(folder_obj, batch, current_dest_path, whole_folder=not batches_sent and len(batch) == file_count)
+
+            # Only complete leaf folders get a fingerprint; a parent's count does not reflect changes below it
+            # A filtered run did not copy everything, so it must not mark the folder as done
+            filtered = self.selection is not None and not self.selection.is_empty
+            if self.fingerprints and folder_key and self.is_running and not filtered and not has_subfolders and not item_errors and len(self.retry_queue) == deferred_before:
+                self.fingerprints.record(folder_key, items, self.copied_bytes - bytes_before, FINGERPRINT_SKIP_LIVE if live_skipped else "")
+
         except Exception as e:
             logger.error(f"Error accessing folder {folder_obj.Title}: {e}")
             self.failed_files.append((folder_obj.Title, f"Folder Access Error: {e}"))
 
+    def _selected(self, item, ext: str) -> bool:
+        """Evaluates the selection query for a Shell item, reading the date only when the query needs it."""
+        if not self.selection.allows_ext(ext):
+            self.selection.excluded += 1
+            return False
+        timestamp = None
+        if self.selection.has_time_bounds:
+            try:
+                timestamp = item.ModifyDate.timestamp()
+            except Exception:
+                pass # Unknown date: keep the item
+        return self.selection.matches(ext, item.Size, timestamp)
+
+    def _copy_or_defer(self, item, name: str, final_name: str, current_dest_path: str) -> bool:
+        """Copies one item; on failure cleans up and queues it for a retry at the end of the run. Returns True if it landed."""
+        try:
+            self.copy_item(item, name, final_name, current_dest_path)
+            return True
+        except Exception as e:
+            logger.error(f"FAILED to copy {name}: {e}")
+            self.cleanup_failed_copy(current_dest_path, name, final_name)
+            if self.cancel_token.is_cancelled: return False # Stopped mid-copy, not a device failure
+            # Retried at the end of the run so a bad item does not stall the stream
+            self.retry_queue.defer((item, name, final_name, current_dest_path, self._folder_parts), name, str(e))
+            return False
+
+    def _flush_batch(self, folder_obj, batch: list, current_dest_path: str, whole_folder: bool = False):
+        """Copies a batch in one Shell call, then retries only the items that did not land."""
+        self.update_status(f"Copying {len(batch)} items...")
+        try:
+            misses = self.copy_batch(folder_obj, batch, current_dest_path, whole_folder)
+        except Exception as e:
+            logger.error(f"Batched copy failed: {e}")
+            misses = batch
+        if misses and len(misses) < len(batch):
+            logger.info(f"{len(misses)} of {len(batch)} batched items did not land; copying them individually")
+        for item, name, final_name, _ in misses:
+            self.cleanup_failed_copy(current_dest_path, name, final_name)
+            if not self.is_running: continue # Stopped: only remove partial landings
+            self.update_status(f"Copying: {name}")
+            self._copy_or_defer(item, name, final_name, current_dest_path)
+
+    def _order_items(self, items) -> list:
+        """
+        Applies schedule_policy to the files of one folder (Shell transfers are sequential).
+        Subfolders are visited after the folder's own files.
+        """
+        if self.schedule_policy == SCHEDULE_SOURCE_ORDER:
+            return list(items)
+        files, folders = [], []
+        for item in items:
+            try:
+                (folders if item.IsFolder else files).append(item)
+            except Exception:
+                files.append(item)
+
+        def size_of(item) -> int:
+            try:
+                return int(item.Size)
+            except Exception:
+                return 0
+
+        def mtime_of(item) -> float:
+            try:
+                return item.ModifyDate.timestamp()
+            except Exception:
+                return 0.0
+
+        return order_plan(files, self.schedule_policy, size_of, mtime_of) + folders
+
+    def copy_item(self, item, name: str, final_name: str, current_dest_path: str) -> str:
+        """
+        Copies a single Shell item into current_dest_path and verifies it landed.
+        Returns the final path ("" for a landing that was not media); raises on failure.
+        """
+        # Windows Shell CopyHere copies to folder, using the Item's internal name.
+        # We cannot easily rename DURING copy. 
+        # Strategy: Copy -> Verify -> Rename if component missing.
+        
+        logger.info(f"Attempting copy to {current_dest_path}")
+        current_dest_path, dest_folder_shell = self._resolve_dest_folder(current_dest_path)
+
+        expected_size = item.Size
+        logger.debug(f"Sending CopyHere command for {name}...")
+        # 1. Perform Copy
+        copy_start = time.time()
+        dest_folder_shell.CopyHere(item, COPY_FLAGS_SILENT)
+        
+        # 2. Wait/Verify & Rename Loop
+        # The file might land as 'IMG_1234' (no ext) or 'IMG_1234.JPG'
+        found_path = self.verify_and_fix_file(
+            folder_path=current_dest_path,
+            original_name=name,
+            final_name=final_name,
+            expected_size=expected_size
+        )
+
+        if found_path is None:
+            raise Exception("File verification failed (size mismatch or timeout)")
+
+        self.throughput.update(expected_size, time.time() - copy_start)
+        if not found_path: return found_path # Landed but not media or not selected; already removed
+        return self._finish_landed(found_path, expected_size)
+
+    def _resolve_dest_folder(self, current_dest_path: str):
+        """Returns (absolute path, Shell folder) for a destination directory, cached for the run."""
+        if self.shell is None:
+            self.shell = win32com.client.Dispatch("Shell.Application")
+        if not os.path.exists(current_dest_path):
+            os.makedirs(current_dest_path, exist_ok=True)
+        
+        current_dest_path = os.path.abspath(current_dest_path)
+        dest_folder_shell = self._dest_folders.get(current_dest_path)
+        if dest_folder_shell is None:
+            dest_folder_shell = self.wait_for_shell_folder(self.shell, current_dest_path)
+            if dest_folder_shell:
+                self._dest_folders[current_dest_path] = dest_folder_shell
+
+        if not dest_folder_shell:
+            raise Exception("Could not resolve destination folder")
+        return current_dest_path, dest_folder_shell
+
+    def _finish_landed(self, found_path: str, expected_size: int) -> str:
+        """Records a verified landing (pack/organize, snapshot, manifest, callbacks, pacing) and returns its final path."""
+        if self.packer:
+            found_path = self._pack_landed(found_path)
+            self.files_processed += 1
+            self.copied_bytes += expected_size
+            if self.rate_limiter:
+                self.rate_limiter.consume(expected_size, lambda: self.is_running)
+            self.update_progress_count()
+            return found_path
+        self.files_processed += 1
+        self.copied_bytes += expected_size
+        if self.organizer:
+            found_path = self.organizer.route(found_path)
+        if self.dest_snapshot:
+            self.dest_snapshot.add_file(found_path)
+        if self.manifest:
+            self.manifest.record(found_path)
+        if self.landed_callback:
+            self.landed_callback(found_path)
+        if self.fanout and self.dest_root:
+            self._mirror(found_path)
+        if self.rate_limiter:
+            # CopyHere cannot be paced mid-file, so hold the next item back instead
+            self.rate_limiter.consume(expected_size, lambda: self.is_running)
+        self.update_progress_count()
+        logger.info(f"Copy verified: {os.path.basename(found_path)}")
+        return found_path
+
+    def copy_batch(self, folder_obj, batch: list, current_dest_path: str, whole_folder: bool = False) -> list:
+        """
+        Copies several items of folder_obj with a single CopyHere call.
+        batch holds (item, name, final_name, expected_size) tuples; the Shell receives a
+        FolderItems collection filtered to those names (or to all files when whole_folder).
+        Landings are verified together; returns the entries that did not land, for individual retry.
+        """
+        try:
+            collection = folder_obj.Items()
+            spec = "*" if whole_folder else ";".join(name for _, name, _, _ in batch)
+            collection.Filter(SHCONTF_NONFOLDERS, spec)
+            if collection.Count != len(batch):
+                logger.warning(f"Filtered collection has {collection.Count} items, expected {len(batch)}; copying individually")
+                return batch
+        except Exception as e:
+            logger.warning(f"Batched copy unavailable ({e}); copying individually")
+            return batch
+
+        current_dest_path, dest_folder_shell = self._resolve_dest_folder(current_dest_path)
+        logger.info(f"Sending one CopyHere for {len(batch)} items to {current_dest_path}")
+        copy_start = time.time()
+        dest_folder_shell.CopyHere(collection, COPY_FLAGS_SILENT)
+
+        landed = self._verify_batch(current_dest_path, batch)
+        if landed:
+            self.throughput.update(sum(batch[i][3] for i in landed), time.time() - copy_start)
+        misses = []
+        for index, entry in enumerate(batch):
+            if index in landed:
+                if landed[index]: self._finish_landed(landed[index], entry[3])
+            else:
+                misses.append(entry)
+        return misses
+
+    def _verify_batch(self, folder_path: str, batch: list) -> dict:
+        """
+        Polls all expected landings of a batch together until each is present with a stable size.
+        Gives up on the rest once nothing has changed for MTP_BATCH_IDLE_TIMEOUT or the
+        throughput-based timeout for the whole batch expires. Returns {batch index: final path} ("" = not media or excluded by the selection).
+        """
+        timeout = self.throughput.timeout_for(sum(entry[3] for entry in batch))
+        start = last_change = time.time()
+        last_sizes = {}
+        stable = {}
+        landed = {}
+        while len(landed) < len(batch) and self.is_running:
+            now = time.time()
+            if now - start > timeout or now - last_change > MTP_BATCH_IDLE_TIMEOUT: break
+            for index, (_, name, final_name, expected_size) in enumerate(batch):
+                if index in landed: continue
+                path_final = os.path.join(folder_path, final_name)
+                path_raw = os.path.join(folder_path, name)
+                current_path = path_final if os.path.exists(path_final) else path_raw
+                try:
+                    current_size = os.path.getsize(current_path)
+                except OSError:
+                    continue
+                if current_size == 0: continue
+                if current_size != last_sizes.get(index):
+                    last_sizes[index] = current_size
+                    stable[index] = 0
+                    last_change = time.time()
+                    continue
+                stable[index] += 1
+                # Same stability rule as verify_and_fix_file
+                if stable[index] >= 2:
+                    landed[index] = self._settle_landed(current_path, path_final, self._sniff_key(name, expected_size))
+                    last_change = time.time()
+            if self.status_callback:
+                self.status_callback("file_progress", (f"{len(batch)} items", len(landed), len(batch)))
+            if not self.cancel_token.sleep(0.5): break
+        return landed
+
+    def _sniff_key(self, name: str, size: int) -> Optional[str]:
+        """Identity of an item whose type must come from its header (None if its name has an extension)."""
+        if os.path.splitext(name)[1]: return None
+        return ContentTypeCache.key(self._folder_parts, name, size)
+
+    def _landed_type(self, sniff_key: str, path: str) -> Optional[str]:
+        """Extension for a landed extensionless item: cached, else read from its first bytes. "" = not media, None = unknown."""
+        if self.content_types is None: return sniff_file(path)
+        cached = self.content_types.lookup(sniff_key)
+        return cached if cached is not None else self.content_types.detect(sniff_key, path)
+
+    def _settle_landed(self, current_path: str, path_final: str, sniff_key: Optional[str] = None) -> str:
+        """
+        Settles a landed file and returns its path. Extensionless items (sniff_key given) are named
+        after the type found in their header; a landing that is not media, or whose sniffed type the
+        selection excludes, is removed and "" returned.
+        """
+        if sniff_key is not None:
+            ext = self._landed_type(sniff_key, current_path)
+            if ext == "":
+                logger.info(f"Not a media file, removing: {os.path.basename(current_path)}")
+                return self._discard_landed(current_path)
+            if ext and self.selection and not self.selection.allows_ext(ext):
+                logger.info(f"Excluded by selection ({ext}), removing: {os.path.basename(current_path)}")
+                self.selection.excluded += 1
+                return self._discard_landed(current_path)
+            if ext and not extension_matches(ext, os.path.splitext(path_final)[1]):
+                path_final = os.path.splitext(path_final)[0] + ext
+        return self._settle_name(current_path, path_final)
+
+    def _discard_landed(self, path: str) -> str:
+        try:
+            os.remove(path)
+        except OSError as e:
+            logger.error(f"Could not remove {path}: {e}")
+        return ""
+
+    def _settle_name(self, current_path: str, path_final: str) -> str:
+        """Renames a landed file to its final name (e.g. IMG_1234 -> IMG_1234.JPG) and returns its path."""
+        if current_path == path_final: return current_path
+        try:
+            # If final path exists (collision?), try to remove it or skip
+            if os.path.exists(path_final):
+                logger.warning(f"Target path {path_final} already exists. Overwriting...")
+                os.remove(path_final)
+                
+            os.rename(current_path, path_final)
+            logger.info(f"Renamed {os.path.basename(current_path)} -> {os.path.basename(path_final)}")
+            return path_final
+        except Exception as rename_err:
+            logger.error(f"Failed to rename file: {rename_err}")
+            # Continue with raw path if rename fails
+            return current_path
+
+    def _pack_landed(self, path: str) -> str:
+        """Moves a landed file into the pack and returns its archive name."""
+        name = os.path.basename(path)
+        if self.organizer:
+            arcname = os.path.join(self.organizer.relative_dir(path), name)
+        else:
+            arcname = os.path.relpath(path, self.dest_root)
+        self.packer.add_file(path, arcname)
+        os.remove(path)
+        return arcname
+
+    def _mirror(self, path: str):
+        """Queues a landed file to the mirrors; a mirror problem never fails the primary copy."""
+        try:
+            self.fanout.replicate_file(path, os.path.relpath(path, self.dest_root))
+        except Exception as e:
+            logger.error(f"Could not mirror {os.path.basename(path)}: {e}")
+            self.failed_files.append((f"{os.path.basename(path)} [mirrors]", str(e)))
+
+    def _retry_item(self, payload):
+        item, name, final_name, current_dest_path, _ = payload
+        self.update_status(f"Retrying: {name}")
+        try:
+            self.copy_item(item, name, final_name, current_dest_path)
+        except Exception:
+            self.cleanup_failed_copy(current_dest_path, name, final_name)
+            raise
+
+    def process_retry_queue(self):
+        """Retries items that failed during the main pass, with backoff."""
+        if not len(self.retry_queue): return
+        self.update_status(f"Retrying {len(self.retry_queue)} failed items...")
+        recovered = self.retry_queue.drain(
+            self._retry_item,
+            lambda name, error, payload: self._record_failure(payload, error),
+            lambda: self.is_running
+        )
+        logger.info(f"Retry queue recovered {recovered} items")
+
     def verify_and_fix_file(self, folder_path: str, original_name: str, final_name: str, expected_size: int) -> Optional[str]:
         """
         Waits for the file to appear, stabilizes, and renames it if necessary.
-        Returns the final path if successful, None otherwise.
+        The timeout scales with expected_size and the measured device throughput.
+        Returns the final path if successful, "" if the landing turned out not to be media (it is removed), None otherwise.
         """
         start_time = time.time()
-        timeout = 20  # generous timeout for MTP transfers
+        timeout = self.throughput.timeout_for(expected_size)
         
         path_raw = os.path.join(folder_path, original_name)
         path_final = os.path.join(folder_path, final_name)
@@ -242,7 +677,7 @@ class MTPHandler:
             exists_final = os.path.exists(path_final)
             
             if not exists_raw and not exists_final:
-                time.sleep(0.5)
+                self.cancel_token.sleep(0.5)
                 continue
                 
             current_path = path_final if exists_final else path_raw
@@ -252,7 +687,7 @@ class MTPHandler:
                 
                 # If size is 0, it's still being created
                 if current_size == 0:
-                    time.sleep(0.5)
+                    self.cancel_token.sleep(0.5)
                     continue
                     
                 # Check for stability
@@ -264,22 +699,8 @@ class MTPHandler:
                 
                 # If stable enough (MTP can be slow/bursty)
                 if stable_count >= 2:
-                    # Rename if needed (e.g. we have IMG_1234 but want IMG_1234.JPG)
-                    if current_path != path_final:
-                        try:
-                            # If final path exists (collision?), try to remove it or skip
-                            if os.path.exists(path_final):
-                                logger.warning(f"Target path {path_final} already exists. Overwriting...")
-                                os.remove(path_final)
-                                
-                            os.rename(current_path, path_final)
-                            logger.info(f"Renamed {os.path.basename(current_path)} -> {os.path.basename(path_final)}")
-                            current_path = path_final
-                        except Exception as rename_err:
-                            logger.error(f"Failed to rename file: {rename_err}")
-                            # Continue with raw path if rename fails
-                    
-                    return current_path
+                    # Rename if needed (e.g. we have IMG_1234 but its header says JPEG)
+                    return self._settle_landed(current_path, path_final, self._sniff_key(original_name, expected_size))
                 
                 # Update progress UI
                 if self.status_callback:
@@ -288,31 +709,25 @@ class MTPHandler:
             except Exception as e:
                 logger.debug(f"Error checking file size: {e}")
                 
-            time.sleep(0.5)
+            self.cancel_token.sleep(0.5)
             
         return None
 
-    def cleanup_failed_copy(self, dest_dir: str, base_name: str):
-        """Attempts to remove partial files after a failure."""
-        try:
-            candidates = []
-            exact_path = os.path.join(dest_dir, base_name)
-            if os.path.exists(exact_path):
-                candidates.append(exact_path)
-            
-            # Also check for likely partials with similar names
-            if os.path.exists(dest_dir):
-                for f in os.listdir(dest_dir):
-                    if f.startswith(base_name) and f != base_name:
-                         # Very loose match to catch temp files
-                         candidates.append(os.path.join(dest_dir, f))
-            
-            for cand in candidates:
+    def cleanup_failed_copy(self, dest_dir: str, base_name: str, final_name: Optional[str] = None):
+        """
+        Removes the partial landing of a failed item: only its exact raw and final names and their .part files.
+        Same-stem siblings (IMG_1234.HEIC next to a failed IMG_1234 video) are verified files and are never touched.
+        """
+        names = {base_name, final_name or base_name}
+        for name in names:
+            for candidate in (os.path.join(dest_dir, name), os.path.join(dest_dir, name + ".part")):
                 try:
-                    os.remove(cand)
-                    logger.info(f"Cleaned up partial: {cand}")
-                except: pass
-        except: pass
+                    if os.path.exists(candidate):
+                        os.remove(candidate)
+                        logger.info(f"Cleaned up partial: {candidate}")
+                    if self.dest_snapshot: self.dest_snapshot.remove_file(candidate)
+                except OSError as e:
+                    logger.debug(f"Could not clean up {candidate}: {e}")
 
     def wait_for_shell_folder(self, shell, path: str, timeout: int = 5):
         logger.debug(f"Resolving '{path}'")
@@ -337,5 +752,5 @@ class MTPHandler:
                     if item and item.IsFolder:
                         return item.GetFolder
             except: pass
-            time.sleep(VERIFY_POLL_INTERVAL)
+            if not self.cancel_token.sleep(VERIFY_POLL_INTERVAL): return None
         return None
@@ -0,0 +1,259 @@
+import os
+import json
+import time
+import hashlib
+import tarfile
+import threading
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from ..utils.constants import (
+    CHUNK_SIZE,
+    PACK_VOLUME_PREFIX,
+    PACK_VOLUME_BYTES,
+    PACK_INDEX_FILENAME,
+    PACK_VERIFY_READBACK
+)
+from ..utils.logger import setup_logger
+
+logger = setup_logger("PackArchive")
+
+BLOCK_SIZE = tarfile.BLOCKSIZE
+
+def _volume_name(number: int) -> str:
+    return f"{PACK_VOLUME_PREFIX}{number:04d}.tar"
+
+def _list_volumes(root: str) -> List[str]:
+    try:
+        names = os.listdir(root)
+    except FileNotFoundError:
+        return []
+    return sorted(n for n in names if n.startswith(PACK_VOLUME_PREFIX) and n.endswith(".tar"))
+
+class PackWriter:
+    """
+    Streams files into large append-only .tar volumes under root instead of one file each,
+    which avoids per-file overhead on NAS/SMB targets. Every member is hashed while it is
+    written, re-read and compared (PACK_VERIFY_READBACK), and then recorded in an append-only
+    JSONL index (name, volume, data offset, size, sha256) used for random access.
+    A failed member is truncated away, so a volume never contains a partial file.
+    Volumes are plain tar files and can also be opened with standard tools.
+    """
+    def __init__(self, root: str, volume_bytes: int = PACK_VOLUME_BYTES, verify: bool = PACK_VERIFY_READBACK):
+        self.root = root
+        self.volume_bytes = volume_bytes
+        self.verify = verify
+        self.files_packed = 0
+        self.bytes_packed = 0
+        self._lock = threading.Lock()
+        self._handle = None
+        self._volume = None
+        os.makedirs(root, exist_ok=True)
+        self._index = open(os.path.join(root, PACK_INDEX_FILENAME), "a", encoding="utf-8")
+        existing = _list_volumes(root)
+        # Each run starts a new volume; earlier volumes are never rewritten
+        self._next_number = int(existing[-1][len(PACK_VOLUME_PREFIX):-4]) + 1 if existing else 1
+
+    def _open_volume(self):
+        self._close_volume()
+        self._volume = _volume_name(self._next_number)
+        self._next_number += 1
+        self._handle = open(os.path.join(self.root, self._volume), "w+b")
+        logger.info(f"Opened pack volume {self._volume}")
+
+    def _close_volume(self):
+        if not self._handle: return
+        # End-of-archive marker: two zero blocks
+        self._handle.seek(0, os.SEEK_END)
+        self._handle.write(b"\0" * BLOCK_SIZE * 2)
+        self._handle.flush()
+        os.fsync(self._handle.fileno())
+        self._handle.close()
+        self._handle = None
+
+    def add_file(self, path: str, arcname: str, size: Optional[int] = None, mtime: Optional[float] = None, on_chunk: Optional[Callable[[int], None]] = None) -> dict:
+        """
+        Appends the file at path as arcname and returns its index entry.
+        on_chunk is called with the length of each chunk read (progress/throttling).
+        Raises on read, write or verification errors; nothing is recorded in that case.
+        """
+        if size is None or mtime is None:
+            st = os.stat(path)
+            size = st.st_size if size is None else size
+            mtime = st.st_mtime if mtime is None else mtime
+        arcname = arcname.replace(os.sep, "/")
+
+        info = tarfile.TarInfo(arcname)
+        info.size = size
+        info.mtime = int(mtime)
+        header = info.tobuf(tarfile.PAX_FORMAT, "utf-8", "surrogateescape")
+
+        with self._lock:
+            if self._handle is None or (self._handle.tell() > 0 and self._handle.tell() + size > self.volume_bytes):
+                self._open_volume()
+            start = self._handle.tell()
+            try:
+                self._handle.write(header)
+                data_offset = self._handle.tell()
+                digest = hashlib.sha256()
+                written = 0
+                with open(path, "rb") as src:
+                    while True:
+                        buf = src.read(CHUNK_SIZE)
+                        if not buf: break
+                        self._handle.write(buf)
+                        digest.update(buf)
+                        written += len(buf)
+                        if on_chunk: on_chunk(len(buf))
+                if written != size:
+                    raise Exception(f"Size changed while packing ({written} != {size})")
+                padding = (-size) % BLOCK_SIZE
+                if padding:
+                    self._handle.write(b"\0" * padding)
+                self._handle.flush()
+                sha256 = digest.hexdigest()
+                if self.verify:
+                    self._verify_member(data_offset, size, sha256)
+            except Exception:
+                # Drop the partial member so the volume stays a valid tar
+                self._handle.seek(start)
+                self._handle.truncate()
+                raise
+
+            entry = {"name": arcname, "volume": self._volume, "offset": data_offset, "size": size, "mtime": mtime, "sha256": sha256}
+            self._index.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self._index.flush()
+            self.files_packed += 1
+            self.bytes_packed += size
+        return entry
+
+    def _verify_member(self, offset: int, size: int, sha256: str):
+        os.fsync(self._handle.fileno())
+        end = self._handle.tell()
+        self._handle.seek(offset)
+        digest = hashlib.sha256()
+        remaining = size
+        while remaining > 0:
+            buf = self._handle.read(min(CHUNK_SIZE, remaining))
+            if not buf: break
+            digest.update(buf)
+            remaining -= len(buf)
+        self._handle.seek(end)
+        if remaining or digest.hexdigest() != sha256:
+            raise Exception("Packed data failed read-back verification")
+
+    def close(self):
+        with self._lock:
+            self._close_volume()
+            if self._index:
+                self._index.flush()
+                os.fsync(self._index.fileno())
+                self._index.close()
+                self._index = None
+
+def _member_path(dest_dir: str, name: str) -> str:
+    """Where a member extracts to under dest_dir; raises ValueError for names that would leave it (absolute, drive, "..")."""
+    parts = name.replace("\\", "/").split("/")
+    if name.startswith(("/", "\\")) or os.path.splitdrive(name)[0] or ".." in parts:
+        raise ValueError(f"Unsafe member name in pack: {name}")
+    root = os.path.abspath(dest_dir)
+    target = os.path.abspath(os.path.join(root, *[part for part in parts if part not in ("", ".")]))
+    if target == root or os.path.commonpath([root, target]) != root:
+        raise ValueError(f"Unsafe member name in pack: {name}")
+    return target
+
+class PackReader:
+    """
+    Lists and reads single files from a packed backup without unpacking it, using the
+    index written by PackWriter (rebuilt from the tar headers if the index is missing).
+    Reads are checked against the recorded sha256.
+    """
+    def __init__(self, root: str):
+        self.root = root
+        self.entries: Dict[str, dict] = {}
+        self._load()
+
+    def _load(self):
+        index_path = os.path.join(self.root, PACK_INDEX_FILENAME)
+        if not os.path.exists(index_path):
+            self.rebuild_index()
+            return
+        volumes = set(_list_volumes(self.root)) # Entries may only point at volumes in root
+        with open(index_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue # Torn last line after a crash
+                if entry.get("volume") not in volumes:
+                    logger.warning(f"Ignoring index entry with unknown volume: {entry.get('name')}")
+                    continue
+                self.entries[entry["name"]] = entry # Later entries win
+
+    def rebuild_index(self):
+        """Recovers the entry list from the tar headers (no hashes available)."""
+        self.entries = {}
+        for volume in _list_volumes(self.root):
+            try:
+                with tarfile.open(os.path.join(self.root, volume), "r:") as tar:
+                    for member in tar:
+                        if not member.isfile(): continue
+                        self.entries[member.name] = {"name": member.name, "volume": volume, "offset": member.offset_data, "size": member.size, "mtime": member.mtime, "sha256": None}
+            except (tarfile.TarError, OSError) as e:
+                logger.error(f"Stopped reading {volume}: {e}")
+
+    def list(self, prefix: str = "") -> List[dict]:
+        """Index entries whose name starts with prefix (e.g. "2024/07/")."""
+        return [entry for name, entry in self.entries.items() if name.startswith(prefix)]
+
+    def iter_chunks(self, name: str) -> Iterator[bytes]:
+        """Streams one member; raises after the last chunk if the hash does not match."""
+        entry = self.entries[name]
+        digest = hashlib.sha256()
+        remaining = entry["size"]
+        with open(os.path.join(self.root, entry["volume"]), "rb") as f:
+            f.seek(entry["offset"])
+            while remaining > 0:
+                buf = f.read(min(CHUNK_SIZE, remaining))
+                if not buf:
+                    raise Exception(f"Truncated pack data for {name}")
+                digest.update(buf)
+                remaining -= len(buf)
+                yield buf
+        if entry.get("sha256") and digest.hexdigest() != entry["sha256"]:
+            raise Exception(f"Checksum mismatch for {name}")
+
+    def read(self, name: str) -> bytes:
+        return b"".join(self.iter_chunks(name))
+
+    def extract(self, name: str, dest_dir: str) -> str:
+        """
+        Extracts one member under dest_dir (keeping its relative path) and returns the path.
+        Raises ValueError for a name that would land outside dest_dir (crafted or corrupted pack).
+        """
+        target = _member_path(dest_dir, name)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        tmp_path = target + ".part"
+        try:
+            with open(tmp_path, "wb") as f:
+                for buf in self.iter_chunks(name):
+                    f.write(buf)
+            os.replace(tmp_path, target)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        mtime = self.entries[name].get("mtime")
+        if mtime:
+            os.utime(target, (time.time(), mtime))
+        return target
+
+    def verify(self, is_running_check: Optional[Callable[[], bool]] = None) -> List[Tuple[str, str]]:
+        """Re-reads every member; returns (name, error) for the ones that fail."""
+        failures = []
+        for name in list(self.entries):
+            if is_running_check and not is_running_check(): break
+            try:
+                for _ in self.iter_chunks(name):
+                    pass
+            except Exception as e:
+                failures.append((name, str(e)))
+        return failures
@@ -0,0 +1,66 @@
+import threading
+from collections import deque
+from typing import Any, Callable, Deque, Iterable, List, Optional, Tuple
+from ..utils.constants import (
+    SCHEDULE_SMALL_FIRST,
+    SCHEDULE_LARGEST_FIRST,
+    SCHEDULE_NEWEST_FIRST,
+    LARGE_FILE_THRESHOLD
+)
+
+def order_plan(items: Iterable[Any], policy: str, size_of: Callable[[Any], int], mtime_of: Optional[Callable[[Any], float]] = None) -> List[Any]:
+    """
+    Orders a pre-scanned plan by policy:
+    source (as enumerated), small_first, largest_first (shortens the tail), newest_first (recent photos are safe sooner).
+    """
+    items = list(items)
+    if policy == SCHEDULE_SMALL_FIRST:
+        items.sort(key=size_of)
+    elif policy == SCHEDULE_LARGEST_FIRST:
+        items.sort(key=size_of, reverse=True)
+    elif policy == SCHEDULE_NEWEST_FIRST and mtime_of:
+        items.sort(key=mtime_of, reverse=True)
+    return items
+
+class WorkScheduler:
+    """
+    Hands out plan items to parallel workers in the configured policy order.
+    At most max_large_in_flight large files run at once: when the next item in policy order
+    is large and that many are already in flight, the worker gets the next small file instead,
+    so the remaining workers keep draining small files instead of all stalling on big videos.
+    """
+    def __init__(self, items: Iterable[Any], policy: str, size_of: Callable[[Any], int], mtime_of: Optional[Callable[[Any], float]] = None, workers: int = 1, large_threshold: int = LARGE_FILE_THRESHOLD):
+        ordered = order_plan(items, policy, size_of, mtime_of)
+        self.size_of = size_of
+        self.large_threshold = large_threshold
+        self.max_large_in_flight = max(1, workers // 2)
+        # Each lane holds (position in policy order, item)
+        self.large: Deque[Tuple[int, Any]] = deque()
+        self.small: Deque[Tuple[int, Any]] = deque()
+        for rank, item in enumerate(ordered):
+            (self.large if size_of(item) >= large_threshold else self.small).append((rank, item))
+        self.large_in_flight = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self.large) + len(self.small)
+
+    def next_item(self) -> Optional[Any]:
+        """Returns the next item for a worker, or None when the plan is exhausted."""
+        with self._lock:
+            large_next = self.large and (not self.small or self.large[0][0] < self.small[0][0])
+            if large_next and self.large_in_flight >= self.max_large_in_flight and self.small:
+                large_next = False # Large lane is full: serve the small lane meanwhile
+            if large_next:
+                self.large_in_flight += 1
+                return self.large.popleft()[1]
+            if self.small:
+                return self.small.popleft()[1]
+            return None
+
+    def done(self, item: Any):
+        """Must be called when a worker finishes an item returned by next_item."""
+        if self.size_of(item) >= self.large_threshold:
+            with self._lock:
+                self.large_in_flight -= 1
@@ -0,0 +1,141 @@
+import os
+import re
+import json
+from datetime import datetime, timedelta
+from typing import Optional, Set
+from ..utils.constants import ALLOWED_EXTENSIONS, PHOTO_EXTENSIONS, VIDEO_EXTENSIONS, MEDIA_PHOTO, MEDIA_VIDEO, SELECTION_SINCE_LAST_RUN
+from ..utils.logger import setup_logger
+
+logger = setup_logger("Selection")
+
+LAST_RUN_FILENAME = ".last_backup.json"
+
+# iOS exposes the camera roll over MTP as monthly folders such as "202403__"
+_MONTH_FOLDER = re.compile(r"^(\d{4})(\d{2})__")
+
+# Slack for timezone differences between device folder names and timestamps
+_PERIOD_SLACK = 86400
+
+class SelectionQuery:
+    """
+    Which files a backup should include: capture/modification date range, media type,
+    size range and "newer than the last backup". The query is evaluated during enumeration
+    (filesystem scan and MTP walk), so excluded files are never planned or copied, and
+    folders whose name places them outside the date range are skipped without being opened.
+    """
+    def __init__(self, start: Optional[datetime] = None, end: Optional[datetime] = None, media_types: Optional[Set[str]] = None,
+                 min_size: Optional[int] = None, max_size: Optional[int] = None, newer_than_last_run: bool = False):
+        self.start = start
+        self.end = end
+        self.media_types = media_types
+        self.min_size = min_size
+        self.max_size = max_size
+        self.newer_than_last_run = newer_than_last_run
+        self.newer_than: Optional[float] = None # Resolved from the last run record
+        self.excluded = 0
+        self.pruned_folders = 0
+
+    @classmethod
+    def from_options(cls, period, media_types) -> Optional["SelectionQuery"]:
+        """Builds a query from SELECTION_PERIOD_OPTIONS / SELECTION_MEDIA_OPTIONS values (None = no filter)."""
+        if period is None and not media_types: return None
+        if period == SELECTION_SINCE_LAST_RUN:
+            return cls(media_types=media_types, newer_than_last_run=True)
+        start = datetime.now() - timedelta(days=period) if period else None
+        return cls(start=start, media_types=media_types)
+
+    @property
+    def is_empty(self) -> bool:
+        return not (self.start or self.end or self.media_types or self.min_size or self.max_size or self.newer_than)
+
+    @property
+    def has_time_bounds(self) -> bool:
+        return bool(self.start or self.end or self.newer_than)
+
+    def _lower_bound(self) -> Optional[float]:
+        bounds = [b for b in (self.start.timestamp() if self.start else None, self.newer_than) if b is not None]
+        return max(bounds) if bounds else None
+
+    def _upper_bound(self) -> Optional[float]:
+        return self.end.timestamp() if self.end else None
+
+    def extensions(self, base: Set[str] = ALLOWED_EXTENSIONS) -> Set[str]:
+        """The subset of base matching the selected media types."""
+        if not self.media_types: return base
+        wanted = set()
+        if MEDIA_PHOTO in self.media_types: wanted |= PHOTO_EXTENSIONS
+        if MEDIA_VIDEO in self.media_types: wanted |= VIDEO_EXTENSIONS
+        return base & wanted
+
+    def allows_ext(self, ext: str) -> bool:
+        # An unknown extension (MTP items without one) is decided by the caller's type check
+        return not ext or not self.media_types or ext.lower() in self.extensions()
+
+    def allows_size(self, size: int) -> bool:
+        if self.min_size and size < self.min_size: return False
+        if self.max_size and size > self.max_size: return False
+        return True
+
+    def allows_time(self, timestamp: Optional[float]) -> bool:
+        if timestamp is None: return True
+        lower, upper = self._lower_bound(), self._upper_bound()
+        if lower is not None and timestamp < lower: return False
+        if upper is not None and timestamp > upper: return False
+        return True
+
+    def matches(self, ext: str, size: int, timestamp: Optional[float]) -> bool:
+        ok = self.allows_ext(ext) and self.allows_size(size) and self.allows_time(timestamp)
+        if not ok: self.excluded += 1
+        return ok
+
+    def may_contain_folder(self, name: str) -> bool:
+        """False if the folder name alone shows it is outside the date range (e.g. iOS "202301__")."""
+        if not self.has_time_bounds: return True
+        match = _MONTH_FOLDER.match(name)
+        if not match: return True
+        year, month = int(match.group(1)), int(match.group(2))
+        if not 1 <= month <= 12: return True
+        period_start = datetime(year, month, 1).timestamp()
+        period_end = datetime(year + (month == 12), month % 12 + 1, 1).timestamp()
+        lower, upper = self._lower_bound(), self._upper_bound()
+        if lower is not None and period_end + _PERIOD_SLACK < lower or upper is not None and period_start - _PERIOD_SLACK > upper:
+            self.pruned_folders += 1
+            return False
+        return True
+
+    def describe(self) -> str:
+        parts = []
+        if self.start: parts.append(f"from {self.start:%Y-%m-%d}")
+        if self.end: parts.append(f"until {self.end:%Y-%m-%d}")
+        if self.newer_than: parts.append(f"newer than {datetime.fromtimestamp(self.newer_than):%Y-%m-%d %H:%M}")
+        if self.media_types: parts.append("/".join(sorted(self.media_types)))
+        if self.min_size: parts.append(f">= {self.min_size} bytes")
+        if self.max_size: parts.append(f"<= {self.max_size} bytes")
+        return ", ".join(parts) or "all files"
+
+    def resolve_last_run(self, root: str):
+        """Loads the last successful run time from root when newer_than_last_run is set."""
+        if not self.newer_than_last_run: return
+        self.newer_than = self.load_last_run(root)
+        if self.newer_than is None:
+            logger.info("No previous backup recorded; selecting all files")
+
+    @staticmethod
+    def load_last_run(root: str) -> Optional[float]:
+        try:
+            with open(os.path.join(root, LAST_RUN_FILENAME), "r", encoding="utf-8") as f:
+                return float(json.load(f)["last_run"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    @staticmethod
+    def record_run(root: str, started_at: float):
+        """Stores the start time of a successful run (files changed during it are picked up next time)."""
+        path = os.path.join(root, LAST_RUN_FILENAME)
+        tmp_path = path + ".part"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"last_run": started_at}, f)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.error(f"Failed to record last run: {e}")
@@ -0,0 +1,189 @@
+import os
+import queue
+import itertools
+import threading
+from collections import deque
+from typing import Callable, Dict, List, Optional, Tuple
+from ..utils.constants import CONVERSION_PIXEL_BUDGET, SESSION_MAX_PARALLEL, SESSION_HISTORY_SIZE, BACKGROUND_CPU_SHARE
+from ..utils.logger import setup_logger
+from .backup_manager import BackupManager
+from .backup_service import BackupJob
+from .heic_converter import PixelBudget
+from .throttle import TokenBucket, CpuShareLimiter, IoPriority
+
+logger = setup_logger("SessionManager")
+
+def _overlaps(a: str, b: str) -> bool:
+    """True if one path is the other or contains it."""
+    try:
+        return os.path.commonpath([a, b]) in (a, b)
+    except ValueError:
+        return False # Different drives
+
+class BackupSession:
+    """
+    One device's backup: its own BackupManager (and so its own service thread, COM apartment
+    and handlers), a progress channel and its own failure report in its destination.
+    Messages from the session are put on `events` as (msg_type, data) and also forwarded to
+    the session manager's callback as (session_id, msg_type, data).
+    """
+    def __init__(self, session_id: int, name: str, dest: str, manager: BackupManager):
+        self.id = session_id
+        self.name = name
+        self.dest = os.path.abspath(dest)
+        self.manager = manager
+        self.events: "queue.Queue[Tuple[str, object]]" = queue.Queue()
+        self.job: Optional[BackupJob] = None
+        self.status = "Queued"
+        self.progress = 0.0
+        self.success: Optional[bool] = None
+
+    @property
+    def is_running(self) -> bool:
+        return self.success is None
+
+    @property
+    def failed_files(self) -> List[Tuple[str, str]]:
+        return self.manager.failed_files
+
+    def stop(self):
+        self.manager.stop_backup()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self.job.wait(timeout) if self.job else True
+
+class SessionManager:
+    """
+    Runs backups of several connected devices in parallel, one BackupSession per device.
+    All sessions draw from one global budget: a shared byte rate limiter and I/O priority for
+    copies, and a shared CPU share and decode pixel budget for conversion, so the sessions
+    split the destination disk and the CPU instead of multiplying the load.
+    At most max_parallel sessions copy at once; further sessions wait for a free slot.
+    A session is closed when its job ends: its service thread exits, it leaves `sessions`
+    and only its summary is kept (the last SESSION_HISTORY_SIZE in `finished`).
+    """
+    def __init__(self, status_callback: Optional[Callable] = None, max_parallel: int = SESSION_MAX_PARALLEL):
+        self.status_callback = status_callback
+        self.rate_limiter = TokenBucket()
+        self.io_priority = IoPriority()
+        self.cpu_limiter = CpuShareLimiter()
+        self.pixel_budget = PixelBudget(CONVERSION_PIXEL_BUDGET)
+        self.sessions: Dict[int, BackupSession] = {} # Queued and running sessions
+        self.finished: "deque[dict]" = deque(maxlen=SESSION_HISTORY_SIZE)
+        self._slots = threading.BoundedSemaphore(max(1, max_parallel))
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def _make_callback(self, session_id: int, session_callback: Optional[Callable] = None) -> Callable:
+        def callback(msg_type, data):
+            session = self.sessions.get(session_id)
+            if session:
+                if msg_type == "status": session.status = data
+                elif msg_type == "progress": session.progress = data
+                elif msg_type == "finish": session.success = bool(data)
+                session.events.put((msg_type, data))
+            if session_callback:
+                session_callback(msg_type, data)
+            if self.status_callback:
+                self.status_callback(session_id, msg_type, data)
+        return callback
+
+    def _check_dest(self, dest: str, *roots: Optional[str]):
+        """Sessions must not share a destination: run state (fingerprints, last run, failure report) lives there."""
+        paths = [os.path.abspath(p) for p in (dest,) + roots if p]
+        for session in self.sessions.values():
+            if not session.is_running: continue
+            for path in paths:
+                if _overlaps(path, session.dest):
+                    raise ValueError(f"Destination {path} overlaps session '{session.name}' ({session.dest})")
+
+    def start_session(self, name: str, source: str, dest: str, breadcrumbs: Optional[List[str]] = None, status_callback: Optional[Callable] = None, **options) -> BackupSession:
+        """
+        Starts a backup of one device into dest and returns its session.
+        status_callback(msg_type, data) receives this session's messages only, from its first message on.
+        options are the BackupManager.start_backup keyword arguments (selected_subfolders, organize_by_date, ...).
+        """
+        with self._lock:
+            self._check_dest(dest, options.get("incremental_root"), options.get("history_root"))
+            os.makedirs(dest, exist_ok=True)
+            session_id = next(self._ids)
+            manager = BackupManager(self._make_callback(session_id, status_callback), rate_limiter=self.rate_limiter, io_priority=self.io_priority)
+            manager.converter.cpu_limiter = self.cpu_limiter
+            manager.converter.budget = self.pixel_budget
+            session = BackupSession(session_id, name, dest, manager)
+            self.sessions[session_id] = session
+
+        def run_in_slot(*args, **kwargs):
+            # Runs on the session's own service thread, so waiting here only holds up this session
+            session.status = "Waiting for a free slot"
+            while not self._slots.acquire(timeout=0.5):
+                if not manager.is_running: # Stopped while waiting
+                    manager.status_callback("finish", False)
+                    return
+            try:
+                manager.run_backup(*args, **kwargs)
+            finally:
+                self._slots.release()
+
+        manager.is_running = True
+        session.job = manager.service.submit(run_in_slot, source, dest, breadcrumbs, options.pop("selected_subfolders", None),
+                                             options.pop("skip_live_photos", False), name=f"session {name}", **options)
+        session.job.add_done_callback(lambda _: self.close_session(session))
+        logger.info(f"Started session #{session_id} ({name}) into {dest}")
+        return session
+
+    def close_session(self, session: BackupSession):
+        """
+        Releases a finished session: lets its service thread exit, drops the dest snapshot and
+        moves the session from `sessions` to the `finished` summaries. Safe to call more than once.
+        """
+        with self._lock:
+            if self.sessions.pop(session.id, None) is None: return
+            self.finished.append(self._summarize(session))
+        session.manager.service.shutdown(wait=False) # May run on that thread: it exits after the current job
+        session.manager.dest_snapshot = None
+        logger.info(f"Closed session #{session.id} ({session.name})")
+
+    def set_bandwidth_limit(self, bytes_per_second: Optional[float]):
+        """Global copy budget shared by all sessions (None = unlimited)."""
+        self.rate_limiter.set_rate(bytes_per_second)
+
+    def set_cpu_share(self, share: float):
+        """Global CPU share for conversion across all sessions."""
+        self.cpu_limiter.set_share(share)
+
+    def set_background_mode(self, enabled: bool):
+        """Low OS priority for all sessions' copy/conversion threads plus the reduced global CPU share."""
+        self.io_priority.set_low(enabled)
+        self.set_cpu_share(BACKGROUND_CPU_SHARE if enabled else 1.0)
+
+    def stop_all(self):
+        for session in list(self.sessions.values()):
+            session.stop()
+
+    def wait_all(self, timeout: Optional[float] = None) -> bool:
+        """Waits for every session; returns False if the timeout expired first."""
+        return all(session.wait(timeout) for session in list(self.sessions.values()))
+
+    def shutdown(self):
+        """Stops all sessions and their service threads."""
+        self.stop_all()
+        for session in list(self.sessions.values()):
+            session.manager.service.shutdown()
+
+    def summary(self) -> List[dict]:
+        """Per-session state for display (finished sessions first): name, status, progress, result and failure count."""
+        with self._lock:
+            return list(self.finished) + [self._summarize(s) for s in self.sessions.values()]
+
+    @staticmethod
+    def _summarize(s: BackupSession) -> dict:
+        return {
+            "id": s.id,
+            "name": s.name,
+            "dest": s.dest,
+            "status": s.status,
+            "progress": s.progress,
+            "success": s.success,
+            "failed": len(s.failed_files),
+        }
@@ -0,0 +1,122 @@
+import os
+import sys
+import time
+import threading
+from typing import Callable, Optional
+from ..utils.logger import setup_logger
+
+logger = setup_logger("Throttle")
+
+# Windows thread background processing mode (lowers CPU, I/O and memory priority)
+THREAD_MODE_BACKGROUND_BEGIN = 0x00010000
+THREAD_MODE_BACKGROUND_END = 0x00020000
+
+class TokenBucket:
+    """
+    Thread-safe byte rate limiter. The rate can be changed at any time, including while
+    a consumer is blocked; None (or 0) means unlimited.
+    """
+    def __init__(self, rate: Optional[float] = None, burst_seconds: float = 0.5):
+        self.burst_seconds = burst_seconds
+        self._cond = threading.Condition()
+        self._rate = None
+        self._tokens = 0.0
+        self._last = time.monotonic()
+        self.set_rate(rate)
+
+    @property
+    def rate(self) -> Optional[float]:
+        return self._rate
+
+    def set_rate(self, rate: Optional[float]):
+        """Sets the limit in bytes per second (None/0 = unlimited). Takes effect immediately."""
+        with self._cond:
+            self._rate = rate if rate and rate > 0 else None
+            self._tokens = 0.0
+            self._last = time.monotonic()
+            self._cond.notify_all()
+        logger.info(f"Bandwidth limit set to {'unlimited' if not self._rate else f'{self._rate / (1024 * 1024):.1f} MB/s'}")
+
+    def consume(self, amount: int, is_running_check: Optional[Callable[[], bool]] = None):
+        """Blocks until amount bytes may pass. Returns early if the run is stopped."""
+        with self._cond:
+            while True:
+                if self._rate is None: return
+                if is_running_check and not is_running_check(): return
+                now = time.monotonic()
+                capacity = self._rate * self.burst_seconds
+                self._tokens = min(capacity, self._tokens + (now - self._last) * self._rate)
+                self._last = now
+                # Chunks larger than the bucket go through once it is full, leaving a debt
+                if self._tokens >= min(amount, capacity):
+                    self._tokens -= amount
+                    return
+                wait = (min(amount, capacity) - self._tokens) / self._rate
+                self._cond.wait(min(wait, 0.25))
+
+class CpuShareLimiter:
+    """
+    Duty-cycle limiter for CPU-bound workers: after a unit of work that took t seconds,
+    the worker rests t * (1 - share) / share seconds. share=1.0 disables limiting.
+    """
+    def __init__(self, share: float = 1.0):
+        self.share = 1.0
+        self.set_share(share)
+
+    def set_share(self, share: float):
+        self.share = min(1.0, max(0.05, share))
+
+    def account(self, busy_seconds: float, is_running_check: Optional[Callable[[], bool]] = None):
+        """Sleeps to keep the worker within its CPU share, in short steps so stop stays responsive."""
+        share = self.share
+        if share >= 1.0 or busy_seconds <= 0: return
+        deadline = time.monotonic() + busy_seconds * (1.0 - share) / share
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0: return
+            if is_running_check and not is_running_check(): return
+            time.sleep(min(remaining, 0.1))
+
+class IoPriority:
+    """
+    Desired background (low) priority for worker threads. Threads call sync() at file
+    boundaries so changes made at runtime are picked up without restarting the backup.
+    On Linux a thread's niceness before lowering is recorded and restored afterwards.
+    """
+    def __init__(self, low: bool = False):
+        self.low = low
+        self._applied = threading.local()
+
+    def set_low(self, low: bool):
+        self.low = low
+
+    def sync(self):
+        """Applies the current desired priority to the calling thread if it changed."""
+        state = self._applied
+        if getattr(state, "low", False) == self.low or getattr(state, "failed", None) == self.low: return
+        if self._apply(self.low):
+            state.low = self.low
+            state.failed = None
+        else:
+            state.failed = self.low # Not retried at every file boundary
+
+    def _apply(self, low: bool) -> bool:
+        try:
+            if sys.platform == "win32":
+                import ctypes
+                kernel32 = ctypes.windll.kernel32
+                mode = THREAD_MODE_BACKGROUND_BEGIN if low else THREAD_MODE_BACKGROUND_END
+                return bool(kernel32.SetThreadPriority(kernel32.GetCurrentThread(), mode))
+            if hasattr(os, "setpriority") and hasattr(threading, "get_native_id"):
+                # On Linux a thread id is accepted by PRIO_PROCESS and affects only that thread
+                tid = threading.get_native_id()
+                if low:
+                    self._applied.previous = os.getpriority(os.PRIO_PROCESS, tid)
+                    os.setpriority(os.PRIO_PROCESS, tid, max(self._applied.previous, 10))
+                else:
+                    os.setpriority(os.PRIO_PROCESS, tid, getattr(self._applied, "previous", 0))
+                return True
+        except Exception as e:
+            # Raising priority again needs CAP_SYS_NICE on Linux; the thread stays in background mode
+            logger.warning(f"Could not change thread priority: {e}")
+        return False
@@ -0,0 +1,206 @@
+import io
+import os
+import time
+import queue
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import List, Optional
+from PIL import Image
+import pillow_heif
+from ..utils.constants import (
+    THUMBNAIL_CACHE_DIR,
+    THUMBNAIL_CACHE_MAX_BYTES,
+    THUMBNAIL_SIZE,
+    THUMBNAIL_FORMAT,
+    THUMBNAIL_WORKERS,
+    THUMBNAIL_QUEUE_SIZE,
+    THUMBNAIL_MAX_SOURCE_BYTES,
+    THUMBNAIL_EXTENSIONS
+)
+from ..utils.logger import setup_logger
+
+logger = setup_logger("ThumbnailCache")
+
+pillow_heif.register_heif_opener()
+
+class ThumbnailCache:
+    """
+    Content-addressed thumbnail store (key = SHA-256 of the source file) with size-based LRU eviction.
+    Recency is persisted through file mtimes so the LRU order survives restarts.
+    """
+    def __init__(self, cache_dir: str = THUMBNAIL_CACHE_DIR, max_bytes: int = THUMBNAIL_CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.ext = "." + THUMBNAIL_FORMAT.lower()
+        self.total_bytes = 0
+        self._lru: "OrderedDict[str, int]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        found = []
+        for shard in os.scandir(self.cache_dir):
+            if not shard.is_dir(): continue
+            for entry in os.scandir(shard.path):
+                if entry.name.endswith(self.ext):
+                    st = entry.stat()
+                    found.append((st.st_mtime, entry.name[:-len(self.ext)], st.st_size))
+        for _, key, size in sorted(found):
+            self._lru[key] = size
+            self.total_bytes += size
+
+    def path_for(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], key + self.ext)
+
+    def get(self, key: str) -> Optional[str]:
+        """Returns the thumbnail path for key and marks it as recently used, or None."""
+        with self._lock:
+            if key not in self._lru: return None
+            self._lru.move_to_end(key)
+        path = self.path_for(key)
+        try:
+            os.utime(path, None)
+        except OSError:
+            with self._lock:
+                self.total_bytes -= self._lru.pop(key, 0)
+            return None
+        return path
+
+    def put(self, key: str, data: bytes) -> str:
+        """Stores encoded thumbnail bytes under key and evicts old entries beyond the size limit."""
+        path = self.path_for(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + ".part"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        with self._lock:
+            self.total_bytes -= self._lru.pop(key, 0)
+            self._lru[key] = len(data)
+            self.total_bytes += len(data)
+            evicted = []
+            while self.total_bytes > self.max_bytes and len(self._lru) > 1:
+                old_key, old_size = self._lru.popitem(last=False)
+                self.total_bytes -= old_size
+                evicted.append(old_key)
+        for old_key in evicted:
+            try:
+                os.remove(self.path_for(old_key))
+            except OSError: pass
+        return path
+
+class ThumbnailGenerator:
+    """
+    Background pipeline stage that thumbnails files right after they land, while their bytes
+    are still in the page cache. Producers get backpressure from a bounded queue; the time they
+    spend blocked is reported as the cost to copy throughput.
+    """
+    def __init__(self, cache: Optional[ThumbnailCache] = None, workers: int = THUMBNAIL_WORKERS):
+        self.cache = cache
+        self.workers = max(1, workers)
+        self.is_running = False
+        self.generated = 0
+        self.cache_hits = 0
+        self.worker_seconds = 0.0
+        self.stall_seconds = 0.0
+        self._queue: "queue.Queue[Optional[str]]" = queue.Queue(maxsize=THUMBNAIL_QUEUE_SIZE)
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+
+    def start(self):
+        if self.cache is None:
+            self.cache = ThumbnailCache()
+        self.is_running = True
+        self.generated = 0
+        self.cache_hits = 0
+        self.worker_seconds = 0.0
+        self.stall_seconds = 0.0
+        self._threads = []
+        for _ in range(self.workers):
+            thread = threading.Thread(target=self._worker_loop, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, path: str):
+        """Queues a landed file. Non-image files are ignored."""
+        if not self.is_running: return
+        if os.path.splitext(path)[1].lower() not in THUMBNAIL_EXTENSIONS: return
+        start = time.perf_counter()
+        while self.is_running:
+            try:
+                self._queue.put(path, timeout=0.5)
+                break
+            except queue.Full:
+                continue
+        stalled = time.perf_counter() - start
+        with self._lock: # Parallel copy workers submit concurrently
+            self.stall_seconds += stalled
+
+    def finish(self) -> dict:
+        """Drains the queue, stops the workers and returns the cost report (safe to call more than once)."""
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        self.is_running = False
+        report = {
+            "generated": self.generated,
+            "cache_hits": self.cache_hits,
+            "worker_seconds": self.worker_seconds,
+            "copy_stall_seconds": self.stall_seconds,
+        }
+        logger.info(f"Thumbnails: {self.generated} generated, {self.cache_hits} cached, "
+                    f"{self.worker_seconds:.1f}s worker time, copy stalled {self.stall_seconds:.2f}s")
+        return report
+
+    def stop(self):
+        self.is_running = False
+        try:
+            while True:
+                self._queue.get_nowait()
+        except queue.Empty:
+            pass
+
+    def _worker_loop(self):
+        while True:
+            path = self._queue.get()
+            if path is None: return
+            if not self.is_running: continue
+            start = time.perf_counter()
+            try:
+                # Only counts are kept: thumbnails are found again by content hash in the cache
+                self.generate(path)
+            except Exception as e:
+                logger.debug(f"Thumbnail failed for {path}: {e}")
+            finally:
+                with self._lock:
+                    self.worker_seconds += time.perf_counter() - start
+
+    def generate(self, path: str) -> Optional[str]:
+        """Reads the file once (hash + decode from the same buffer) and stores its thumbnail."""
+        if os.path.getsize(path) > THUMBNAIL_MAX_SOURCE_BYTES: return None
+        with open(path, "rb") as f:
+            data = f.read()
+        key = hashlib.sha256(data).hexdigest()
+
+        cached = self.cache.get(key)
+        if cached:
+            with self._lock:
+                self.cache_hits += 1
+            return cached
+
+        with Image.open(io.BytesIO(data)) as im:
+            # JPEG can decode at reduced scale directly; other formats ignore the draft request
+            im.draft("RGB", (THUMBNAIL_SIZE, THUMBNAIL_SIZE))
+            im.thumbnail((THUMBNAIL_SIZE, THUMBNAIL_SIZE))
+            if im.mode not in ("RGB", "L"):
+                im = im.convert("RGB")
+            out = io.BytesIO()
+            im.save(out, THUMBNAIL_FORMAT, quality=80)
+        thumb_path = self.cache.put(key, out.getvalue())
+        with self._lock:
+            self.generated += 1
+        return thumb_path
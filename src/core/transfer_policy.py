@@ -0,0 +1,101 @@
+import time
+import threading
+from typing import Any, Callable, List, Optional
+from ..utils.constants import (
+    MAX_RETRIES,
+    RETRY_DELAY,
+    VERIFY_MIN_TIMEOUT,
+    VERIFY_MAX_TIMEOUT,
+    VERIFY_THROUGHPUT_SAFETY,
+    MTP_INITIAL_THROUGHPUT
+)
+from ..utils.logger import setup_logger
+
+logger = setup_logger("TransferPolicy")
+
+class ThroughputEstimator:
+    """
+    Rolling (exponentially weighted) estimate of device throughput in bytes per second,
+    used to size verification timeouts to the file being transferred.
+    """
+    def __init__(self, initial_bps: float = MTP_INITIAL_THROUGHPUT, alpha: float = 0.3):
+        self.alpha = alpha
+        self.bytes_per_second = float(initial_bps)
+        self.samples = 0
+        self._lock = threading.Lock()
+
+    def update(self, nbytes: int, seconds: float):
+        """Feeds a completed transfer into the estimate."""
+        if nbytes <= 0 or seconds <= 0: return
+        sample = nbytes / seconds
+        with self._lock:
+            if self.samples == 0:
+                self.bytes_per_second = sample
+            else:
+                self.bytes_per_second = self.alpha * sample + (1 - self.alpha) * self.bytes_per_second
+            self.samples += 1
+
+    def timeout_for(self, size: int) -> float:
+        """Fixed per-file allowance plus the expected transfer time at a pessimistic fraction of the estimate."""
+        bps = max(self.bytes_per_second * VERIFY_THROUGHPUT_SAFETY, 1.0)
+        return min(VERIFY_MAX_TIMEOUT, VERIFY_MIN_TIMEOUT + max(size, 0) / bps)
+
+class DeferredItem:
+    """A failed transfer waiting in the retry queue."""
+    __slots__ = ("payload", "name", "error", "attempts")
+
+    def __init__(self, payload: Any, name: str, error: str):
+        self.payload = payload
+        self.name = name
+        self.error = error
+        self.attempts = 0
+
+class RetryQueue:
+    """
+    Collects failed items during the main pass so they do not block the stream, then retries
+    them at the end of the run with exponential backoff (RETRY_DELAY, 2x, 4x, ...).
+    """
+    def __init__(self, max_retries: int = MAX_RETRIES, base_delay: float = RETRY_DELAY):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.items: List[DeferredItem] = []
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def defer(self, payload: Any, name: str, error: str):
+        self.items.append(DeferredItem(payload, name, error))
+
+    def drain(self, handler: Callable[[Any], None], on_final_failure: Callable[[str, str, Any], None], is_running_check: Optional[Callable[[], bool]] = None) -> int:
+        """
+        Retries deferred items with handler (which raises on failure).
+        Items still failing after max_retries are passed to on_final_failure(name, error, payload).
+        Returns the number recovered.
+        """
+        recovered = 0
+        for attempt in range(1, self.max_retries + 1):
+            if not self.items: break
+            delay = self.base_delay * (2 ** (attempt - 1))
+            logger.info(f"Retry round {attempt}/{self.max_retries}: {len(self.items)} items after {delay:.0f}s backoff")
+            deadline = time.time() + delay
+            while time.time() < deadline:
+                if is_running_check and not is_running_check(): break
+                time.sleep(min(0.2, max(0.0, deadline - time.time())))
+
+            pending, self.items = self.items, []
+            for item in pending:
+                if is_running_check and not is_running_check():
+                    self.items.append(item)
+                    continue
+                item.attempts += 1
+                try:
+                    handler(item.payload)
+                    recovered += 1
+                except Exception as e:
+                    item.error = str(e)
+                    self.items.append(item)
+
+        for item in self.items:
+            on_final_failure(item.name, item.error, item.payload)
+        self.items = []
+        return recovered
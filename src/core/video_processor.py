@@ -0,0 +1,317 @@
+import os
+import time
+import queue
+import shutil
+import threading
+import subprocess
+from typing import List, Tuple, Callable, Optional
+from ..utils.constants import (
+    FFMPEG_BINARY,
+    VIDEO_EXTENSIONS,
+    VIDEO_MODE_REMUX,
+    VIDEO_MODE_TRANSCODE,
+    VIDEO_WORKERS,
+    VIDEO_QUEUE_SIZE,
+    VIDEO_DURATION_TOLERANCE
+)
+from ..utils.logger import setup_logger
+from .dir_scanner import DirectorySnapshot
+from .backup_manifest import BackupManifest
+from .cancellation import CancellationToken, OperationCancelled
+
+logger = setup_logger("VideoProcessor")
+
+# Hide the console window ffmpeg would otherwise open from the windowed exe
+_CREATE_NO_WINDOW = getattr(subprocess, "CREATE_NO_WINDOW", 0)
+
+class VideoJob:
+    """A single remux/transcode job and its outcome."""
+    def __init__(self, src: str, dst: str, mode: str, replace_original: bool = False):
+        self.src = src
+        self.dst = dst
+        self.mode = mode
+        self.replace_original = replace_original
+        self.input_bytes = 0
+        self.output_bytes = 0
+        self.duration = 0.0
+        self.elapsed = 0.0
+        self.success = False
+        self.cancelled = False
+        self.error = ""
+
+class VideoProcessor:
+    """
+    Optional post-copy video stage that remuxes or transcodes videos with a local ffmpeg binary.
+    Jobs run on a small pool of workers fed by a bounded queue, so producers get backpressure.
+    Originals are kept unless replace_original is set; even then only a remux (all streams
+    copied losslessly) whose output was validated with ffprobe replaces its original.
+    """
+    def __init__(self, status_callback: Optional[Callable] = None, workers: int = VIDEO_WORKERS, ffmpeg_path: Optional[str] = None):
+        self.status_callback = status_callback
+        self.is_running = False
+        self.cancel_token = CancellationToken() # Terminates running ffmpeg processes on stop; replaced by start()
+        self.workers = max(1, workers)
+        self.ffmpeg_path = ffmpeg_path or shutil.which(FFMPEG_BINARY)
+        self.ffprobe_path = self._find_ffprobe()
+        self.jobs: List[VideoJob] = []
+        self.failed_files: List[Tuple[str, str]] = []
+        self.manifest: Optional[BackupManifest] = None # Kept in sync with outputs/removed originals when set
+        self.snapshot: Optional[DirectorySnapshot] = None # Same, for the destination snapshot
+        self._queue: "queue.Queue[Optional[VideoJob]]" = queue.Queue(maxsize=VIDEO_QUEUE_SIZE)
+        self._threads: List[threading.Thread] = []
+        self._processes = set()
+        self._lock = threading.Lock()
+        self._start_time = 0.0
+
+    def update_status(self, text: str):
+        """Status callback wrapper."""
+        if self.status_callback:
+            self.status_callback("status", text)
+        logger.info(text)
+
+    def is_available(self) -> bool:
+        """True if an ffmpeg binary was found."""
+        return bool(self.ffmpeg_path)
+
+    def _find_ffprobe(self) -> Optional[str]:
+        if not self.ffmpeg_path: return None
+        candidate = os.path.join(os.path.dirname(self.ffmpeg_path), "ffprobe" + (".exe" if os.name == "nt" else ""))
+        return candidate if os.path.exists(candidate) else shutil.which("ffprobe")
+
+    def start(self):
+        """Starts the worker pool. Jobs can then be submitted while the copy is still running."""
+        self.is_running = True
+        self.cancel_token = CancellationToken()
+        self.cancel_token.on_cancel(self._terminate_processes)
+        self.jobs = []
+        self.failed_files = []
+        self._start_time = time.time()
+        self._threads = []
+        for _ in range(self.workers):
+            thread = threading.Thread(target=self._worker_loop, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, src: str, mode: str = VIDEO_MODE_REMUX, replace_original: bool = False) -> bool:
+        """
+        Queues a video for processing. Blocks while the queue is full.
+        Returns False if the file is skipped (unsupported, stopped, or output already present).
+        """
+        if not self.is_running: return False
+        ext = os.path.splitext(src)[1].lower()
+        if ext not in VIDEO_EXTENSIONS: return False
+
+        dst = os.path.splitext(src)[0] + ".mp4"
+        if mode == VIDEO_MODE_REMUX and ext == ".mp4":
+            return False # Already in the target container
+        if os.path.normcase(dst) == os.path.normcase(src):
+            dst = os.path.splitext(src)[0] + "_h264.mp4"
+        if os.path.exists(dst):
+            logger.info(f"Output already exists, skipping: {dst}")
+            return False
+
+        job = VideoJob(src, dst, mode, replace_original)
+        while self.is_running:
+            try:
+                self._queue.put(job, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def finish(self) -> dict:
+        """Waits for all queued jobs to complete and returns the throughput report."""
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        report = self.get_report()
+        self.update_status(
+            f"Video processing complete: {report['succeeded']}/{report['jobs']} files, "
+            f"{report['input_mb_per_s']:.1f} MB/s, {report['realtime_factor']:.1f}x realtime"
+        )
+        return report
+
+    def stop(self):
+        """Cancels queued jobs and terminates running ffmpeg processes."""
+        self.is_running = False
+        sentinels = 0
+        try:
+            while True:
+                if self._queue.get_nowait() is None: sentinels += 1
+        except queue.Empty:
+            pass
+        for _ in range(sentinels):
+            self._queue.put(None) # finish() may already be waiting for the workers to exit
+        self.cancel_token.cancel()
+
+    def _terminate_processes(self):
+        with self._lock:
+            for proc in list(self._processes):
+                try:
+                    proc.terminate()
+                except Exception: pass
+
+    def process_folder(self, folder: str, mode: str = VIDEO_MODE_REMUX, replace_original: bool = False, snapshot: Optional[DirectorySnapshot] = None) -> Optional[dict]:
+        """
+        Convenience entry point: queues every video under folder and waits for completion.
+        Uses snapshot instead of walking the folder when one is given, and keeps it in sync with
+        the outputs written and originals replaced.
+        Returns the report, or None if no encoder is installed.
+        """
+        if not self.is_available():
+            self.update_status("ffmpeg not found - skipping video processing.")
+            return None
+
+        if snapshot is None:
+            snapshot = DirectorySnapshot.scan(folder, VIDEO_EXTENSIONS)
+        videos = snapshot.paths_with_ext(VIDEO_EXTENSIONS, under=folder)
+
+        self.snapshot = snapshot
+        self.start()
+        try:
+            for path in videos:
+                if not self.is_running: break
+                self.submit(path, mode, replace_original)
+            return self.finish()
+        finally:
+            self.snapshot = None
+
+    def get_report(self) -> dict:
+        """Aggregated throughput statistics for the finished jobs."""
+        with self._lock:
+            jobs = list(self.jobs)
+        wall = max(time.time() - self._start_time, 1e-6)
+        done = [j for j in jobs if j.success]
+        cancelled = sum(1 for j in jobs if j.cancelled)
+        input_bytes = sum(j.input_bytes for j in done)
+        output_bytes = sum(j.output_bytes for j in done)
+        media_seconds = sum(j.duration for j in done)
+        return {
+            "jobs": len(jobs),
+            "succeeded": len(done),
+            "failed": len(jobs) - len(done) - cancelled,
+            "cancelled": cancelled,
+            "input_bytes": input_bytes,
+            "output_bytes": output_bytes,
+            "wall_seconds": wall,
+            "input_mb_per_s": input_bytes / (1024 * 1024) / wall,
+            "realtime_factor": media_seconds / wall,
+        }
+
+    def _worker_loop(self):
+        while True:
+            job = self._queue.get()
+            if job is None: return
+            if not self.is_running: continue
+            self._run_job(job)
+            with self._lock:
+                self.jobs.append(job)
+            if not job.success and not job.cancelled:
+                self.failed_files.append((os.path.basename(job.src), job.error))
+
+    def _build_command(self, job: VideoJob, tmp_path: str) -> List[str]:
+        cmd = [self.ffmpeg_path, "-hide_banner", "-nostdin", "-y", "-i", job.src, "-map_metadata", "0"]
+        if job.mode == VIDEO_MODE_TRANSCODE:
+            cmd += ["-map", "0:v:0", "-map", "0:a?", "-c:v", "libx264", "-crf", "20", "-preset", "medium", "-pix_fmt", "yuv420p",
+                    "-c:a", "aac", "-b:a", "160k"]
+        else:
+            # Every stream (extra video/audio tracks, timecode, metadata, subtitles) is kept
+            cmd += ["-map", "0", "-c", "copy"]
+        cmd += ["-movflags", "+faststart", "-f", "mp4", "-progress", "pipe:1", "-nostats", tmp_path]
+        return cmd
+
+    def _probe_duration(self, path: str) -> float:
+        if not self.ffprobe_path: return 0.0
+        try:
+            out = subprocess.run(
+                [self.ffprobe_path, "-v", "error", "-show_entries", "format=duration", "-of", "csv=p=0", path],
+                capture_output=True, text=True, timeout=30, creationflags=_CREATE_NO_WINDOW
+            )
+            return float(out.stdout.strip() or 0)
+        except Exception:
+            return 0.0
+
+    def validate_output(self, path: str, expected_duration: float) -> bool:
+        """
+        True if the output's duration matches its source within VIDEO_DURATION_TOLERANCE
+        (catches truncated output). False if it does not, or if it cannot be checked
+        (no ffprobe, unknown source duration).
+        """
+        if not self.ffprobe_path or expected_duration <= 0: return False
+        return abs(self._probe_duration(path) - expected_duration) <= VIDEO_DURATION_TOLERANCE
+
+    def _run_job(self, job: VideoJob):
+        name = os.path.basename(job.src)
+        tmp_path = job.dst + ".part"
+        start = time.time()
+        try:
+            job.input_bytes = os.path.getsize(job.src)
+            job.duration = self._probe_duration(job.src)
+            self.update_status(f"Processing video ({job.mode}): {name}")
+
+            proc = subprocess.Popen(
+                self._build_command(job, tmp_path),
+                stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True,
+                creationflags=_CREATE_NO_WINDOW
+            )
+            with self._lock:
+                self._processes.add(proc)
+            if self.cancel_token.is_cancelled: proc.terminate() # Stopped while ffmpeg was starting
+            try:
+                for line in proc.stdout:
+                    key, _, value = line.strip().partition("=")
+                    if key == "out_time_us" and self.status_callback:
+                        try:
+                            done_us = int(value)
+                        except ValueError:
+                            continue
+                        total_us = int(job.duration * 1_000_000)
+                        # Reuse the per-file progress channel: (filename, current, total)
+                        self.status_callback("file_progress", (name, min(done_us, total_us) if total_us else 0, total_us))
+                proc.wait()
+            finally:
+                with self._lock:
+                    self._processes.discard(proc)
+
+            if not self.is_running:
+                raise OperationCancelled("Cancelled")
+            if proc.returncode != 0:
+                raise Exception(f"ffmpeg exited with code {proc.returncode}")
+            if not os.path.exists(tmp_path) or os.path.getsize(tmp_path) == 0:
+                raise Exception("ffmpeg produced no output")
+            validated = self.validate_output(tmp_path, job.duration)
+            if not validated and self.ffprobe_path and job.duration > 0:
+                raise Exception("Output failed validation (duration mismatch)")
+
+            os.replace(tmp_path, job.dst)
+            job.output_bytes = os.path.getsize(job.dst)
+            job.success = True
+            if self.snapshot: self.snapshot.add_file(job.dst)
+            if self.manifest: self.manifest.record(job.dst)
+
+            # A transcode is lossy, and an unvalidated output proves nothing: both keep the original
+            if job.replace_original and job.mode == VIDEO_MODE_REMUX and not validated:
+                logger.info(f"Output could not be validated, keeping original: {name}")
+            elif job.replace_original and job.mode == VIDEO_MODE_REMUX:
+                try:
+                    os.remove(job.src)
+                    logger.info(f"Deleted original video: {job.src}")
+                    if self.snapshot: self.snapshot.remove_file(job.src)
+                    if self.manifest: self.manifest.remove(job.src)
+                except Exception as del_err:
+                    logger.error(f"Failed to delete original {job.src}: {del_err}")
+        except Exception as e:
+            job.error = str(e)
+            if isinstance(e, OperationCancelled):
+                job.cancelled = True
+                logger.info(f"Video job cancelled: {name}")
+            else:
+                logger.error(f"Video job failed for {name}: {e}")
+            if os.path.exists(tmp_path):
+                try:
+                    os.remove(tmp_path)
+                except Exception: pass
+        finally:
+            job.elapsed = time.time() - start
@@ -2,6 +2,7 @@ import customtkinter
 import tkinter as tk
 from tkinter import filedialog, messagebox
 import queue
+import threading
 import time
 import os
 import sys
@@ -17,17 +18,18 @@ def resource_path(relative_path):
 
     return os.path.join(base_path, relative_path)
 
-import win32com.client
 from ..utils.constants import (
-    BIF_NEWDIALOGSTYLE, BIF_NONEWFOLDERBUTTON,
     WINDOW_TITLE, WINDOW_GEOMETRY, THEME_MODE, THEME_COLOR,
     COLOR_WARNING_BG, COLOR_WARNING_TEXT, COLOR_INSTRUCTION_BG, COLOR_INSTRUCTION_TEXT,
     COLOR_BUTTON_MTP, COLOR_BUTTON_MTP_HOVER, COLOR_TEXT_GRAY, COLOR_TEXT_WHITE,
     FONT_WARNING, FONT_INSTRUCTION, FONT_HEADER_LARGE, FONT_HEADER_MEDIUM, FONT_NORMAL, FONT_BUTTON,
-    QUEUE_CHECK_INTERVAL_MS, TIMER_UPDATE_INTERVAL_MS
+    QUEUE_CHECK_INTERVAL_MS, TIMER_UPDATE_INTERVAL_MS, BANDWIDTH_LIMIT_OPTIONS,
+    OUTPUT_MODE_FILES, OUTPUT_MODE_PACK, SELECTION_PERIOD_OPTIONS, SELECTION_MEDIA_OPTIONS, VIDEO_MODE_OPTIONS
 )
 from .dialogs import MultiSelectDialog, BackupModeDialog
+from .device_browser import DeviceBrowser
 from ..core.backup_manager import BackupManager
+from ..core.selection import SelectionQuery
 
 class BackupApp(customtkinter.CTk):
     """
@@ -52,10 +54,23 @@ class BackupApp(customtkinter.CTk):
         # Variables
         self.source_path = tk.StringVar()
         self.dest_path = tk.StringVar()
-        self.source_shell_item = None # For MTP devices
+        self.mirror_paths = [] # Extra destinations that receive the same files
+        self.mirror_text = tk.StringVar()
+        self.source_is_device = False # MTP source, backed up through the Shell
+        self.device_subfolders = [] # Streamed in by the device browser
+        self.device_folder_stats = {} # name -> (file count, bytes), filled in while the picker is open
         self.selected_subfolders = [] # List of folder names to filter by
         self.mtp_breadcrumbs = [] # Path of folder names for thread-safe re-acquisition
         self.auto_convert_heic = False # Flag from Backup Mode selection
+        self.organize_by_date = tk.BooleanVar(value=False) # Year/Month folders instead of today's date folder
+        self.pack_output = tk.BooleanVar(value=False) # Indexed .tar volumes instead of individual files
+        self.skip_unchanged = tk.BooleanVar(value=False) # Skip iPhone folders unchanged since the last backup
+        self.speed_limit = tk.StringVar(value="Unlimited")
+        self.selection_period = tk.StringVar(value="All files")
+        self.selection_media = tk.StringVar(value="Photos & videos")
+        self.video_mode = tk.StringVar(value="Keep as copied") # Optional ffmpeg stage after the copy
+        self.background_mode = tk.BooleanVar(value=False)
+        self.device_browser = DeviceBrowser(self.handle_manager_callback, self.normalize_name)
         
         self.timer_start_time = 0.0
         self.is_timer_running = False
@@ -158,7 +173,7 @@ class BackupApp(customtkinter.CTk):
         lbl_title = customtkinter.CTkLabel(card, text="1. Source Device / Folder", font=FONT_HEADER_MEDIUM)
         lbl_title.pack(anchor="w", padx=20, pady=(15, 5))
         
-        btn_mtp = customtkinter.CTkButton(
+        self.btn_mtp = customtkinter.CTkButton(
             card, 
             text="Select iPhone (MTP)", 
             command=self.select_source_mtp, 
@@ -167,7 +182,7 @@ class BackupApp(customtkinter.CTk):
             font=FONT_BUTTON,
             height=40
         )
-        btn_mtp.pack(padx=20, pady=5, fill="x")
+        self.btn_mtp.pack(padx=20, pady=5, fill="x")
         
         self.lbl_source = customtkinter.CTkLabel(card, textvariable=self.source_path, text_color=COLOR_TEXT_GRAY, wraplength=500)
         self.lbl_source.pack(padx=20, pady=(0, 15), anchor="w")
@@ -190,7 +205,21 @@ class BackupApp(customtkinter.CTk):
         btn_dest.pack(padx=20, pady=5, fill="x")
         
         self.lbl_dest = customtkinter.CTkLabel(card, textvariable=self.dest_path, text_color=COLOR_TEXT_GRAY, wraplength=500)
-        self.lbl_dest.pack(padx=20, pady=(0, 15), anchor="w")
+        self.lbl_dest.pack(padx=20, pady=(0, 5), anchor="w")
+        
+        btn_mirror = customtkinter.CTkButton(
+            card,
+            text="Add Mirror Destination (optional)",
+            command=self.add_mirror_dest,
+            fg_color="transparent",
+            border_width=1,
+            font=FONT_NORMAL,
+            height=30
+        )
+        btn_mirror.pack(padx=20, pady=5, fill="x")
+        
+        self.lbl_mirrors = customtkinter.CTkLabel(card, textvariable=self.mirror_text, text_color=COLOR_TEXT_GRAY, wraplength=500, justify="left")
+        self.lbl_mirrors.pack(padx=20, pady=(0, 15), anchor="w")
         return card
 
     def _create_action_card(self, parent):
@@ -207,6 +236,89 @@ class BackupApp(customtkinter.CTk):
         self.lbl_time = customtkinter.CTkLabel(card, text="", anchor="e", text_color="gray")
         self.lbl_time.pack(pady=(5, 10), padx=20, fill="x")
 
+        self.chk_organize = customtkinter.CTkCheckBox(
+            card,
+            text="Organize into Year/Month folders (by capture date)",
+            variable=self.organize_by_date
+        )
+        self.chk_organize.pack(pady=(0, 5), padx=20, anchor="w")
+
+        self.chk_pack = customtkinter.CTkCheckBox(
+            card,
+            text="Pack into large archive files (faster on NAS, keeps originals)",
+            variable=self.pack_output
+        )
+        self.chk_pack.pack(pady=(0, 5), padx=20, anchor="w")
+
+        self.chk_skip_unchanged = customtkinter.CTkCheckBox(
+            card,
+            text="Skip iPhone folders unchanged since the last backup",
+            variable=self.skip_unchanged
+        )
+        self.chk_skip_unchanged.pack(pady=(0, 5), padx=20, anchor="w")
+
+        # Selection - filters applied while the source is enumerated
+        selection_frame = customtkinter.CTkFrame(card, fg_color="transparent")
+        selection_frame.pack(pady=(0, 5), padx=20, fill="x")
+
+        lbl_selection = customtkinter.CTkLabel(selection_frame, text="Include:")
+        lbl_selection.pack(side="left")
+
+        self.opt_period = customtkinter.CTkOptionMenu(
+            selection_frame,
+            values=list(SELECTION_PERIOD_OPTIONS.keys()),
+            variable=self.selection_period,
+            width=170
+        )
+        self.opt_period.pack(side="left", padx=(5, 10))
+
+        self.opt_media = customtkinter.CTkOptionMenu(
+            selection_frame,
+            values=list(SELECTION_MEDIA_OPTIONS.keys()),
+            variable=self.selection_media,
+            width=150
+        )
+        self.opt_media.pack(side="left")
+
+        # Video stage - needs ffmpeg, skipped for packed output
+        video_frame = customtkinter.CTkFrame(card, fg_color="transparent")
+        video_frame.pack(pady=(0, 5), padx=20, fill="x")
+
+        lbl_video = customtkinter.CTkLabel(video_frame, text="Videos:")
+        lbl_video.pack(side="left")
+
+        self.opt_video = customtkinter.CTkOptionMenu(
+            video_frame,
+            values=list(VIDEO_MODE_OPTIONS.keys()),
+            variable=self.video_mode,
+            width=200
+        )
+        self.opt_video.pack(side="left", padx=(5, 0))
+
+        # Throttling - applied immediately, also while a backup is running
+        throttle_frame = customtkinter.CTkFrame(card, fg_color="transparent")
+        throttle_frame.pack(pady=(0, 5), padx=20, fill="x")
+
+        lbl_speed = customtkinter.CTkLabel(throttle_frame, text="Speed limit:")
+        lbl_speed.pack(side="left")
+
+        self.opt_speed = customtkinter.CTkOptionMenu(
+            throttle_frame,
+            values=list(BANDWIDTH_LIMIT_OPTIONS.keys()),
+            variable=self.speed_limit,
+            command=self.on_speed_limit_changed,
+            width=130
+        )
+        self.opt_speed.pack(side="left", padx=(5, 15))
+
+        self.chk_background = customtkinter.CTkCheckBox(
+            throttle_frame,
+            text="Background mode (low priority)",
+            variable=self.background_mode,
+            command=self.on_background_mode_changed
+        )
+        self.chk_background.pack(side="left")
+
         self.btn_start = customtkinter.CTkButton(
             card, 
             text="START BACKUP", 
@@ -222,6 +334,12 @@ class BackupApp(customtkinter.CTk):
 
 
 
+    def on_speed_limit_changed(self, choice):
+        self.backup_manager.set_bandwidth_limit(BANDWIDTH_LIMIT_OPTIONS.get(choice))
+
+    def on_background_mode_changed(self):
+        self.backup_manager.set_background_mode(self.background_mode.get())
+
     def normalize_name(self, name):
         # Remove LTR/RTL marks and strip whitespace
         if not name: return ""
@@ -231,59 +349,58 @@ class BackupApp(customtkinter.CTk):
         """
         Opens a Folder selection dialog configured for MTP devices (Shell Namespace).
         Allows selecting 'This PC' -> 'iPhone' -> 'Internal Storage'.
-        If subfolders exists, opens a MultiSelectDialog to filter them.
+        The picker and the subfolder listing run on a worker (see DeviceBrowser); clicking
+        the button again while folders are loading cancels the listing.
         """
-        # Use Shell.Application to browse for folder (supports MTP)
-        try:
-            shell = win32com.client.Dispatch("Shell.Application")
-            # 0 = Desktop, 17 = My Computer (Drives + MTP)
-            folder = shell.BrowseForFolder(0, "Select PARENT Folder (e.g. Internal Storage) - Subfolders selection will appear NEXT", BIF_NEWDIALOGSTYLE | BIF_NONEWFOLDERBUTTON, 17)
-            if folder:
-                self.source_shell_item = folder.Self
-                self.source_path.set(self.source_shell_item.Path)
-                self.selected_subfolders = []
-                
-                # Build Breadcrumbs for thread-safe re-acquisition
-                self.mtp_breadcrumbs = []
-                curr = folder
-                while curr:
-                    title = curr.Title
-                    # Stop if we hit the root or something empty
-                    if not title: break
-                    self.mtp_breadcrumbs.insert(0, self.normalize_name(title))
-                    try:
-                        curr = curr.ParentFolder
-                    except:
-                        break
-                
-                # Check for subfolders to offer multi-select
-                try:
-                    # Give MTP a moment to populate
-                    time.sleep(0.5)
-                    
-                    # Use the folder object directly from BrowseForFolder
-                    items = folder.Items()
-                    
-                    subfolders = [item.Name for item in items if item.IsFolder]
-                    
-                    if subfolders:
-                        # Ask user if they want to select specific folders
-                        dialog = MultiSelectDialog(self, "Select Subfolders", subfolders)
-                        if dialog.result:
-                            self.selected_subfolders = dialog.result
-                            self.lbl_source.configure(text=f"{self.source_shell_item.Path} ({len(self.selected_subfolders)} folders selected)")
-                        else:
-                            # User cancelled, clear selection (process all)
-                            self.selected_subfolders = []
-                            self.lbl_source.configure(text=self.source_shell_item.Path)
-                    else:
-                        pass
-                except Exception as e:
-                    print(f"Error checking subfolders: {e}")
-                    messagebox.showwarning("Warning", f"Could not check for subfolders: {e}")
+        if self.device_browser.is_busy:
+            self.device_browser.cancel()
+            return
+        self.device_subfolders = []
+        self.device_folder_stats = {}
+        self.btn_mtp.configure(text="Waiting for folder selection...")
+        self.device_browser.start("Select PARENT Folder (e.g. Internal Storage) - Subfolders selection will appear NEXT")
+
+    def _handle_browse_message(self, msg_type, data):
+        if msg_type == "browse_selected":
+            path, breadcrumbs = data
+            self.source_is_device = True
+            self.source_path.set(path)
+            self.selected_subfolders = []
+            self.mtp_breadcrumbs = breadcrumbs # For thread-safe re-acquisition
+            self.btn_mtp.configure(text="Loading folders... (click to cancel)")
+        elif msg_type == "browse_subfolders":
+            self.device_subfolders.extend(data)
+            self.btn_mtp.configure(text=f"Loading folders... {len(self.device_subfolders)} found (click to cancel)")
+        elif msg_type == "browse_stats":
+            name, count, size = data
+            self.device_folder_stats[name] = (count, size)
+        elif msg_type == "browse_done":
+            self._reset_mtp_button()
+            if self.device_subfolders:
+                # The dialog is modal (wait_window); opened outside check_queue so the queue keeps
+                # being drained and browse_stats fill in the rows while it is open
+                self.after(0, self._select_subfolders)
+        elif msg_type == "browse_cancelled":
+            # A picked folder stays selected; only the subfolder filter is skipped
+            self._reset_mtp_button()
+        elif msg_type == "browse_error":
+            self._reset_mtp_button()
+            messagebox.showerror("Error", f"Failed to open device selector: {data}")
+
+    def _select_subfolders(self):
+        """Asks the user which device subfolders to back up."""
+        dialog = MultiSelectDialog(self, "Select Subfolders", self.device_subfolders, stats=self.device_folder_stats)
+        self.device_browser.cancel() # Stats are no longer needed
+        if dialog.result:
+            self.selected_subfolders = dialog.result
+            self.lbl_source.configure(text=f"{self.source_path.get()} ({len(self.selected_subfolders)} folders selected)")
+        else:
+            # User cancelled, clear selection (process all)
+            self.selected_subfolders = []
+            self.lbl_source.configure(text=self.source_path.get())
 
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to open device selector: {e}")
+    def _reset_mtp_button(self):
+        self.btn_mtp.configure(text="Select iPhone (MTP)")
 
     def select_dest(self):
         """Opens a standard directory selector for the destination."""
@@ -291,6 +408,13 @@ class BackupApp(customtkinter.CTk):
         if path:
             self.dest_path.set(path)
 
+    def add_mirror_dest(self):
+        """Adds an extra destination (e.g. a NAS share) that receives a copy of every file."""
+        path = filedialog.askdirectory()
+        if path and path not in self.mirror_paths and path != self.dest_path.get():
+            self.mirror_paths.append(path)
+            self.mirror_text.set("\n".join(f"Mirror: {p}" for p in self.mirror_paths))
+
     def start_backup(self):
         """
         Validates inputs, prompts for mode (Optimize vs Keep Originals), 
@@ -302,6 +426,9 @@ class BackupApp(customtkinter.CTk):
         
         if self.backup_manager.is_running:
             return
+        if self.device_browser.is_busy:
+            messagebox.showinfo("Please wait", "Device folders are still loading. Click the iPhone button to cancel.")
+            return
 
         # Demand Mode Selection
         dialog = BackupModeDialog(self)
@@ -315,18 +442,25 @@ class BackupApp(customtkinter.CTk):
         self.progress_bar.set(0)
         
         # Pass breadcrumbs if MTP, otherwise None
-        breadcrumbs = self.mtp_breadcrumbs if self.source_shell_item else None
+        breadcrumbs = self.mtp_breadcrumbs if self.source_is_device else None
         source_str = self.source_path.get()
         dest_str = self.dest_path.get()
+        organize_by_date = self.organize_by_date.get()
         # Create Date-Based Subfolder
         date_str = datetime.now().strftime("%d-%m-%Y")
         
         # Check if the user selected a folder that IS ALREADY the date folder
-        if os.path.basename(dest_str) == date_str:
+        if organize_by_date:
+            # Files are routed into Year/Month folders under the selected destination
+            final_dest = dest_str
+        elif os.path.basename(dest_str) == date_str:
             final_dest = dest_str
         else:
             final_dest = os.path.join(dest_str, date_str)
         
+        # Mirrors use the same date folder layout as the main destination
+        mirror_dests = [p if organize_by_date or os.path.basename(p) == date_str else os.path.join(p, date_str) for p in self.mirror_paths]
+        
         try:
             os.makedirs(final_dest, exist_ok=True)
         except Exception as e:
@@ -341,7 +475,14 @@ class BackupApp(customtkinter.CTk):
         self.is_timer_running = True
         self.update_timer()
 
-        self.backup_manager.start_backup(source_str, final_dest, breadcrumbs, self.selected_subfolders, skip_live_photos)
+        selection = SelectionQuery.from_options(SELECTION_PERIOD_OPTIONS.get(self.selection_period.get()),
+                                                SELECTION_MEDIA_OPTIONS.get(self.selection_media.get()))
+
+        self.backup_manager.start_backup(source_str, final_dest, breadcrumbs, self.selected_subfolders, skip_live_photos, organize_by_date=organize_by_date, mirror_dests=mirror_dests,
+                                         output_mode=OUTPUT_MODE_PACK if self.pack_output.get() else OUTPUT_MODE_FILES,
+                                         incremental_root=dest_str if self.skip_unchanged.get() else None,
+                                         selection=selection, history_root=dest_str,
+                                         video_mode=VIDEO_MODE_OPTIONS.get(self.video_mode.get()))
 
     def update_timer(self):
         if not self.is_timer_running:
@@ -386,6 +527,10 @@ class BackupApp(customtkinter.CTk):
                         self._handle_finish_message(data)
                     elif msg_type == "conversion_finish":
                         self._handle_conversion_finish(data)
+                    elif msg_type == "heic_check":
+                        self._complete_finish(True, data)
+                    elif msg_type.startswith("browse_"):
+                        self._handle_browse_message(msg_type, data)
 
                 except Exception as e:
                     import traceback
@@ -413,19 +558,23 @@ class BackupApp(customtkinter.CTk):
         return f"{mins:02d}m {secs:02d}s"
 
     def _handle_finish_message(self, success):
+        if success and self.auto_convert_heic:
+            # Usually answered from the backup's snapshot, but may scan the folder: keep it off the Tk thread
+            self.lbl_status.configure(text="Checking for HEIC files...")
+            threading.Thread(target=self._check_heic, args=(self.actual_dest_path,), daemon=True).start()
+            return
+        self._complete_finish(success, False)
+
+    def _check_heic(self, dest_path):
+        try:
+            should_convert = self.backup_manager.has_files_with_ext(dest_path, '.heic')
+        except Exception:
+            should_convert = False
+        self.msg_queue.put(("heic_check", should_convert))
+
+    def _complete_finish(self, success, should_convert):
         total_time_str = self._format_total_time()
-        
         dest_path = self.actual_dest_path
-        should_convert = False
-            
-        if success and self.auto_convert_heic:
-            try:
-                for root, dirs, files in os.walk(dest_path):
-                    if any(f.lower().endswith('.heic') for f in files):
-                        should_convert = True
-                        break
-            except Exception:
-                pass
         
         # Stop timer ONLY if we are NOT proceeding to conversion
         if not should_convert:
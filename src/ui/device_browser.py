@@ -0,0 +1,137 @@
+import time
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+import win32com.client
+import pythoncom
+from ..utils.constants import (
+    BIF_NEWDIALOGSTYLE, BIF_NONEWFOLDERBUTTON, SSF_DRIVES,
+    DEVICE_BROWSE_BATCH, DEVICE_POPULATE_RETRIES, DEVICE_POPULATE_INTERVAL
+)
+from ..utils.logger import setup_logger
+
+logger = setup_logger("DeviceBrowser")
+
+class DeviceBrowser:
+    """
+    Runs the device folder picker and subfolder discovery on a worker thread, so the Tk
+    thread never waits on COM. Results are posted as (msg_type, data) messages:
+        browse_selected   (path, breadcrumbs) once a folder was picked
+        browse_subfolders [names] in batches while the folder is listed
+        browse_done       None when the listing is complete
+        browse_stats      (name, file count, total bytes) per subfolder, after browse_done
+        browse_cancelled  None if the picker was closed or cancel() was called
+        browse_error      message
+    Shell objects stay on the worker thread; only strings cross over to the UI.
+    Subfolder stats are cached per device path and reused while the folder's item count
+    is unchanged, so reopening the same folder is instant.
+    """
+    def __init__(self, post: Callable, normalize_name: Callable[[str], str]):
+        self.post = post
+        self.normalize_name = normalize_name
+        self._cancel = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._stats_cache: Dict[Tuple[str, str], Tuple[int, Tuple[int, int]]] = {} # -> (item count, stats)
+
+    @property
+    def is_busy(self) -> bool:
+        return bool(self._thread and self._thread.is_alive())
+
+    def start(self, prompt: str):
+        if self.is_busy: return
+        self._cancel.clear()
+        self._thread = threading.Thread(target=self._run, args=(prompt,), name="DeviceBrowser", daemon=True)
+        self._thread.start()
+
+    def cancel(self):
+        """Stops the subfolder listing and stats; the picker dialog itself is closed by the user."""
+        self._cancel.set()
+
+    def _run(self, prompt: str):
+        pythoncom.CoInitialize()
+        try:
+            shell = win32com.client.Dispatch("Shell.Application")
+            folder = shell.BrowseForFolder(0, prompt, BIF_NEWDIALOGSTYLE | BIF_NONEWFOLDERBUTTON, SSF_DRIVES)
+            if not folder or self._cancel.is_set():
+                self.post("browse_cancelled", None)
+                return
+            path = folder.Self.Path
+            self.post("browse_selected", (path, self._breadcrumbs(folder)))
+            subfolders = self._list_subfolders(folder)
+            if subfolders is None:
+                self.post("browse_cancelled", None)
+                return
+            self.post("browse_done", None)
+            self._collect_stats(path, subfolders)
+        except Exception as e:
+            logger.error(f"Device browsing failed: {e}")
+            self.post("browse_error", str(e))
+        finally:
+            pythoncom.CoUninitialize()
+
+    def _breadcrumbs(self, folder) -> List[str]:
+        """Folder titles from the root down, for re-acquiring the folder on the backup thread."""
+        breadcrumbs = []
+        curr = folder
+        while curr:
+            title = curr.Title
+            # Stop if we hit the root or something empty
+            if not title: break
+            breadcrumbs.insert(0, self.normalize_name(title))
+            try:
+                curr = curr.ParentFolder
+            except Exception:
+                break
+        return breadcrumbs
+
+    def _list_subfolders(self, folder) -> Optional[list]:
+        """Posts subfolder names in batches; returns the subfolder items, or None if cancelled."""
+        # Give MTP a moment to populate, without a fixed sleep when it is already there
+        items = folder.Items()
+        for _ in range(DEVICE_POPULATE_RETRIES):
+            if items.Count or self._cancel.is_set(): break
+            time.sleep(DEVICE_POPULATE_INTERVAL)
+            items = folder.Items()
+
+        batch = []
+        subfolders = []
+        for item in items:
+            if self._cancel.is_set(): return None
+            if item.IsFolder:
+                subfolders.append(item)
+                batch.append(item.Name)
+            if len(batch) >= DEVICE_BROWSE_BATCH:
+                self.post("browse_subfolders", batch)
+                batch = []
+        if batch:
+            self.post("browse_subfolders", batch)
+        return None if self._cancel.is_set() else subfolders
+
+    def _collect_stats(self, path: str, subfolders: list):
+        """Counts files and bytes per subfolder (cached), posting each result as it is known."""
+        for item in subfolders:
+            if self._cancel.is_set(): return
+            name = item.Name
+            key = (path, name)
+            folder = item.GetFolder
+            item_count = folder.Items().Count
+            cached = self._stats_cache.get(key)
+            if cached and cached[0] == item_count:
+                stats = cached[1]
+            else:
+                stats = self._folder_stats(folder)
+                if stats is None: return # Cancelled midway, nothing to cache
+                self._stats_cache[key] = (item_count, stats)
+            self.post("browse_stats", (name,) + stats)
+
+    def _folder_stats(self, folder) -> Optional[Tuple[int, int]]:
+        count = size = 0
+        pending = [folder]
+        while pending:
+            for item in pending.pop().Items():
+                if self._cancel.is_set(): return None
+                if item.IsFolder:
+                    pending.append(item.GetFolder)
+                else:
+                    count += 1
+                    size += item.Size
+        return count, size
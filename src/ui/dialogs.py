@@ -4,38 +4,154 @@ import tkinter as tk
 class MultiSelectDialog(customtkinter.CTkToplevel):
     """
     A modal dialog that allows selecting multiple items from a list using checkboxes.
+    The list is virtualized: only the rows that fit the window exist as widgets and are
+    re-bound to items while scrolling, so hundreds of folders stay responsive.
+    stats is an optional dict {item: (file count, total bytes)} that may still be filling
+    in from a background worker; rows show each entry as soon as it arrives.
     """
-    def __init__(self, parent, title, items):
+    ROW_HEIGHT = 30
+    STATS_REFRESH_MS = 250
+
+    def __init__(self, parent, title, items, stats=None):
         super().__init__(parent)
         self.title(title)
-        self.geometry("400x500")
+        self.geometry("460x540")
         self.resizable(True, True)
         self.result = None
+        self.items = list(items)
+        self.stats = stats
+        self.selected = set()
+        self.offset = 0
+        self.rows = [] # (checkbox, variable, stats label), re-bound on scroll
         
         self.lbl_instruction = customtkinter.CTkLabel(self, text="Select folders to backup:", font=("Roboto", 16))
         self.lbl_instruction.pack(pady=10)
+
+        # "Everything from this folder on" - iOS month folders sort by date
+        select_frame = customtkinter.CTkFrame(self, fg_color="transparent")
+        select_frame.pack(fill="x", padx=10)
+        customtkinter.CTkLabel(select_frame, text="Select from:").pack(side="left")
+        self.opt_from = customtkinter.CTkOptionMenu(select_frame, values=sorted(self.items) or [""], command=self.select_from, width=150)
+        self.opt_from.set("")
+        self.opt_from.pack(side="left", padx=5)
+        customtkinter.CTkButton(select_frame, text="All", width=50, command=lambda: self._set_selection(self.items)).pack(side="left", padx=2)
+        customtkinter.CTkButton(select_frame, text="None", width=50, command=lambda: self._set_selection([])).pack(side="left", padx=2)
         
-        self.scroll_frame = customtkinter.CTkScrollableFrame(self)
-        self.scroll_frame.pack(fill="both", expand=True, padx=10, pady=5)
-        
-        self.check_vars = {}
-        for item in items:
-            var = tk.BooleanVar(value=False)
-            chk = customtkinter.CTkCheckBox(self.scroll_frame, text=item, variable=var)
-            chk.pack(anchor="w", pady=2, padx=5)
-            self.check_vars[item] = var
+        list_frame = customtkinter.CTkFrame(self)
+        list_frame.pack(fill="both", expand=True, padx=10, pady=5)
+        self.scrollbar = customtkinter.CTkScrollbar(list_frame, command=self._on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+        self.row_frame = customtkinter.CTkFrame(list_frame, fg_color="transparent")
+        self.row_frame.pack(side="left", fill="both", expand=True)
+        self.row_frame.bind("<Configure>", self._on_resize)
+        self.bind("<MouseWheel>", self._on_mousewheel)
+
+        self.lbl_summary = customtkinter.CTkLabel(self, text="", text_color="gray")
+        self.lbl_summary.pack()
             
         self.btn_confirm = customtkinter.CTkButton(self, text="Confirm Selection", command=self.confirm)
         self.btn_confirm.pack(pady=10)
+
+        if self.stats is not None:
+            self.after(self.STATS_REFRESH_MS, self._refresh_stats)
         
         # Make modal
         self.transient(parent)
         self.grab_set()
         self.focus_set()
         self.wait_window()
+
+    def _visible_count(self) -> int:
+        return max(1, self.row_frame.winfo_height() // self.ROW_HEIGHT)
+
+    def _on_resize(self, event=None):
+        needed = min(self._visible_count(), len(self.items))
+        while len(self.rows) < needed:
+            index = len(self.rows)
+            var = tk.BooleanVar(value=False)
+            row = customtkinter.CTkFrame(self.row_frame, fg_color="transparent", height=self.ROW_HEIGHT)
+            row.pack(fill="x")
+            chk = customtkinter.CTkCheckBox(row, text="", variable=var, command=lambda i=index: self._on_toggle(i))
+            chk.pack(side="left", padx=5)
+            lbl = customtkinter.CTkLabel(row, text="", text_color="gray")
+            lbl.pack(side="right", padx=5)
+            chk.bind("<MouseWheel>", self._on_mousewheel)
+            self.rows.append((chk, var, lbl))
+        self._scroll_to(self.offset)
+
+    def _scroll_to(self, offset: int):
+        self.offset = max(0, min(offset, len(self.items) - len(self.rows)))
+        self._render()
+        if self.items:
+            self.scrollbar.set(self.offset / len(self.items), (self.offset + len(self.rows)) / len(self.items))
+
+    def _on_scrollbar(self, *args):
+        if args[0] == "moveto":
+            self._scroll_to(int(float(args[1]) * len(self.items)))
+        elif args[0] == "scroll":
+            step = len(self.rows) if args[2] == "pages" else 1
+            self._scroll_to(self.offset + int(args[1]) * step)
+
+    def _on_mousewheel(self, event):
+        self._scroll_to(self.offset - (1 if event.delta > 0 else -1) * 3)
+
+    def _render(self):
+        """Binds the row widgets to the items currently in view."""
+        for index, (chk, var, lbl) in enumerate(self.rows):
+            item = self.items[self.offset + index]
+            chk.configure(text=item)
+            var.set(item in self.selected)
+            lbl.configure(text=self._format_stats(item))
+        self._update_summary()
+
+    def _format_stats(self, item) -> str:
+        if self.stats is None: return ""
+        stats = self.stats.get(item)
+        if not stats: return "..."
+        count, size = stats
+        return f"{count} files, {size / (1024 * 1024):.0f} MB"
+
+    def _refresh_stats(self):
+        """Picks up counts and sizes that arrived since the last refresh."""
+        try:
+            if not self.winfo_exists(): return
+        except tk.TclError:
+            return
+        for index, (chk, var, lbl) in enumerate(self.rows):
+            lbl.configure(text=self._format_stats(self.items[self.offset + index]))
+        self._update_summary()
+        if len(self.stats) < len(self.items):
+            self.after(self.STATS_REFRESH_MS, self._refresh_stats)
+
+    def _update_summary(self):
+        stats = self.stats or {}
+        known = [stats[item] for item in self.selected if item in stats]
+        size = sum(s for _, s in known)
+        text = f"{len(self.selected)} of {len(self.items)} folders selected"
+        if self.stats is not None:
+            text += f", {sum(c for c, _ in known)} files, {size / (1024 ** 3):.2f} GB"
+            if len(known) < len(self.selected): text += " (still counting)"
+        self.lbl_summary.configure(text=text)
+
+    def _on_toggle(self, index: int):
+        chk, var, lbl = self.rows[index]
+        item = self.items[self.offset + index]
+        if var.get():
+            self.selected.add(item)
+        else:
+            self.selected.discard(item)
+        self._update_summary()
+
+    def _set_selection(self, items):
+        self.selected = set(items)
+        self._render()
+
+    def select_from(self, first):
+        """Selects every item sorting at or after first (e.g. all month folders since 202401__)."""
+        self._set_selection([item for item in self.items if item >= first])
         
     def confirm(self):
-        self.result = [item for item, var in self.check_vars.items() if var.get()]
+        self.result = [item for item in self.items if item in self.selected]
         self.destroy()
 
 class BackupModeDialog(customtkinter.CTkToplevel):
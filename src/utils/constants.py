@@ -1,3 +1,5 @@
+import os
+
 # Shell Constants
 BIF_RETURNONLYFSDIRS = 0x0001
 BIF_DONTGOBELOWDOMAIN = 0x0002
@@ -25,15 +27,117 @@ FOF_NOCONFIRMATION = 16
 FOF_NOERRORUI = 1024
 COPY_FLAGS_SILENT = FOF_SILENT | FOF_NOCONFIRMATION | FOF_NOERRORUI
 
+# FolderItems3.Filter flags
+SHCONTF_NONFOLDERS = 0x40
+
+# Batched MTP Copy
+MTP_BATCH_SIZE = 100 # Items per CopyHere call
+MTP_BATCH_IDLE_TIMEOUT = 20 # Seconds without any landing progress before the rest of a batch counts as missed
+
 # Copy Configuration
 CHUNK_SIZE = 1024 * 1024 # 1MB
 MAX_RETRIES = 3
 VERIFY_TIMEOUT = 120
 RETRY_DELAY = 1
+MAX_FAILURES_IN_MEMORY = 1000 # Further failures are spilled to a temp file
 VERIFY_POLL_INTERVAL = 0.2
 
+# Multi-Destination Fan-Out
+FANOUT_QUEUE_CHUNKS = 16 # Chunks buffered per mirror before the reader waits
+FANOUT_STALL_TIMEOUT = 60 # Seconds a mirror may block before it is dropped
+
+# Packed Archive Output
+OUTPUT_MODE_FILES = "files"
+OUTPUT_MODE_PACK = "pack"
+PACK_VOLUME_PREFIX = "backup_"
+PACK_VOLUME_BYTES = 4 * 1024 * 1024 * 1024 # Roll over to a new .tar volume after 4GB
+PACK_INDEX_FILENAME = "pack_index.jsonl"
+PACK_STAGING_DIRNAME = ".pack_staging" # MTP items land here before being packed
+PACK_VERIFY_READBACK = True # Re-read each packed member and compare its hash
+
+# Backup Manifest & Verification
+MANIFEST_FILENAME = "backup_manifest.jsonl"
+VERIFY_PROGRESS_FILENAME = ".verify_progress.jsonl"
+VERIFY_REPORT_FILENAME = "verify_report.txt"
+VERIFY_READ_SIZE = 8 * 1024 * 1024 # Large sequential reads
+VERIFY_READERS = {"hdd": 1, "ssd": 4, "network": 4, "unknown": 2} # Parallel readers per storage type
+
+# Scheduling
+SCHEDULE_SOURCE_ORDER = "source"
+SCHEDULE_SMALL_FIRST = "small_first"
+SCHEDULE_LARGEST_FIRST = "largest_first"
+SCHEDULE_NEWEST_FIRST = "newest_first"
+SCHEDULE_POLICIES = (SCHEDULE_SOURCE_ORDER, SCHEDULE_SMALL_FIRST, SCHEDULE_LARGEST_FIRST, SCHEDULE_NEWEST_FIRST)
+DEFAULT_SCHEDULE_POLICY = SCHEDULE_SOURCE_ORDER # Other orders are opt-in: they need the whole plan (and Size/ModifyDate reads on MTP)
+COPY_WORKERS = 2                          # Parallel copy workers in standard (filesystem) mode
+LARGE_FILE_THRESHOLD = 64 * 1024 * 1024   # Files above this are interleaved with small ones
+
+# Adaptive verification timeouts (see ThroughputEstimator)
+VERIFY_MIN_TIMEOUT = 10              # Seconds allowed for per-file overhead regardless of size
+VERIFY_MAX_TIMEOUT = 3600
+VERIFY_THROUGHPUT_SAFETY = 0.25      # Tolerate transfers down to 1/4 of the measured throughput
+MTP_INITIAL_THROUGHPUT = 2 * 1024 * 1024 # Conservative bytes/s until the first files are measured
+
+# Conversion Configuration
+JPEG_QUALITY = 90
+CONVERSION_WORKERS = max(1, min(4, os.cpu_count() or 1))
+CONVERSION_PIXEL_BUDGET = 150_000_000 # ~3 decoded 48MP frames in flight
+
 # Allowed Extensions
 ALLOWED_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.heic', '.mov', '.mp4', '.avi', '.m4v'}
+VIDEO_EXTENSIONS = {'.mov', '.mp4', '.avi', '.m4v'}
+PHOTO_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.heic'}
+
+# Selection Configuration (filters applied while enumerating the source)
+MEDIA_PHOTO = "photo"
+MEDIA_VIDEO = "video"
+SELECTION_SINCE_LAST_RUN = "last_run"
+SELECTION_PERIOD_OPTIONS = { # Days back from today, or since the last successful backup
+    "All files": None,
+    "Last 30 days": 30,
+    "Last 12 months": 365,
+    "New since last backup": SELECTION_SINCE_LAST_RUN,
+}
+SELECTION_MEDIA_OPTIONS = {
+    "Photos & videos": None,
+    "Photos only": {MEDIA_PHOTO},
+    "Videos only": {MEDIA_VIDEO},
+}
+
+# Throttling Configuration (bytes per second, None = unlimited)
+BANDWIDTH_LIMIT_OPTIONS = {
+    "Unlimited": None,
+    "100 MB/s": 100 * 1024 * 1024,
+    "50 MB/s": 50 * 1024 * 1024,
+    "20 MB/s": 20 * 1024 * 1024,
+    "5 MB/s": 5 * 1024 * 1024,
+}
+BACKGROUND_CPU_SHARE = 0.5 # Fraction of wall time conversion workers may run in background mode
+SESSION_MAX_PARALLEL = 4 # Device backups copying at once; more sessions wait for a slot
+SESSION_HISTORY_SIZE = 50 # Finished sessions kept as summaries (their managers and threads are released)
+
+# Thumbnail Cache Configuration
+THUMBNAIL_CACHE_DIR = os.path.join(os.environ.get("LOCALAPPDATA") or os.path.expanduser("~"), "CiderBridge", "thumbnails")
+THUMBNAIL_CACHE_MAX_BYTES = 512 * 1024 * 1024 # 512MB, least recently used thumbnails are evicted first
+THUMBNAIL_SIZE = 256
+THUMBNAIL_FORMAT = "WEBP"
+THUMBNAIL_WORKERS = 2
+THUMBNAIL_QUEUE_SIZE = 32
+THUMBNAIL_MAX_SOURCE_BYTES = 64 * 1024 * 1024
+THUMBNAIL_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.heic'}
+
+# Video Processing Configuration
+FFMPEG_BINARY = "ffmpeg"
+VIDEO_MODE_REMUX = "remux"         # Copy streams into MP4 with faststart (lossless, fast)
+VIDEO_MODE_TRANSCODE = "transcode" # Re-encode to H.264/AAC for maximum compatibility
+VIDEO_WORKERS = 2
+VIDEO_QUEUE_SIZE = 8
+VIDEO_DURATION_TOLERANCE = 1.0     # Seconds an output may differ from its source before it is rejected
+VIDEO_MODE_OPTIONS = { # Post-copy video stage; outputs are written next to the originals, which are kept
+    "Keep as copied": None,
+    "Remux to MP4 (lossless)": VIDEO_MODE_REMUX,
+    "Convert to H.264 MP4": VIDEO_MODE_TRANSCODE,
+}
 
 # UI Configuration
 APP_VERSION = "1.0.0"
@@ -63,3 +167,6 @@ FONT_NORMAL = ("Segoe UI", 13)
 # Timing
 QUEUE_CHECK_INTERVAL_MS = 100
 TIMER_UPDATE_INTERVAL_MS = 1000
+DEVICE_BROWSE_BATCH = 25 # Subfolder names posted to the UI per message while a device folder is listed
+DEVICE_POPULATE_RETRIES = 10 # MTP folders can report no items until the device has populated them
+DEVICE_POPULATE_INTERVAL = 0.1
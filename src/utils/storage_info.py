@@ -0,0 +1,81 @@
+import os
+import sys
+
+# GetDriveTypeW result for network drives
+DRIVE_REMOTE = 4
+
+# DeviceIoControl query for the "incurs seek penalty" storage property
+IOCTL_STORAGE_QUERY_PROPERTY = 0x002D1400
+STORAGE_DEVICE_SEEK_PENALTY_PROPERTY = 7
+
+def detect_storage_kind(path: str) -> str:
+    """
+    Best-effort classification of the storage holding path.
+
+    Returns:
+        "network", "hdd", "ssd" or "unknown".
+    """
+    path = os.path.abspath(path)
+    try:
+        if sys.platform == "win32":
+            return _detect_windows(path)
+        return _detect_linux(path)
+    except Exception:
+        return "unknown"
+
+def _detect_windows(path: str) -> str:
+    import ctypes
+    from ctypes import wintypes
+
+    if path.startswith("\\\\"):
+        return "network"
+    drive = os.path.splitdrive(path)[0]
+    if not drive:
+        return "unknown"
+    kernel32 = ctypes.windll.kernel32
+    if kernel32.GetDriveTypeW(drive + "\\") == DRIVE_REMOTE:
+        return "network"
+
+    class STORAGE_PROPERTY_QUERY(ctypes.Structure):
+        _fields_ = [("PropertyId", wintypes.DWORD), ("QueryType", wintypes.DWORD), ("AdditionalParameters", ctypes.c_byte * 1)]
+
+    class DEVICE_SEEK_PENALTY_DESCRIPTOR(ctypes.Structure):
+        _fields_ = [("Version", wintypes.DWORD), ("Size", wintypes.DWORD), ("IncursSeekPenalty", ctypes.c_ubyte)]
+
+    kernel32.CreateFileW.restype = wintypes.HANDLE
+    # Zero access rights are enough for this query and do not need elevation
+    handle = kernel32.CreateFileW(f"\\\\.\\{drive}", 0, 3, None, 3, 0, None)
+    if handle in (None, wintypes.HANDLE(-1).value):
+        return "unknown"
+    try:
+        query = STORAGE_PROPERTY_QUERY(STORAGE_DEVICE_SEEK_PENALTY_PROPERTY, 0)
+        result = DEVICE_SEEK_PENALTY_DESCRIPTOR()
+        returned = wintypes.DWORD()
+        ok = kernel32.DeviceIoControl(handle, IOCTL_STORAGE_QUERY_PROPERTY, ctypes.byref(query), ctypes.sizeof(query),
+                                      ctypes.byref(result), ctypes.sizeof(result), ctypes.byref(returned), None)
+        if not ok:
+            return "unknown"
+        return "hdd" if result.IncursSeekPenalty else "ssd"
+    finally:
+        kernel32.CloseHandle(handle)
+
+def _detect_linux(path: str) -> str:
+    dev = os.stat(path).st_dev
+    # Network filesystems report an anonymous device (major 0)
+    if os.major(dev) == 0:
+        with open("/proc/mounts", "r") as f:
+            fs_types = {line.split()[1]: line.split()[2] for line in f}
+        mount = path
+        while mount not in fs_types and mount != os.path.dirname(mount):
+            mount = os.path.dirname(mount)
+        if fs_types.get(mount, "") in ("nfs", "nfs4", "cifs", "smb3", "smbfs", "sshfs", "fuse.sshfs"):
+            return "network"
+        return "unknown"
+    sys_dev = os.path.realpath(f"/sys/dev/block/{os.major(dev)}:{os.minor(dev)}")
+    # Partitions inherit the queue settings of their parent disk
+    for candidate in (sys_dev, os.path.dirname(sys_dev)):
+        rotational = os.path.join(candidate, "queue", "rotational")
+        if os.path.exists(rotational):
+            with open(rotational) as f:
+                return "hdd" if f.read().strip() == "1" else "ssd"
+    return "unknown"
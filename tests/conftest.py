@@ -0,0 +1,15 @@
+import os
+import sys
+import types
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# The Shell COM modules only exist on Windows; the handlers import them at module level
+# but the code under test never touches them.
+for module_name in ("win32com", "win32com.client", "pythoncom"):
+    try:
+        __import__(module_name)
+    except ImportError:
+        sys.modules[module_name] = types.ModuleType(module_name)
+if not hasattr(sys.modules["win32com"], "client"):
+    sys.modules["win32com"].client = sys.modules["win32com.client"]
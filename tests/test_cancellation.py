@@ -0,0 +1,89 @@
+import os
+import sys
+import time
+import threading
+import pytest
+from src.core.cancellation import CancellationToken
+from src.core.file_system_handler import FileSystemHandler
+from src.core.throttle import TokenBucket
+from src.core.video_processor import VideoProcessor
+from src.utils.constants import SCHEDULE_SOURCE_ORDER, VIDEO_MODE_REMUX
+
+MB = 1024 * 1024
+STOP_BOUND = 1.0 # Seconds from stop() until the operation has returned
+
+def stop_after(delay, stop, stopped):
+    def run():
+        time.sleep(delay)
+        stopped.append(time.perf_counter())
+        stop()
+    threading.Thread(target=run, daemon=True).start()
+
+def test_poll_loop_wakes_on_cancel():
+    token = CancellationToken()
+    stopped = []
+    stop_after(0.1, token.cancel, stopped)
+    while token.sleep(5):
+        pass
+    assert time.perf_counter() - stopped[0] < STOP_BOUND
+
+def test_on_cancel_runs_once_and_immediately_when_late():
+    token = CancellationToken()
+    calls = []
+    token.on_cancel(lambda: calls.append("early"))
+    token.cancel()
+    token.cancel()
+    token.on_cancel(lambda: calls.append("late"))
+    assert calls == ["early", "late"]
+
+def test_copy_stops_within_bound_and_leaves_no_partial(tmp_path):
+    source = tmp_path / "src"
+    dest = tmp_path / "dst"
+    source.mkdir()
+    (source / "VIDEO.MOV").write_bytes(os.urandom(MB) * 16)
+
+    handler = FileSystemHandler()
+    handler.schedule_policy = SCHEDULE_SOURCE_ORDER
+    handler.copy_workers = 1
+    handler.rate_limiter = TokenBucket(2 * MB) # About 8 s for the whole file
+    stopped = []
+    stop_after(0.5, handler.stop, stopped)
+    handler.backup_standard_mode(str(source), str(dest), 0, time.time())
+
+    assert time.perf_counter() - stopped[0] < STOP_BOUND
+    assert not (dest / "VIDEO.MOV").exists()
+
+@pytest.mark.skipif(os.name == "nt", reason="Stands in for ffmpeg with a shell script")
+def test_video_stage_terminates_ffmpeg_on_stop(tmp_path):
+    fake_ffmpeg = tmp_path / "ffmpeg"
+    fake_ffmpeg.write_text("#!/bin/sh\nexec sleep 30\n")
+    fake_ffmpeg.chmod(0o755)
+    video = tmp_path / "clip.mov"
+    video.write_bytes(b"x" * 1024)
+
+    processor = VideoProcessor(workers=1, ffmpeg_path=str(fake_ffmpeg))
+    processor.ffprobe_path = None
+    processor.start()
+    assert processor.submit(str(video), VIDEO_MODE_REMUX)
+    while not processor._processes: time.sleep(0.01)
+    stopped = []
+    stop_after(0.1, processor.stop, stopped)
+    report = processor.finish()
+
+    assert time.perf_counter() - stopped[0] < STOP_BOUND
+    assert report["cancelled"] == 1 and report["failed"] == 0
+    assert not processor.failed_files
+    assert video.exists() and not (tmp_path / "clip.mp4.part").exists()
+
+def test_heic_budget_wait_returns_on_stop():
+    pytest.importorskip("PIL")
+    pytest.importorskip("pillow_heif")
+    from src.core.heic_converter import HeicConverter
+    converter = HeicConverter(workers=1, pixel_budget=100)
+    converter.is_running = True
+    converter.budget.acquire(100)
+    stopped = []
+    stop_after(0.1, converter.stop, stopped)
+
+    assert not converter.budget.acquire(100, lambda: converter.is_running)
+    assert time.perf_counter() - stopped[0] < STOP_BOUND
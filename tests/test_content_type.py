@@ -0,0 +1,53 @@
+from src.core.content_type import ContentTypeCache, sniff_bytes, extension_matches, CONTENT_TYPE_CACHE_FILENAME
+
+def ftyp(major, *compatible):
+    box = major + b"\x00\x00\x00\x00" + b"".join(compatible)
+    return (8 + len(box)).to_bytes(4, "big") + b"ftyp" + box + b"\x00" * 32
+
+def test_sniff_signatures():
+    assert sniff_bytes(b"\xff\xd8\xff\xe1" + b"\x00" * 16) == ".jpg"
+    assert sniff_bytes(b"\x89PNG\r\n\x1a\n" + b"\x00" * 16) == ".png"
+    assert sniff_bytes(b"RIFF\x00\x00\x00\x00AVI LIST") == ".avi"
+    assert sniff_bytes(ftyp(b"heic", b"mif1", b"heic")) == ".heic"
+    assert sniff_bytes(ftyp(b"qt  ", b"qt  ")) == ".mov"
+    assert sniff_bytes(ftyp(b"M4V ", b"isom")) == ".m4v"
+    assert sniff_bytes(ftyp(b"isom", b"mp41")) == ".mp4"
+    assert sniff_bytes(b"\x00\x00\x00\x08wide\x00\x00\x00\x00mdat") == ".mov"
+
+def test_sniff_unusual_major_brand_uses_compatible_brands():
+    assert sniff_bytes(ftyp(b"xxxx", b"mif1", b"heix")) == ".heic"
+    assert sniff_bytes(ftyp(b"xxxx", b"mp42")) == ".mp4"
+
+def test_sniff_rejects_avif_and_text():
+    assert sniff_bytes(ftyp(b"avif", b"mif1", b"avif")) is None
+    assert sniff_bytes(ftyp(b"mif1", b"avif", b"miaf")) is None
+    assert sniff_bytes(b"Hello, this is a text note\n") is None
+    assert sniff_bytes(b"") is None
+
+def test_extension_matches_aliases():
+    assert extension_matches(".jpg", ".JPEG")
+    assert extension_matches(".mp4", ".m4v")
+    assert extension_matches(".heic", ".HEIC")
+    assert not extension_matches(".heic", ".jpg")
+
+def test_cache_detect_lookup_and_reload(tmp_path):
+    media = tmp_path / "item"
+    media.write_bytes(b"\xff\xd8\xff\xe0" + b"\x00" * 60)
+    note = tmp_path / "note"
+    note.write_bytes(b"plain text")
+    cache = ContentTypeCache(str(tmp_path))
+    media_key = ContentTypeCache.key(("DCIM", "100APPLE"), "IMG_1", 64)
+    note_key = ContentTypeCache.key(("DCIM", "100APPLE"), "note", 10)
+
+    assert cache.lookup(media_key) is None
+    assert cache.detect(media_key, str(media)) == ".jpg"
+    assert cache.detect(note_key, str(note)) == ""
+    assert cache.detect("missing", str(tmp_path / "missing")) is None
+    assert cache.sniffed == 2
+    cache.save()
+    assert (tmp_path / CONTENT_TYPE_CACHE_FILENAME).exists()
+
+    reloaded = ContentTypeCache(str(tmp_path))
+    assert reloaded.lookup(media_key) == ".jpg"
+    assert reloaded.lookup(note_key) == ""
+    assert reloaded.lookup("missing") is None
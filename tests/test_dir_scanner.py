@@ -0,0 +1,32 @@
+import os
+from src.core.dir_scanner import DirectorySnapshot
+
+def test_landings_are_tracked_without_rescanning(tmp_path):
+    snapshot = DirectorySnapshot(str(tmp_path))
+    folder = str(tmp_path / "2024")
+    snapshot.add_file(os.path.join(folder, "IMG_0001.HEIC"), 300, 1.0)
+    snapshot.add_file(os.path.join(folder, "IMG_0001.JPG"), 100, 2.0)
+    snapshot.add_file(os.path.join(folder, "IMG_0001.JPG"), 120, 3.0) # Overwritten
+
+    entry = snapshot.get(os.path.join(folder, "IMG_0001.JPG"))
+    assert (entry.size, entry.mtime, entry.ext) == (120, 3.0, ".jpg")
+    assert sorted(snapshot.names_for_stem(folder, "img_0001")) == ["IMG_0001.HEIC", "IMG_0001.JPG"]
+    assert snapshot.file_count == 2 and snapshot.total_bytes == 420
+
+    snapshot.remove_file(os.path.join(folder, "IMG_0001.HEIC"))
+    assert snapshot.names_for_stem(folder, "IMG_0001") == ["IMG_0001.JPG"]
+    assert not snapshot.has_ext(".heic")
+    assert [e.name for e in snapshot.iter_files()] == ["IMG_0001.JPG"]
+
+    # A removed file's slot is reused by the next landing
+    snapshot.add_file(os.path.join(folder, "IMG_0002.MOV"), 50, 4.0)
+    assert len(snapshot._sizes) == 2
+    assert snapshot.get(os.path.join(folder, "IMG_0002.MOV")).size == 50
+    assert snapshot.get(os.path.join(folder, "IMG_0001.JPG")).size == 120
+
+def test_scan_records_existing_files(tmp_path):
+    (tmp_path / "a").mkdir()
+    (tmp_path / "a" / "IMG_0003.JPG").write_bytes(b"x" * 10)
+    snapshot = DirectorySnapshot.scan(str(tmp_path))
+    assert snapshot.paths_with_ext({".jpg"}) == [str(tmp_path / "a" / "IMG_0003.JPG")]
+    assert snapshot.get(str(tmp_path / "a" / "IMG_0003.JPG")).size == 10
@@ -0,0 +1,52 @@
+import os
+from src.core.failure_manifest import (
+    FailureManifest, FAILURE_MANIFEST_FILENAME, SOURCE_FS, SOURCE_MTP,
+    REASON_VERIFY, REASON_IO, REASON_MISSING, REASON_COPY, reason_for
+)
+
+def test_reason_codes():
+    assert reason_for("Source not found: x") == REASON_MISSING
+    assert reason_for("Item is no longer on the device") == REASON_MISSING
+    assert reason_for("Size mismatch after copy") == REASON_VERIFY
+    assert reason_for("[Errno 28] No space left on device") == REASON_IO
+    assert reason_for("something odd") == REASON_COPY
+
+def test_round_trip(tmp_path):
+    source = tmp_path / "src"
+    dest = tmp_path / "dest"
+    (source / "sub").mkdir(parents=True)
+    dest.mkdir()
+    manifest = FailureManifest(str(source), str(dest), ["This PC", "iPhone"], organize_by_date=True)
+    manifest.record_fs(str(source / "sub" / "a.jpg"), str(source), 10, os.path.join("2024", "07", "a.jpg"), "Permission denied")
+    manifest.record_mtp(["DCIM", "100APPLE"], "IMG_1.HEIC", "IMG_1.HEIC", str(dest / "DCIM"), 20, "Verification failed")
+    manifest.save()
+
+    loaded = FailureManifest.load(str(dest))
+    assert loaded.source == str(source)
+    assert loaded.breadcrumbs == ["This PC", "iPhone"]
+    assert loaded.organize_by_date
+    assert len(loaded) == 2
+    fs_record, mtp_record = loaded.items
+    assert fs_record["kind"] == SOURCE_FS
+    assert fs_record["rel"] == os.path.join("sub", "a.jpg")
+    assert fs_record["dest_file"] == os.path.join("2024", "07", "a.jpg")
+    assert fs_record["reason"] == REASON_IO
+    assert mtp_record["kind"] == SOURCE_MTP
+    assert mtp_record["folder"] == ["DCIM", "100APPLE"]
+    assert mtp_record["dest_dir"] == "DCIM"
+    assert mtp_record["reason"] == REASON_VERIFY
+
+def test_carry_keeps_record_and_empty_save_removes_file(tmp_path):
+    manifest = FailureManifest("src", str(tmp_path))
+    manifest.record_fs(str(tmp_path / "a.jpg"), str(tmp_path), 1, "a.jpg", "boom")
+    manifest.save()
+    previous = FailureManifest.load(str(tmp_path))
+
+    remaining = FailureManifest(previous.source, str(tmp_path))
+    remaining.carry(previous.items[0])
+    assert remaining.items == previous.items
+    assert len(FailureManifest(previous.source, str(tmp_path))) == 0
+
+    FailureManifest("src", str(tmp_path)).save()
+    assert not (tmp_path / FAILURE_MANIFEST_FILENAME).exists()
+    assert FailureManifest.load(str(tmp_path)) is None
@@ -0,0 +1,47 @@
+from src.core.folder_fingerprints import FolderFingerprints, FINGERPRINT_SKIP_LIVE
+
+class Item:
+    def __init__(self, name):
+        self.Name = name
+
+class Items:
+    """Stands in for a Shell FolderItems collection."""
+    def __init__(self, *names):
+        self.items = [Item(name) for name in names]
+
+    @property
+    def Count(self):
+        return len(self.items)
+
+    def Item(self, index):
+        return self.items[index]
+
+def test_unchanged_after_record_and_reload(tmp_path):
+    fingerprints = FolderFingerprints(str(tmp_path))
+    fingerprints.record("DCIM/100APPLE", Items("IMG_1.HEIC", "IMG_2.HEIC"), 123)
+    fingerprints.save()
+
+    reloaded = FolderFingerprints(str(tmp_path))
+    assert reloaded.unchanged("DCIM/100APPLE", Items("IMG_1.HEIC", "IMG_2.HEIC"))
+    assert reloaded.skipped == 1
+
+def test_changed_count_or_newest_item(tmp_path):
+    fingerprints = FolderFingerprints(str(tmp_path))
+    fingerprints.record("DCIM/100APPLE", Items("IMG_1.HEIC", "IMG_2.HEIC"), 123)
+    assert not fingerprints.unchanged("DCIM/100APPLE", Items("IMG_1.HEIC", "IMG_2.HEIC", "IMG_3.HEIC"))
+    assert not fingerprints.unchanged("DCIM/100APPLE", Items("IMG_1.HEIC", "IMG_9.HEIC"))
+    assert not fingerprints.unchanged("DCIM/101APPLE", Items("IMG_1.HEIC", "IMG_2.HEIC"))
+
+def test_narrower_run_does_not_hide_skipped_items(tmp_path):
+    fingerprints = FolderFingerprints(str(tmp_path))
+    items = Items("IMG_1.HEIC", "IMG_1.MOV")
+    fingerprints.record("DCIM/100APPLE", items, 10, FINGERPRINT_SKIP_LIVE)
+    # A full run must still visit the folder to copy the Live Photo videos
+    assert not fingerprints.unchanged("DCIM/100APPLE", items)
+    assert fingerprints.unchanged("DCIM/100APPLE", items, FINGERPRINT_SKIP_LIVE)
+
+def test_full_run_covers_narrower_runs(tmp_path):
+    fingerprints = FolderFingerprints(str(tmp_path))
+    items = Items("IMG_1.HEIC", "IMG_1.MOV")
+    fingerprints.record("DCIM/100APPLE", items, 10)
+    assert fingerprints.unchanged("DCIM/100APPLE", items, FINGERPRINT_SKIP_LIVE)
@@ -0,0 +1,54 @@
+import os
+import time
+from src.core.media_dates import DateOrganizer
+
+TAKEN = time.mktime((2023, 5, 17, 12, 0, 0, 0, 0, -1))
+
+def land(path, data):
+    with open(path, "wb") as f:
+        f.write(data)
+    os.utime(path, (TAKEN, TAKEN)) # No header date: the organizer falls back to mtime
+    return str(path)
+
+def test_route_moves_into_year_month(tmp_path):
+    organizer = DateOrganizer(str(tmp_path))
+    routed = organizer.route(land(tmp_path / "IMG_0001.HEIC", b"one"))
+    assert routed == os.path.join(str(tmp_path), "2023", "05", "IMG_0001.HEIC")
+    assert not os.path.exists(tmp_path / "IMG_0001.HEIC")
+
+def test_route_never_overwrites_a_namesake(tmp_path):
+    organizer = DateOrganizer(str(tmp_path))
+    first = organizer.route(land(tmp_path / "IMG_0001.HEIC", b"from folder A"))
+    second = organizer.route(land(tmp_path / "IMG_0001.HEIC", b"from folder B"))
+    assert second == os.path.join(str(tmp_path), "2023", "05", "IMG_0001 (1).HEIC")
+    with open(first, "rb") as f:
+        assert f.read() == b"from folder A"
+    with open(second, "rb") as f:
+        assert f.read() == b"from folder B"
+    assert organizer.renamed == 1
+
+def test_route_drops_identical_duplicate(tmp_path):
+    organizer = DateOrganizer(str(tmp_path))
+    first = organizer.route(land(tmp_path / "IMG_0002.JPG", b"same bytes"))
+    second = organizer.route(land(tmp_path / "IMG_0002.JPG", b"same bytes"))
+    assert second == first
+    assert os.listdir(os.path.dirname(first)) == ["IMG_0002.JPG"]
+    assert not os.path.exists(tmp_path / "IMG_0002.JPG")
+    assert organizer.duplicates == 1
+
+def test_claim_reserves_names_for_parallel_writers(tmp_path):
+    organizer = DateOrganizer(str(tmp_path))
+    source = land(tmp_path / "src.jpg", b"data")
+    target = os.path.join(str(tmp_path), "out", "IMG_0003.JPG")
+    assert organizer.claim(target, source) == (target, False)
+    # Not written yet, but already handed out
+    assert organizer.claim(target, source) == (os.path.join(str(tmp_path), "out", "IMG_0003 (1).JPG"), False)
+
+def test_released_claim_is_handed_out_again(tmp_path):
+    organizer = DateOrganizer(str(tmp_path))
+    source = land(tmp_path / "src.jpg", b"data")
+    target = os.path.join(str(tmp_path), "out", "IMG_0004.JPG")
+    assert organizer.claim(target, source) == (target, False)
+    organizer.release(target) # The copy failed and its partial file was removed
+    assert organizer.claim(target, source) == (target, False)
+    assert organizer.renamed == 0
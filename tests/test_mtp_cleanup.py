@@ -0,0 +1,24 @@
+import os
+from src.core.mtp_handler import MTPHandler
+from src.core.dir_scanner import DirectorySnapshot
+
+def touch(path, data=b"x"):
+    with open(path, "wb") as f:
+        f.write(data)
+
+def test_cleanup_removes_only_the_failed_item(tmp_path):
+    for name in ("IMG_1234.HEIC", "IMG_1234", "IMG_1234.mov", "IMG_1234.mov.part", "IMG_1234.JPG"):
+        touch(tmp_path / name)
+    handler = MTPHandler()
+    handler.dest_snapshot = DirectorySnapshot.scan(str(tmp_path))
+
+    handler.cleanup_failed_copy(str(tmp_path), "IMG_1234", "IMG_1234.mov")
+
+    assert sorted(os.listdir(tmp_path)) == ["IMG_1234.HEIC", "IMG_1234.JPG"]
+    assert handler.dest_snapshot.get(str(tmp_path / "IMG_1234.HEIC")) is not None
+    assert handler.dest_snapshot.get(str(tmp_path / "IMG_1234.mov")) is None
+
+def test_cleanup_without_partials_is_a_no_op(tmp_path):
+    touch(tmp_path / "IMG_0001.HEIC")
+    MTPHandler().cleanup_failed_copy(str(tmp_path), "IMG_0001")
+    assert os.listdir(tmp_path) == ["IMG_0001.HEIC"]
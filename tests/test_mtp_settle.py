@@ -0,0 +1,76 @@
+import os
+from src.core.mtp_handler import MTPHandler
+from src.core.selection import SelectionQuery
+from src.utils.constants import MEDIA_VIDEO
+
+JPEG_HEAD = b"\xff\xd8\xff\xe0" + b"\x00" * 60
+MOV_HEAD = b"\x00\x00\x00\x14ftypqt  \x00\x00\x00\x00qt  " + b"\x00" * 40
+
+def land(path, data):
+    with open(path, "wb") as f:
+        f.write(data)
+    return str(path)
+
+def handler_for_videos():
+    handler = MTPHandler()
+    handler.selection = SelectionQuery(media_types={MEDIA_VIDEO})
+    return handler
+
+def test_sniffed_type_outside_selection_is_removed(tmp_path):
+    handler = handler_for_videos()
+    path = land(tmp_path / "IMG_0001", JPEG_HEAD)
+
+    assert handler._settle_landed(path, path, "dcim/img_0001|64") == ""
+    assert os.listdir(tmp_path) == []
+    assert handler.selection.excluded == 1
+
+def test_sniffed_type_inside_selection_is_renamed(tmp_path):
+    handler = handler_for_videos()
+    path = land(tmp_path / "IMG_0002", MOV_HEAD)
+
+    assert handler._settle_landed(path, path, "dcim/img_0002|60") == str(tmp_path / "IMG_0002.mov")
+    assert handler.selection.excluded == 0
+
+class ShellItem:
+    def __init__(self, name, children=None):
+        self.Name = name
+        self.IsFolder = children is not None
+        self.Size = 10
+        self.Path = name
+        self.children = children or []
+
+    @property
+    def GetFolder(self):
+        return ShellFolder(self.Name, self.children)
+
+class ShellItems(list):
+    """Stands in for a Shell FolderItems collection."""
+    @property
+    def Count(self):
+        return len(self)
+
+    def Item(self, index):
+        return self[index]
+
+class ShellFolder:
+    def __init__(self, title, items):
+        self.Title = title
+        self.items = ShellItems(items)
+
+    def Items(self):
+        return self.items
+
+def test_batch_before_a_subfolder_is_not_whole_folder_in_source_order(tmp_path):
+    from src.utils.constants import SCHEDULE_SOURCE_ORDER
+    handler = MTPHandler()
+    handler.is_running = True
+    handler.schedule_policy = SCHEDULE_SOURCE_ORDER
+    flushes = []
+    handler._flush_batch = lambda folder, batch, dest, whole_folder=False: flushes.append((folder.Title, [b[1] for b in batch], whole_folder))
+    # Shell order: a file, a subfolder, then another file of the same folder
+    root = ShellFolder("DCIM", [ShellItem("A.JPG"), ShellItem("100APPLE", [ShellItem("C.JPG")]), ShellItem("B.JPG")])
+
+    handler.process_shell_folder(root, str(tmp_path))
+
+    assert flushes[0] == ("DCIM", ["A.JPG"], False)
+    assert ("DCIM", ["B.JPG"], False) in flushes
@@ -0,0 +1,43 @@
+import os
+import json
+import pytest
+from src.core.pack_archive import PackWriter, PackReader
+from src.utils.constants import PACK_INDEX_FILENAME
+
+def make_pack(tmp_path):
+    source = tmp_path / "IMG_0001.JPG"
+    source.write_bytes(b"jpeg bytes")
+    root = tmp_path / "pack"
+    root.mkdir()
+    writer = PackWriter(str(root))
+    writer.add_file(str(source), "2024/07/IMG_0001.JPG")
+    writer.close()
+    return root
+
+def add_index_entry(root, **overrides):
+    with open(root / PACK_INDEX_FILENAME, "r", encoding="utf-8") as f:
+        entry = json.loads(f.readline())
+    entry.update(overrides)
+    with open(root / PACK_INDEX_FILENAME, "a", encoding="utf-8") as f:
+        f.write(json.dumps(entry) + "\n")
+
+def test_extract_round_trip(tmp_path):
+    reader = PackReader(str(make_pack(tmp_path)))
+    target = reader.extract("2024/07/IMG_0001.JPG", str(tmp_path / "out"))
+    assert target == os.path.join(str(tmp_path / "out"), "2024", "07", "IMG_0001.JPG")
+    with open(target, "rb") as f:
+        assert f.read() == b"jpeg bytes"
+
+@pytest.mark.parametrize("name", ["../escape.jpg", "2024/../../escape.jpg", "/tmp/escape.jpg", "\\\\server\\share\\x.jpg"])
+def test_extract_rejects_names_outside_the_target(tmp_path, name):
+    root = make_pack(tmp_path)
+    add_index_entry(root, name=name)
+    reader = PackReader(str(root))
+    with pytest.raises(ValueError):
+        reader.extract(name, str(tmp_path / "out"))
+    assert not (tmp_path / "escape.jpg").exists()
+
+def test_index_entries_must_point_at_a_volume_in_root(tmp_path):
+    root = make_pack(tmp_path)
+    add_index_entry(root, name="other.jpg", volume="../backup_0001.tar")
+    assert "other.jpg" not in PackReader(str(root)).entries
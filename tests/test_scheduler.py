@@ -0,0 +1,63 @@
+from src.core.scheduler import WorkScheduler, order_plan
+from src.utils.constants import (
+    SCHEDULE_SOURCE_ORDER,
+    SCHEDULE_SMALL_FIRST,
+    SCHEDULE_LARGEST_FIRST,
+    SCHEDULE_NEWEST_FIRST,
+    DEFAULT_SCHEDULE_POLICY
+)
+
+# (name, size, mtime)
+FILES = [("a", 5, 3.0), ("B", 100, 1.0), ("c", 1, 2.0), ("D", 200, 4.0), ("e", 3, 5.0)]
+LARGE = 50
+
+def size_of(item):
+    return item[1]
+
+def mtime_of(item):
+    return item[2]
+
+def names(items):
+    return [item[0] for item in items]
+
+def drain(scheduler, finish=True):
+    """Takes every item from a single worker, finishing each before the next."""
+    order = []
+    while True:
+        item = scheduler.next_item()
+        if item is None: return order
+        order.append(item[0])
+        if finish: scheduler.done(item)
+
+def test_default_policy_is_source_order():
+    assert DEFAULT_SCHEDULE_POLICY == SCHEDULE_SOURCE_ORDER
+
+def test_order_plan_policies():
+    assert names(order_plan(FILES, SCHEDULE_SOURCE_ORDER, size_of, mtime_of)) == ["a", "B", "c", "D", "e"]
+    assert names(order_plan(FILES, SCHEDULE_SMALL_FIRST, size_of, mtime_of)) == ["c", "e", "a", "B", "D"]
+    assert names(order_plan(FILES, SCHEDULE_LARGEST_FIRST, size_of, mtime_of)) == ["D", "B", "a", "e", "c"]
+    assert names(order_plan(FILES, SCHEDULE_NEWEST_FIRST, size_of, mtime_of)) == ["e", "D", "a", "c", "B"]
+
+def test_scheduler_keeps_policy_order_for_one_worker():
+    for policy in (SCHEDULE_SMALL_FIRST, SCHEDULE_LARGEST_FIRST, SCHEDULE_NEWEST_FIRST):
+        scheduler = WorkScheduler(FILES, policy, size_of, mtime_of, workers=1, large_threshold=LARGE)
+        assert drain(scheduler) == names(order_plan(FILES, policy, size_of, mtime_of))
+
+def test_small_first_does_not_start_large_files_early():
+    scheduler = WorkScheduler(FILES, SCHEDULE_SMALL_FIRST, size_of, workers=4, large_threshold=LARGE)
+    assert drain(scheduler, finish=False) == ["c", "e", "a", "B", "D"]
+
+def test_large_files_in_flight_are_capped():
+    scheduler = WorkScheduler(FILES, SCHEDULE_LARGEST_FIRST, size_of, workers=2, large_threshold=LARGE)
+    first = scheduler.next_item()
+    assert first[0] == "D"
+    # One large file is the cap for two workers: the second worker drains small files
+    assert scheduler.next_item()[0] == "a"
+    scheduler.done(first)
+    assert scheduler.next_item()[0] == "B"
+
+def test_large_lane_uncapped_once_small_files_run_out():
+    files = [("x", 1, 0.0), ("Y", 100, 0.0), ("Z", 200, 0.0)]
+    scheduler = WorkScheduler(files, SCHEDULE_SMALL_FIRST, size_of, workers=2, large_threshold=LARGE)
+    assert drain(scheduler, finish=False) == ["x", "Y", "Z"]
+    assert len(scheduler) == 0
@@ -0,0 +1,42 @@
+import os
+import sys
+import threading
+import pytest
+from src.core.throttle import IoPriority
+
+def in_thread(func):
+    result = []
+    thread = threading.Thread(target=lambda: result.append(func()))
+    thread.start()
+    thread.join()
+    return result[0]
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="Per-thread niceness is Linux-specific")
+def test_background_mode_restores_previous_niceness():
+    priority = IoPriority()
+
+    def run():
+        tid = threading.get_native_id()
+        before = os.getpriority(os.PRIO_PROCESS, tid)
+        priority.set_low(True)
+        priority.sync()
+        lowered = os.getpriority(os.PRIO_PROCESS, tid)
+        priority.set_low(False)
+        priority.sync()
+        return before, lowered, os.getpriority(os.PRIO_PROCESS, tid)
+
+    before, lowered, after = in_thread(run)
+    assert lowered == max(before, 10)
+    if os.geteuid() == 0: # Raising priority again needs privileges
+        assert after == before
+
+def test_failed_change_is_not_retried_every_file(monkeypatch):
+    priority = IoPriority(low=True)
+    attempts = []
+    monkeypatch.setattr(priority, "_apply", lambda low: attempts.append(low) or False)
+
+    def run():
+        for _ in range(3): priority.sync()
+
+    in_thread(run)
+    assert attempts == [True]
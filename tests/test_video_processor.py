@@ -0,0 +1,22 @@
+from src.core.video_processor import VideoProcessor, VideoJob
+from src.utils.constants import VIDEO_MODE_REMUX, VIDEO_MODE_TRANSCODE
+
+def processor():
+    video = VideoProcessor(ffmpeg_path="ffmpeg")
+    video.ffprobe_path = None
+    return video
+
+def test_remux_keeps_every_stream():
+    cmd = processor()._build_command(VideoJob("a.mov", "a.mp4", VIDEO_MODE_REMUX), "a.mp4.part")
+    assert cmd[cmd.index("-map") + 1] == "0"
+    assert "0:v:0" not in cmd
+
+def test_transcode_maps_main_video_and_audio():
+    cmd = processor()._build_command(VideoJob("a.mov", "a.mp4", VIDEO_MODE_TRANSCODE), "a.mp4.part")
+    assert "0:v:0" in cmd and "libx264" in cmd
+
+def test_originals_kept_by_default_and_without_validation(tmp_path):
+    assert not VideoJob("a.mov", "a.mp4", VIDEO_MODE_REMUX).replace_original
+    output = tmp_path / "a.mp4"
+    output.write_bytes(b"x")
+    assert not processor().validate_output(str(output), 12.0)